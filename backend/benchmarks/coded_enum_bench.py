@@ -0,0 +1,153 @@
+"""
+Coded Enum Benchmark
+DataLab Georgia - table size, index size and filter speed with text vs. SMALLINT enums
+
+Builds `service_requests` in a throwaway SQLite file the way schema version 6
+stored it (status / urgency / device_type as text), measures it, then runs the
+v7 migration (database._recode_enum_columns) on a copy and measures again:
+
+  * table and per-index size from the dbstat virtual table, after VACUUM;
+  * median wall time of the filtered queries the admin listing, Kanban board
+    and counters issue.
+
+    python -m benchmarks.coded_enum_bench --rows 1000000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import CheckConstraint, MetaData, String, create_engine, func, insert, select, text
+
+from database import _recode_enum_columns
+from models.coded_enum import CodedEnum
+from models.ServiceRequestSQL import ServiceRequestSQL, DEVICE_TYPE, URGENCY, REQUEST_STATUS
+
+CHUNK = 50000
+
+
+def text_table():
+    """service_requests as stored before v7 - same indexes, text enum columns"""
+    table = ServiceRequestSQL.__table__.to_metadata(MetaData())
+    for check in [c for c in table.constraints if isinstance(c, CheckConstraint)]:
+        table.constraints.discard(check)
+    for column in table.columns:
+        if isinstance(column.type, CodedEnum):
+            allowed = ', '.join(f"'{value}'" for value in column.type.values)
+            table.append_constraint(CheckConstraint(f"{column.name} IN ({allowed})", name=f"check_{column.name}"))
+            column.type = String(20)
+    return table
+
+
+def seed(engine, table, rows: int):
+    table.create(engine)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        for offset in range(0, rows, CHUNK):
+            conn.execute(insert(table), [
+                {
+                    "id": i + 1, "name": f"Client {i}", "email": f"client{i}@example.com", "phone": "555000000",
+                    "device_type": random.choice(DEVICE_TYPE.values),
+                    "problem_description": "Drive is not detected after a power cut, clicking noise",
+                    "urgency": random.choice(URGENCY.values),
+                    "status": random.choices(REQUEST_STATUS.values, weights=(10, 30, 15, 25, 20))[0],
+                    "case_id": f"DL{i:09d}", "created_at": start + timedelta(minutes=i),
+                    "is_read": random.random() < 0.9, "is_archived": random.random() < 0.1,
+                    "approved_for_kanban": random.random() < 0.3
+                }
+                for i in range(offset, min(offset + CHUNK, rows))
+            ])
+
+
+def sizes(engine) -> dict:
+    """Bytes per table / index, as stored on disk"""
+    with engine.connect() as conn:
+        conn.exec_driver_sql("VACUUM")
+        rows = conn.exec_driver_sql(
+            "SELECT name, SUM(pgsize) FROM dbstat WHERE name LIKE '%service_requests%' GROUP BY name"
+        ).all()
+    return dict(rows)
+
+
+def queries(table) -> dict:
+    c = table.c
+    return {
+        "listing status=pending page": select(*[c.id, c.case_id, c.status]).where(
+            c.is_archived == False, c.status == 'pending'
+        ).order_by(c.created_at.desc()).limit(100),
+        "listing urgency in (high,critical) count": select(func.count()).select_from(table).where(
+            c.is_archived == False, c.urgency.in_(['high', 'critical'])
+        ),
+        "listing device_type=ssd count": select(func.count()).select_from(table).where(
+            c.is_archived == False, c.device_type == 'ssd'
+        ),
+        "kanban counts by status": select(c.status, func.count()).where(
+            c.approved_for_kanban == True
+        ).group_by(c.status),
+        "unindexed status scan": select(func.count()).select_from(table).where(c.status.in_(['completed', 'picked_up'])),
+    }
+
+
+def time_queries(engine, table, repeat: int) -> dict:
+    timings = {}
+    with engine.connect() as conn:
+        for label, query in queries(table).items():
+            conn.execute(query).all()
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                conn.execute(query).all()
+                samples.append((time.perf_counter() - started) * 1000)
+            timings[label] = statistics.median(samples)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="datalab-bench-")
+    before_path, after_path = os.path.join(directory, "text.db"), os.path.join(directory, "coded.db")
+
+    table = text_table()
+    before = create_engine(f"sqlite:///{before_path}")
+    started = time.perf_counter()
+    seed(before, table, args.rows)
+    print(f"seeded {args.rows} rows in {time.perf_counter() - started:.1f}s")
+    before_sizes = sizes(before)
+    before_times = time_queries(before, table, args.repeat)
+    before.dispose()
+
+    shutil.copy(before_path, after_path)
+    after = create_engine(f"sqlite:///{after_path}")
+    started = time.perf_counter()
+    with after.begin() as conn:
+        _recode_enum_columns(conn)
+    print(f"v7 migration rebuilt the table in {time.perf_counter() - started:.1f}s")
+    after_sizes = sizes(after)
+    after_times = time_queries(after, ServiceRequestSQL.__table__, args.repeat)
+    after.dispose()
+
+    print(f"\n{'object':<45} {'text':>10} {'coded':>10}")
+    for name in sorted(before_sizes, key=lambda name: (name != 'service_requests', name)):
+        old, new = before_sizes[name], after_sizes.get(name, 0)
+        print(f"{name:<45} {old / 2**20:>8.1f}MB {new / 2**20:>8.1f}MB  ({(old - new) / old * 100:.0f}% smaller)")
+    old, new = sum(before_sizes.values()), sum(after_sizes.values())
+    print(f"{'total':<45} {old / 2**20:>8.1f}MB {new / 2**20:>8.1f}MB  ({(old - new) / old * 100:.0f}% smaller)")
+
+    print(f"\n{'query (median of ' + str(args.repeat) + ')':<45} {'text':>10} {'coded':>10}")
+    for label, old in before_times.items():
+        new = after_times[label]
+        print(f"{label:<45} {old:>8.2f}ms {new:>8.2f}ms  ({(old - new) / old * 100:.0f}% faster)")
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
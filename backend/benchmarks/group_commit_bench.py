@@ -0,0 +1,115 @@
+"""
+Group-commit Benchmark
+DataLab Georgia - per-request commits vs. the batched writer on SQLite
+
+Runs N concurrent submitters against a throwaway SQLite file, once with
+today's commit-per-request path and once through GroupCommitWriter:
+
+    python -m benchmarks.group_commit_bench --submitters 200 --per-submitter 5
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.ServiceRequestSQL import ServiceRequestSQL
+from utils.case_generator import format_case_id, next_case_number
+from utils.write_batcher import GroupCommitWriter
+
+
+def make_row(i: int) -> ServiceRequestSQL:
+    return ServiceRequestSQL(
+        name=f"Bench {i}",
+        email=f"bench{i}@example.com",
+        phone="555000000",
+        device_type="hdd",
+        problem_description="Benchmark submission",
+        urgency="medium"
+    )
+
+
+async def insert_direct(session_factory, i: int):
+    """Mirror of the non-batched create_service_request path"""
+    async with session_factory() as session:
+        row = make_row(i)
+        year = datetime.now().year
+        row.case_id = format_case_id(year, await next_case_number(session, year))
+        session.add(row)
+        await session.commit()
+
+
+async def run(mode: str, submitters: int, per_submitter: int) -> dict:
+    path = os.path.join(tempfile.mkdtemp(prefix="datalab-bench-"), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=20, max_overflow=0)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    writer = None
+    if mode == "batched":
+        writer = GroupCommitWriter(session_factory)
+        await writer.start()
+
+    errors = 0
+
+    async def submitter(s: int):
+        nonlocal errors
+        for n in range(per_submitter):
+            i = s * per_submitter + n
+            try:
+                if writer is not None:
+                    await writer.submit(make_row(i))
+                else:
+                    await insert_direct(session_factory, i)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(submitter(s) for s in range(submitters)))
+    elapsed = time.perf_counter() - started
+
+    if writer is not None:
+        await writer.stop()
+    async with session_factory() as session:
+        stored = await session.scalar(select(func.count(ServiceRequestSQL.id)))
+        distinct = await session.scalar(select(func.count(func.distinct(ServiceRequestSQL.case_id))))
+    await engine.dispose()
+
+    return {
+        "mode": mode,
+        "attempted": submitters * per_submitter,
+        "stored": stored,
+        "distinct_case_ids": distinct,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(stored / elapsed, 1) if elapsed else None,
+        "commits": writer.batches if writer is not None else stored
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--submitters", type=int, default=200)
+    parser.add_argument("--per-submitter", type=int, default=5)
+    args = parser.parse_args()
+
+    for mode in ("direct", "batched"):
+        result = await run(mode, args.submitters, args.per_submitter)
+        print(
+            f"{result['mode']:>8}: {result['stored']}/{result['attempted']} rows "
+            f"in {result['seconds']}s ({result['rows_per_second']} rows/s), "
+            f"{result['commits']} commits, {result['errors']} errors, "
+            f"{result['distinct_case_ids']} distinct case IDs"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
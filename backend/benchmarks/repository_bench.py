@@ -0,0 +1,138 @@
+"""
+Repository Benchmark
+DataLab Georgia - per-request CPU of the old handler path vs. the repository layer
+
+Seeds a throwaway SQLite file with service requests and times, in process CPU
+seconds, the two ways a handler can answer get-by-case-id and a 100-row page:
+
+  * inline - build `select(ServiceRequestSQL).where(...)` per call, load ORM
+    objects, construct ServiceRequestResponse models and serialize them the way
+    FastAPI's response_model does (what the routes did before repositories/);
+  * repository - pre-built statement, column rows and RowEncoder into a
+    JSONResponse.
+
+    python -m benchmarks.repository_bench --rows 2000 --iterations 500
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, desc, insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models.ServiceRequestSQL import ServiceRequestSQL, ServiceRequestResponse
+from repositories.service_requests import service_request_repo
+
+
+def _response(req) -> ServiceRequestResponse:
+    return ServiceRequestResponse(
+        id=req.id,
+        name=req.name,
+        email=req.email,
+        phone=req.phone,
+        device_type=req.device_type,
+        problem_description=req.problem_description,
+        urgency=req.urgency,
+        status=req.status,
+        case_id=req.case_id,
+        created_at=req.created_at,
+        started_at=req.started_at,
+        completed_at=req.completed_at,
+        estimated_completion=req.estimated_completion.strftime('%Y-%m-%d') if req.estimated_completion else None,
+        price=float(req.price) if req.price else None,
+        is_read=req.is_read,
+        is_archived=req.is_archived,
+        approved_for_kanban=req.approved_for_kanban,
+        admin_comment=req.admin_comment
+    )
+
+
+async def inline_get(session: AsyncSession, case_id: str) -> JSONResponse:
+    result = await session.execute(select(ServiceRequestSQL).where(ServiceRequestSQL.case_id == case_id))
+    return JSONResponse(content=jsonable_encoder(_response(result.scalar_one_or_none())))
+
+
+async def inline_list(session: AsyncSession, skip: int) -> JSONResponse:
+    result = await session.execute(
+        select(ServiceRequestSQL).where(
+            ServiceRequestSQL.is_archived == False
+        ).order_by(desc(ServiceRequestSQL.created_at)).offset(skip).limit(100)
+    )
+    return JSONResponse(content=jsonable_encoder([_response(req) for req in result.scalars().all()]))
+
+
+async def repository_get(session: AsyncSession, case_id: str) -> JSONResponse:
+    row = await service_request_repo.get(session, case_id, by='case_id')
+    return service_request_repo.item_response(row)
+
+
+async def repository_list(session: AsyncSession, skip: int) -> JSONResponse:
+    rows = await service_request_repo.list(session, skip, 100, is_archived=False)
+    return service_request_repo.response(rows)
+
+
+async def seed(engine, rows: int) -> List[str]:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        case_ids = [f"DL-2026-{i:06d}" for i in range(rows)]
+        await conn.execute(insert(ServiceRequestSQL), [
+            {
+                "name": f"Bench {i}", "email": f"bench{i}@example.com", "phone": "555000000",
+                "device_type": "ssd", "problem_description": "Benchmark request " * 4,
+                "urgency": "medium", "case_id": case_id, "price": 150 + i % 7
+            }
+            for i, case_id in enumerate(case_ids)
+        ])
+    return case_ids
+
+
+async def measure(session_factory, handler, args: list) -> float:
+    """CPU milliseconds per call (each call on a fresh session, like a request)"""
+    started = time.process_time()
+    for arg in args:
+        async with session_factory() as session:
+            await handler(session, arg)
+    return (time.process_time() - started) * 1000 / len(args)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="datalab-bench-"), "bench.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    case_ids = await seed(engine, args.rows)
+
+    lookups = [random.choice(case_ids) for _ in range(args.iterations)]
+    pages = [random.randrange(0, max(args.rows - 100, 1)) for _ in range(args.iterations // 5 or 1)]
+    cases = [
+        ("get by case_id", inline_get, repository_get, lookups),
+        ("list 100 rows", inline_list, repository_list, pages),
+    ]
+    for label, inline, repository, inputs in cases:
+        # Warm both paths so one-off compilation isn't billed to either
+        await measure(session_factory, inline, inputs[:5])
+        await measure(session_factory, repository, inputs[:5])
+        before = await measure(session_factory, inline, inputs)
+        after = await measure(session_factory, repository, inputs)
+        print(
+            f"{label:<15} inline {before:.3f} ms CPU/request, repository {after:.3f} ms "
+            f"({(before - after) / before * 100:.0f}% less, {len(inputs)} requests)"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
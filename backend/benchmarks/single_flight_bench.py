@@ -0,0 +1,135 @@
+"""
+Single-flight Benchmark
+DataLab Georgia - DB queries per burst of identical GETs, with and without coalescing
+
+Seeds a throwaway SQLite file, then sends waves of concurrent identical
+requests straight into the ASGI app (no network) and counts the statements
+that reach the read engine:
+
+    python -m benchmarks.single_flight_bench --concurrency 200 --waves 5
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+# Point the app at a scratch database before database.py is imported
+os.environ.setdefault(
+    'DATABASE_URL',
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(prefix='datalab-bench-'), 'bench.db')}"
+)
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+# Measure coalescing alone, not load shedding
+os.environ.setdefault('ADMISSION_ENABLED', 'false')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from sqlalchemy import event
+
+from database import AsyncSessionLocal, read_engine, init_db, close_db
+from models.ServiceRequestSQL import ServiceRequestSQL
+from models.TestimonialSQL import TestimonialSQL
+from utils.single_flight import single_flight
+
+ENDPOINTS = [
+    ("/api/testimonials/", b""),
+    ("/api/service-requests/", b"limit=100"),
+]
+
+queries = 0
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    global queries
+    queries += 1
+
+
+async def seed(testimonials: int, requests: int):
+    async with AsyncSessionLocal() as session:
+        for i in range(testimonials):
+            session.add(TestimonialSQL(
+                name=f"Client {i}", name_en=f"Client {i}", position="Customer",
+                position_en="Customer", text_ka="ტექსტი", text_en="Great service", rating=5
+            ))
+        for i in range(requests):
+            session.add(ServiceRequestSQL(
+                name=f"Bench {i}", email=f"bench{i}@example.com", phone="555000000",
+                device_type="hdd", problem_description="Benchmark request", urgency="medium",
+                case_id=f"DL-BENCH-{i:05d}"
+            ))
+        await session.commit()
+
+
+async def asgi_get(app, path: str, query: bytes) -> int:
+    """Minimal in-process GET; returns the status code"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": query, "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0), "server": ("bench", 80)
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(app, enabled: bool, path: str, query: bytes, concurrency: int, waves: int) -> dict:
+    global queries
+    single_flight.enabled = enabled
+    queries = 0
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(waves):
+        statuses = await asyncio.gather(*(asyncio.create_task(asgi_get(app, path, query)) for _ in range(concurrency)))
+        errors += sum(1 for status in statuses if status != 200)
+    elapsed = time.perf_counter() - started
+    requests = concurrency * waves
+    return {
+        "mode": "coalesced" if enabled else "direct",
+        "requests": requests,
+        "queries": queries,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(requests / elapsed, 1) if elapsed else None
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--waves", type=int, default=5)
+    parser.add_argument("--testimonials", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    from server import app
+    await init_db()
+    await seed(args.testimonials, args.requests)
+    event.listen(read_engine.sync_engine, "before_cursor_execute", _count_query)
+
+    for path, query in ENDPOINTS:
+        # Warm-up so connection setup isn't billed to either mode
+        await run(app, False, path, query, 1, 1)
+        for enabled in (False, True):
+            result = await run(app, enabled, path, query, args.concurrency, args.waves)
+            print(
+                f"{path:<26} {result['mode']:>9}: {result['requests']} requests, "
+                f"{result['queries']} DB queries, {result['errors']} errors, "
+                f"{result['seconds']}s ({result['requests_per_second']} req/s)"
+            )
+    print(f"single-flight stats: {single_flight.stats()}")
+    await close_db()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
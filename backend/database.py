@@ -4,46 +4,300 @@ DataLab Georgia - Converted from PostgreSQL to SQLite for WebContainer
 """
 
 import os
+from pathlib import Path
+from typing import Dict, Optional
+from sqlalchemy import Table, Column, Integer, CheckConstraint, inspect, select, func, event, text
+from sqlalchemy.schema import AddConstraint
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+from models.coded_enum import CodedEnum
+
+# Load environment variables (single load for the whole backend)
+load_dotenv(Path(__file__).parent / '.env')
 
 # SQLite connection settings (works in WebContainer)
-DATABASE_URL = "sqlite+aiosqlite:///./datalab_georgia.db"
+DATABASE_URL = os.environ.get('DATABASE_URL', "sqlite+aiosqlite:///./datalab_georgia.db")
+# Optional read replica for GET handlers (PostgreSQL); defaults to the primary
+DATABASE_READ_URL = os.environ.get('DATABASE_READ_URL') or DATABASE_URL
+
+# Reads and writes use separate pools so a burst of list/board traffic can't
+# hold every connection while create_service_request waits for one
+DB_WRITE_POOL_SIZE = int(os.environ.get('DB_WRITE_POOL_SIZE', '5'))
+DB_WRITE_MAX_OVERFLOW = int(os.environ.get('DB_WRITE_MAX_OVERFLOW', '5'))
+DB_READ_POOL_SIZE = int(os.environ.get('DB_READ_POOL_SIZE', '10'))
+DB_READ_MAX_OVERFLOW = int(os.environ.get('DB_READ_MAX_OVERFLOW', '20'))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '30'))
+
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'wal')
+
+
+def _engine_options(url: str, pool_size: int, max_overflow: int, read_only: bool = False) -> dict:
+    options = {
+        # SQL_ECHO=true logs statements through the queued logging pipeline
+        # (utils/structured_logging.py) instead of echo's synchronous handler
+        "echo": False,
+        "future": True,
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": url.startswith('postgresql')
+    }
+    if read_only and url.startswith('postgresql+asyncpg'):
+        # Refuse writes at the server too, whether or not this is a replica
+        options["connect_args"] = {"server_settings": {"default_transaction_read_only": "on"}}
+    return options
 
-# Create async engine
+
+# Create async engines - `engine` is the primary (write) engine
 engine = create_async_engine(
     DATABASE_URL,
-    echo=True,  # Set to False in production
-    future=True
+    **_engine_options(DATABASE_URL, DB_WRITE_POOL_SIZE, DB_WRITE_MAX_OVERFLOW)
+)
+read_engine = create_async_engine(
+    DATABASE_READ_URL,
+    **_engine_options(DATABASE_READ_URL, DB_READ_POOL_SIZE, DB_READ_MAX_OVERFLOW, read_only=True)
 )
 
-# Create async session maker
+
+def _configure_sqlite(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # Only takes effect on a new, empty database file; existing files are
+    # converted by the maintenance scheduler (utils/sqlite_maintenance.py)
+    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    if SQLITE_JOURNAL_MODE:
+        # WAL lets the read pool keep reading while a write commits
+        cursor.execute(f"PRAGMA journal_mode = {SQLITE_JOURNAL_MODE}")
+    cursor.close()
+
+
+def _configure_sqlite_read_only(dbapi_connection, connection_record):
+    _configure_sqlite(dbapi_connection, connection_record)
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only = ON")
+    cursor.close()
+
+
+if engine.dialect.name == 'sqlite':
+    event.listen(engine.sync_engine, "connect", _configure_sqlite)
+if read_engine.dialect.name == 'sqlite':
+    event.listen(read_engine.sync_engine, "connect", _configure_sqlite_read_only)
+
+# Create async session makers
 AsyncSessionLocal = sessionmaker(
-    engine, 
-    class_=AsyncSession, 
+    engine,
+    class_=AsyncSession,
     expire_on_commit=False
 )
+AsyncReadSessionLocal = sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autoflush=False
+)
 
 # Base class for ORM models
 Base = declarative_base()
 
-async def get_session():
-    """Dependency to get database session"""
+# Bump when models change; init_db() skips schema work when the stored
+# version already matches, so warm restarts never run create_all.
+SCHEMA_VERSION = 12
+
+def _create_missing_indexes(sync_conn):
+    """create_all skips existing tables, so add indexes declared on them since"""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
+
+def _recode_case(column: str, coded: CodedEnum) -> str:
+    whens = ' '.join(f"WHEN '{value}' THEN {code}" for code, value in enumerate(coded.values))
+    return f"CASE {column} {whens} END"
+
+def _recode_enum_columns(sync_conn):
+    """v7: store status / urgency / device_type as SMALLINT codes (models/coded_enum.py)"""
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        coded = {column.name: column.type for column in table.columns if isinstance(column.type, CodedEnum)}
+        if not coded or not inspector.has_table(table.name):
+            continue
+        existing = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+        # Tables create_all just made already have the integer columns
+        if all(existing[name]._type_affinity is Integer for name in coded if name in existing):
+            continue
+
+        if sync_conn.dialect.name == 'postgresql':
+            checks = [c for c in table.constraints if isinstance(c, CheckConstraint) and c.name]
+            for check in checks:
+                sync_conn.execute(text(f'ALTER TABLE {table.name} DROP CONSTRAINT IF EXISTS {check.name}'))
+            # Recreated by _create_missing_indexes with the integer predicates
+            for index in table.indexes:
+                index.drop(sync_conn, checkfirst=True)
+            for name, coded_type in coded.items():
+                sync_conn.execute(text(
+                    f"ALTER TABLE {table.name} ALTER COLUMN {name} TYPE SMALLINT "
+                    f"USING {_recode_case(name, coded_type)}"
+                ))
+            for check in checks:
+                sync_conn.execute(AddConstraint(check))
+            continue
+
+        # SQLite can't change a column type in place: rebuild the table
+        _rebuild_sqlite_table(sync_conn, table, {name: _recode_case(name, coded[name]) for name in coded})
+
+def _rebuild_sqlite_table(sync_conn, table, values: Optional[Dict[str, str]] = None):
+    """Recreate `table` from its model and copy the rows over, through `values` expressions per column"""
+    inspector = inspect(sync_conn)
+    existing = {column['name'] for column in inspector.get_columns(table.name)}
+    old_name = f"{table.name}__old"
+    indexes = inspector.get_indexes(table.name)
+    sync_conn.execute(text(f'ALTER TABLE {table.name} RENAME TO {old_name}'))
+    # Renamed indexes keep their names; drop them so the new table can use them
+    for index in indexes:
+        sync_conn.execute(text(f'DROP INDEX IF EXISTS {index["name"]}'))
+    table.create(sync_conn)
+    names = [column.name for column in table.columns if column.name in existing]
+    selected = [(values or {}).get(name, name) for name in names]
+    sync_conn.execute(text(
+        f"INSERT INTO {table.name} ({', '.join(names)}) SELECT {', '.join(selected)} FROM {old_name}"
+    ))
+    sync_conn.execute(text(f'DROP TABLE {old_name}'))
+
+def _add_missing_columns(sync_conn):
+    """ALTER TABLE ... ADD COLUMN for nullable columns declared on existing tables since"""
+    inspector = inspect(sync_conn)
+    ddl = sync_conn.dialect.ddl_compiler(sync_conn.dialect, None)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing:
+                sync_conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl.get_column_specification(column)}"))
+
+def _seed_status_events(sync_conn):
+    """v10: start the status event log from the timestamps existing cases already carry"""
+    events = Base.metadata.tables['service_request_events']
+    coded = events.c.status.type
+    for name in ('service_requests', 'service_requests_archive'):
+        source = Base.metadata.tables[name]
+        for status, ts in (('pending', source.c.created_at), ('in_progress', source.c.started_at),
+                           ('completed', source.c.completed_at)):
+            sync_conn.execute(events.insert().from_select(
+                ['request_id', 'status', 'ts'],
+                select(source.c.id, coded.literal(status), ts).where(ts.isnot(None))
+            ))
+
+def _stop_reusing_request_ids(sync_conn):
+    """v11: archived cases keep their id, so service_requests must never hand one out again"""
+    hot = Base.metadata.tables['service_requests']
+    archive = Base.metadata.tables['service_requests_archive']
+    events = Base.metadata.tables['service_request_events']
+    highest = sync_conn.execute(
+        select(func.max(hot.c.id), select(func.max(archive.c.id)).scalar_subquery())
+    ).one()
+    next_id = max(value or 0 for value in highest) + 1
+
+    # Cases that were given an archived case's id move to a fresh one, with
+    # the events logged since they were created
+    clashes = sync_conn.execute(
+        select(hot.c.id, hot.c.created_at).where(hot.c.id.in_(select(archive.c.id))).order_by(hot.c.id)
+    ).all()
+    for old_id, created_at in clashes:
+        if created_at is not None:
+            sync_conn.execute(events.update().where(
+                events.c.request_id == old_id, events.c.ts >= created_at
+            ).values(request_id=next_id))
+        sync_conn.execute(hot.update().where(hot.c.id == old_id).values(id=next_id))
+        next_id += 1
+
+    # PostgreSQL sequences never go back; SQLite needs AUTOINCREMENT for that
+    if sync_conn.dialect.name != 'sqlite':
+        return
+    ddl = sync_conn.execute(text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'service_requests'"
+    )).scalar()
+    if 'AUTOINCREMENT' not in ddl.upper():
+        _rebuild_sqlite_table(sync_conn, hot)
+    # Continue after every id either tier has used
+    sync_conn.execute(text("DELETE FROM sqlite_sequence WHERE name = 'service_requests'"))
+    sync_conn.execute(
+        text("INSERT INTO sqlite_sequence (name, seq) VALUES ('service_requests', :seq)"), {'seq': next_id - 1}
+    )
+
+# Data migrations keyed by the version they upgrade *to*. Each receives a
+# sync connection and runs after create_all has added any new tables;
+# indexes declared on existing tables are created after every upgrade.
+MIGRATIONS = {
+    7: _recode_enum_columns,
+    # customer_id on requests / archive / messages; linked by utils/customers.py
+    8: _add_missing_columns,
+    # service_request_events; status_time_daily is filled by utils/status_events.py
+    10: _seed_status_events,
+    # service_requests AUTOINCREMENT; renumbers cases that reused an archived id
+    11: _stop_reusing_request_ids,
+}
+
+schema_version_table = Table(
+    "schema_version",
+    Base.metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", Integer, nullable=False)
+)
+
+async def get_write_session():
+    """Dependency to get a session on the primary (write) pool"""
     async with AsyncSessionLocal() as session:
         try:
             yield session
         finally:
             await session.close()
 
-async def init_db():
-    """Initialize database tables"""
+async def get_read_session():
+    """Dependency to get a read-only session for GET handlers
+
+    On SQLite the connections run with `PRAGMA query_only`; on PostgreSQL they
+    go to DATABASE_READ_URL when set, so results may lag the primary slightly.
+    """
+    async with AsyncReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+# Existing callers (scripts, /api/health) keep the primary pool
+get_session = get_write_session
+
+def _read_schema_version(sync_conn):
+    """Return (has_tables, version) - version 0 means a pre-versioning database"""
+    inspector = inspect(sync_conn)
+    if not inspector.has_table(schema_version_table.name):
+        return inspector.has_table("service_requests"), 0
+    version = sync_conn.execute(
+        select(schema_version_table.c.version).where(schema_version_table.c.id == 1)
+    ).scalar()
+    return True, version or 0
+
+def _migrate_schema(sync_conn, has_tables: bool, current: int):
+    Base.metadata.create_all(sync_conn)
+    # A fresh database gets the latest schema from create_all directly
+    if has_tables:
+        for version in sorted(v for v in MIGRATIONS if current < v <= SCHEMA_VERSION):
+            MIGRATIONS[version](sync_conn)
+        _create_missing_indexes(sync_conn)
+    sync_conn.execute(schema_version_table.delete())
+    sync_conn.execute(schema_version_table.insert().values(id=1, version=SCHEMA_VERSION))
+
+async def init_db() -> bool:
+    """Initialize database tables; returns False when the schema was already current"""
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        has_tables, current = await conn.run_sync(_read_schema_version)
+        if has_tables and current == SCHEMA_VERSION:
+            return False
+        await conn.run_sync(_migrate_schema, has_tables, current)
+    return True
 
 async def close_db():
     """Close database connections"""
-    await engine.dispose()
\ No newline at end of file
+    await read_engine.dispose()
+    await engine.dispose()
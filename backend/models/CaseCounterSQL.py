@@ -0,0 +1,18 @@
+"""
+Case Counter Model
+DataLab Georgia - last issued case number per ID prefix and year
+
+One row per "DL2026" / "KB2026" key; utils/case_generator.py increments it in
+the transaction that inserts the case, so allocating a case ID is a single
+primary-key UPDATE instead of a search over existing IDs.
+"""
+
+from sqlalchemy import Column, String, Integer
+from database import Base
+
+class CaseCounterSQL(Base):
+    """Highest case number issued for a prefix + year"""
+    __tablename__ = "case_counters"
+
+    key = Column(String(20), primary_key=True)
+    last_number = Column(Integer, nullable=False, default=0)
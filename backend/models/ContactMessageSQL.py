@@ -3,14 +3,18 @@ ContactMessage PostgreSQL Model
 DataLab Georgia - Migration from MongoDB to PostgreSQL
 """
 
-from sqlalchemy import Column, String, Text, DateTime, CheckConstraint
-from sqlalchemy import Integer
+from sqlalchemy import Column, String, Text, DateTime, CheckConstraint, Index
+from sqlalchemy import Integer, text
 from sqlalchemy.sql import func
 from database import Base
+from models.coded_enum import CodedEnum
 from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel, Field
 
+# Stored as SMALLINT codes (models/coded_enum.py); alphabetical, append new values
+MESSAGE_STATUS = CodedEnum(('new', 'read', 'replied'))
+
 class ContactMessageSQL(Base):
     """PostgreSQL ORM model for contact messages"""
     __tablename__ = "contact_messages"
@@ -22,11 +26,21 @@ class ContactMessageSQL(Base):
     subject = Column(String(200), nullable=False)
     message = Column(Text, nullable=False)
     created_at = Column(DateTime, default=func.now())
-    status = Column(String(20), default='new')
+    status = Column(MESSAGE_STATUS, default='new')
+    # customers.id (utils/customers.py); NULL until linked by the backfill
+    customer_id = Column(Integer, nullable=True)
     
     # Add constraints
     __table_args__ = (
-        CheckConstraint('status IN (\'new\', \'read\', \'replied\')', name='check_status'),
+        CheckConstraint(MESSAGE_STATUS.check('status'), name='check_status'),
+        # Admin header "new messages" counter (utils/admin_counters.py)
+        Index(
+            'idx_contact_messages_new', 'id',
+            sqlite_where=text(f"status = {MESSAGE_STATUS.code('new')}"),
+            postgresql_where=text(f"status = {MESSAGE_STATUS.code('new')}")
+        ),
+        # Customer history, newest first
+        Index('idx_contact_messages_customer', 'customer_id', 'created_at'),
     )
 
 # Pydantic models for API
@@ -0,0 +1,60 @@
+"""
+Customer Model
+DataLab Georgia - one row per person who submitted a service request or message
+
+Service requests and contact messages point at their customer through
+`customer_id` (set by utils/customers.py). A customer is matched on
+`email_key` (trimmed, lower-cased email) or `phone_key` (digits only, without
+the +995 prefix); both are unique, so a lookup by either is one index probe.
+A new email is a new customer: if its phone already belongs to someone else
+it is kept in `phone` but `phone_key` stays empty.
+`email` and `phone` are kept as first typed; `name` and `last_seen_at` follow
+the latest submission.
+"""
+
+from sqlalchemy import Column, String, DateTime, Index
+from sqlalchemy import Integer
+from sqlalchemy.sql import func
+from database import Base
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+from models.ServiceRequestSQL import ServiceRequestResponse
+from models.ContactMessageSQL import ContactMessageResponse
+
+class CustomerSQL(Base):
+    """Customers, deduplicated by normalized email / phone"""
+    __tablename__ = "customers"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String(100), nullable=False)
+    email = Column(String(255), nullable=False)
+    phone = Column(String(20), nullable=True)
+    email_key = Column(String(255), nullable=False)
+    phone_key = Column(String(20), nullable=True)
+    created_at = Column(DateTime, default=func.now())
+    last_seen_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        Index('idx_customers_email_key', 'email_key', unique=True),
+        # NULLs don't collide, so customers without a phone are fine
+        Index('idx_customers_phone_key', 'phone_key', unique=True),
+    )
+
+# Pydantic models for API
+class CustomerResponse(BaseModel):
+    id: int
+    name: str
+    email: str
+    phone: Optional[str] = None
+    created_at: datetime
+    last_seen_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class CustomerHistoryResponse(BaseModel):
+    customer: CustomerResponse
+    service_requests: List[ServiceRequestResponse]
+    contact_messages: List[ContactMessageResponse]
@@ -0,0 +1,99 @@
+"""
+KanbanTask PostgreSQL Model
+DataLab Georgia - manual Kanban tasks (previously browser localStorage only)
+"""
+
+from sqlalchemy import Column, String, Text, DateTime, Numeric, CheckConstraint, Index
+from sqlalchemy import Integer
+from sqlalchemy.sql import func
+from database import Base
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+
+class KanbanTaskSQL(Base):
+    """PostgreSQL ORM model for manual Kanban tasks"""
+    __tablename__ = "kanban_tasks"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    case_id = Column(String(20), unique=True, nullable=False)
+    name = Column(String(100), nullable=False)
+    email = Column(String(255), nullable=True)
+    phone = Column(String(20), nullable=True)
+    device_type = Column(String(50), nullable=False)
+    problem_description = Column(Text, nullable=False)
+    urgency = Column(String(20), nullable=False, default='medium')
+    status = Column(String(20), nullable=False, default='pending')
+    # Fractional rank within the status column (utils/rank.py); ranks must
+    # compare bytewise, so PostgreSQL gets the "C" collation
+    rank = Column(String(64).with_variant(String(64, collation='C'), 'postgresql'), nullable=False)
+    # Optimistic concurrency: every write is `WHERE version = :expected`
+    version = Column(Integer, nullable=False, default=1)
+    price = Column(Numeric(10, 2), nullable=True)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    
+    # Add constraints
+    __table_args__ = (
+        CheckConstraint('status IN (\'pending\', \'in_progress\', \'completed\', \'picked_up\')', name='check_kanban_status'),
+        CheckConstraint('urgency IN (\'low\', \'medium\', \'high\', \'critical\')', name='check_kanban_urgency'),
+        Index('idx_kanban_tasks_column', 'status', 'rank'),
+    )
+
+# Pydantic models for API
+class KanbanTaskCreate(BaseModel):
+    name: str = Field(..., max_length=100)
+    email: Optional[str] = Field(None, max_length=255)
+    phone: Optional[str] = Field(None, max_length=20)
+    device_type: str = Field(..., max_length=50)
+    problem_description: str
+    urgency: str = Field('medium', pattern=r'^(low|medium|high|critical)$')
+    price: Optional[float] = None
+
+class KanbanTaskUpdate(BaseModel):
+    version: int
+    name: Optional[str] = Field(None, max_length=100)
+    email: Optional[str] = Field(None, max_length=255)
+    phone: Optional[str] = Field(None, max_length=20)
+    device_type: Optional[str] = Field(None, max_length=50)
+    problem_description: Optional[str] = None
+    urgency: Optional[str] = Field(None, pattern=r'^(low|medium|high|critical)$')
+    price: Optional[float] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+class KanbanTaskMove(BaseModel):
+    """Move a task into `status`, between the tasks `after_id` (above) and `before_id` (below)"""
+    version: int
+    status: str = Field(..., pattern=r'^(pending|in_progress|completed|picked_up)$')
+    after_id: Optional[int] = None
+    before_id: Optional[int] = None
+
+class KanbanCardMove(BaseModel):
+    """Move a service request card; fails with 409 if its status changed meanwhile"""
+    expected_status: str = Field(..., pattern=r'^(pending|in_progress|completed|picked_up|archived)$')
+    status: str = Field(..., pattern=r'^(pending|in_progress|completed|picked_up)$')
+
+class KanbanTaskResponse(BaseModel):
+    id: int
+    case_id: str
+    name: str
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    device_type: str
+    problem_description: str
+    urgency: str
+    status: str
+    rank: str
+    version: int
+    price: Optional[float] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    is_manual: bool = True
+    
+    class Config:
+        from_attributes = True
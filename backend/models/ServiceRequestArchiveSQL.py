@@ -0,0 +1,51 @@
+"""
+ServiceRequest Archive Model
+DataLab Georgia - cold storage for long-finished service requests
+
+Rows are moved here by utils/archiver.py and keep their original id and
+case_id, so `service_requests` only holds cases that are still being worked
+on or were finished recently.
+"""
+
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Numeric, Index
+from sqlalchemy import Integer
+from sqlalchemy.sql import func
+from database import Base
+from models.ServiceRequestSQL import DEVICE_TYPE, URGENCY, REQUEST_STATUS
+
+class ServiceRequestArchiveSQL(Base):
+    """Archived service requests - same columns as service_requests plus archived_at"""
+    __tablename__ = "service_requests_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(100), nullable=False)
+    email = Column(String(255), nullable=False)
+    phone = Column(String(20), nullable=False)
+    device_type = Column(DEVICE_TYPE, nullable=False)
+    problem_description = Column(Text, nullable=False)
+    urgency = Column(URGENCY, nullable=False)
+    status = Column(REQUEST_STATUS, nullable=False)
+    case_id = Column(String(20), unique=True, nullable=False)
+    created_at = Column(DateTime)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    estimated_completion = Column(DateTime, nullable=True)
+    price = Column(Numeric(10, 2), nullable=True)
+    is_read = Column(Boolean, default=True)
+    is_archived = Column(Boolean, default=True)
+    approved_for_kanban = Column(Boolean, default=False)
+    admin_comment = Column(Text, nullable=True)
+    customer_id = Column(Integer, nullable=True)
+    archived_at = Column(DateTime, default=func.now())
+
+    __table_args__ = (
+        # Archived list is paged newest first
+        Index('idx_service_requests_archive_created', 'created_at'),
+        Index('idx_service_requests_archive_customer', 'customer_id', 'created_at'),
+    )
+
+# Columns shared with service_requests, in declaration order
+ARCHIVED_COLUMNS = [
+    column.name for column in ServiceRequestArchiveSQL.__table__.columns
+    if column.name != 'archived_at'
+]
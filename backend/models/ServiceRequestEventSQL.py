@@ -0,0 +1,52 @@
+"""
+Service Request Event Models
+DataLab Georgia - append-only status transition log and its time-in-status rollup
+
+`service_request_events` gets one row per status change, written in the same
+transaction as the change itself (utils/status_events.py). Rows are never
+updated or deleted - archived and deleted cases keep their history - and are
+kept compact: the request id, the coded status and a timestamp.
+
+`status_time_daily` is what SLA reports read: per day (when the interval
+ended) and status, how many intervals closed, their total and longest
+duration and how many exceeded the status' SLA target. It is refreshed
+incrementally from the log; `job_watermarks` remembers the last event folded in.
+"""
+
+from sqlalchemy import Column, String, DateTime, Date, Float, Index
+from sqlalchemy import Integer
+from database import Base
+from models.ServiceRequestSQL import REQUEST_STATUS
+
+class ServiceRequestEventSQL(Base):
+    """A service request entering `status` at `ts`"""
+    __tablename__ = "service_request_events"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    request_id = Column(Integer, nullable=False)
+    status = Column(REQUEST_STATUS, nullable=False)
+    ts = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # A case's timeline in order - the rollup's window functions partition on it
+        Index('idx_service_request_events_case_ts', 'request_id', 'ts'),
+    )
+
+class StatusTimeDailySQL(Base):
+    """Time spent in each status, per day the interval ended"""
+    __tablename__ = "status_time_daily"
+
+    day = Column(Date, primary_key=True)
+    status = Column(REQUEST_STATUS, primary_key=True)
+    intervals = Column(Integer, nullable=False, default=0)
+    total_seconds = Column(Float, nullable=False, default=0)
+    max_seconds = Column(Float, nullable=False, default=0)
+    breached = Column(Integer, nullable=False, default=0)
+
+class JobWatermarkSQL(Base):
+    """Last source row an incremental job has processed"""
+    __tablename__ = "job_watermarks"
+
+    job = Column(String(50), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=True)
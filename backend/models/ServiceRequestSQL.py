@@ -3,14 +3,20 @@ ServiceRequest PostgreSQL Model
 DataLab Georgia - Migration from MongoDB to PostgreSQL
 """
 
-from sqlalchemy import Column, String, Text, DateTime, Boolean, Numeric, CheckConstraint
-from sqlalchemy import Integer
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Numeric, CheckConstraint, Index
+from sqlalchemy import Integer, text
 from sqlalchemy.sql import func
 from database import Base
+from models.coded_enum import CodedEnum
 from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel, Field
 
+# Stored as SMALLINT codes (models/coded_enum.py); alphabetical, append new values
+DEVICE_TYPE = CodedEnum(('hdd', 'other', 'raid', 'sd', 'ssd', 'usb'))
+URGENCY = CodedEnum(('critical', 'high', 'low', 'medium'))
+REQUEST_STATUS = CodedEnum(('archived', 'completed', 'in_progress', 'pending', 'picked_up'))
+
 class ServiceRequestSQL(Base):
     """PostgreSQL ORM model for service requests"""
     __tablename__ = "service_requests"
@@ -19,10 +25,10 @@ class ServiceRequestSQL(Base):
     name = Column(String(100), nullable=False)
     email = Column(String(255), nullable=False)
     phone = Column(String(20), nullable=False)
-    device_type = Column(String(50), nullable=False)
+    device_type = Column(DEVICE_TYPE, nullable=False)
     problem_description = Column(Text, nullable=False)
-    urgency = Column(String(20), nullable=False)
-    status = Column(String(20), default='pending')
+    urgency = Column(URGENCY, nullable=False)
+    status = Column(REQUEST_STATUS, default='pending')
     case_id = Column(String(20), unique=True, nullable=False)
     created_at = Column(DateTime, default=func.now())
     started_at = Column(DateTime, nullable=True)
@@ -33,12 +39,34 @@ class ServiceRequestSQL(Base):
     is_archived = Column(Boolean, default=False)
     approved_for_kanban = Column(Boolean, default=False)
     admin_comment = Column(Text, nullable=True)
+    # customers.id (utils/customers.py); NULL until linked by the backfill
+    customer_id = Column(Integer, nullable=True)
     
     # Add constraints
     __table_args__ = (
-        CheckConstraint('device_type IN (\'hdd\', \'ssd\', \'raid\', \'usb\', \'sd\', \'other\')', name='check_device_type'),
-        CheckConstraint('urgency IN (\'low\', \'medium\', \'high\', \'critical\')', name='check_urgency'),
-        CheckConstraint('status IN (\'pending\', \'in_progress\', \'completed\', \'picked_up\', \'archived\')', name='check_status'),
+        CheckConstraint(DEVICE_TYPE.check('device_type'), name='check_device_type'),
+        CheckConstraint(URGENCY.check('urgency'), name='check_urgency'),
+        CheckConstraint(REQUEST_STATUS.check('status'), name='check_status'),
+        # Kanban board: one range scan per column, newest first
+        Index('idx_service_requests_kanban', 'approved_for_kanban', 'status', 'created_at'),
+        # Admin listing filters/sorts (utils/query_filters.py); the listing
+        # always constrains is_archived, so it leads every index
+        Index('idx_service_requests_active_created', 'is_archived', 'created_at'),
+        Index('idx_service_requests_active_status', 'is_archived', 'status', 'created_at'),
+        Index('idx_service_requests_active_urgency', 'is_archived', 'urgency', 'created_at'),
+        Index('idx_service_requests_active_device', 'is_archived', 'device_type', 'created_at'),
+        Index('idx_service_requests_active_price', 'is_archived', 'price'),
+        # Customer history, newest first
+        Index('idx_service_requests_customer', 'customer_id', 'created_at'),
+        # Admin header unread counter (utils/admin_counters.py)
+        Index(
+            'idx_service_requests_unread', 'is_archived', 'is_read',
+            sqlite_where=text('is_read = 0 AND is_archived = 0'),
+            postgresql_where=text('is_read = false AND is_archived = false')
+        ),
+        # Archived cases keep their id in service_requests_archive, so SQLite
+        # must not reuse the ids of rows the archiver deleted
+        {'sqlite_autoincrement': True},
     )
 
 # Pydantic models for API
@@ -82,4 +110,18 @@ class ServiceRequestResponse(BaseModel):
     admin_comment: Optional[str] = None
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class CaseTrackingResponse(BaseModel):
+    """Public tracking projection - status fields only, no contact details"""
+    case_id: str
+    device_type: str
+    urgency: str
+    status: str
+    progress_percentage: int
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    estimated_completion: Optional[str] = None
+    price: Optional[float] = None
+    is_archived: bool
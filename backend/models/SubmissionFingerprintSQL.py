@@ -0,0 +1,30 @@
+"""
+Submission Fingerprint Model
+DataLab Georgia - recent form submissions by content hash (utils/duplicate_filter.py)
+
+One row per accepted service request / contact message: a SHA-256 of the
+normalized email, phone and text, and the response the submitter got, so a
+repeat within the duplicate window can be answered with the original result.
+Rows older than the window are pruned.
+"""
+
+from sqlalchemy import Column, String, Text, DateTime, Index
+from sqlalchemy import Integer
+from database import Base
+
+class SubmissionFingerprintSQL(Base):
+    """Fingerprints of recently accepted submissions"""
+    __tablename__ = "submission_fingerprints"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(String(20), nullable=False)
+    fingerprint = Column(String(64), nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        # Confirming a Bloom filter hit: one probe, newest first
+        Index('idx_submission_fingerprints_lookup', 'fingerprint', 'created_at'),
+        # Warm-up on start and pruning both range over created_at
+        Index('idx_submission_fingerprints_created', 'created_at'),
+    )
@@ -0,0 +1,56 @@
+"""
+Coded enum column type
+DataLab Georgia - small-integer storage for fixed string vocabularies
+
+`CodedEnum` stores one of a fixed set of strings as a SMALLINT code (its
+position in `values`) and hands the string back on load. Bound parameters
+go through the same mapping, so ORM code, filters and API payloads keep
+using 'pending', 'ssd', ... while every row and every index entry holds a
+1-2 byte integer instead of repeated text.
+
+Values are listed alphabetically, so ORDER BY on the code gives the same
+order the text column did. New values must be appended (codes are stored),
+which is the one place that order may drift.
+"""
+
+from typing import Sequence
+
+from sqlalchemy import SmallInteger, literal_column
+from sqlalchemy.types import TypeDecorator
+
+# Bound for values outside the vocabulary: matches no row in a filter and
+# fails the column's CHECK constraint on insert, as unknown text did before
+UNKNOWN_CODE = -1
+
+
+class CodedEnum(TypeDecorator):
+    """String vocabulary stored as SMALLINT codes"""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def __init__(self, values: Sequence[str]):
+        super().__init__()
+        self.values = tuple(values)
+        self._codes = {value: code for code, value in enumerate(self.values)}
+
+    @property
+    def python_type(self):
+        return str
+
+    def code(self, value: str) -> int:
+        return self._codes.get(value, UNKNOWN_CODE)
+
+    def check(self, column: str) -> str:
+        """CHECK constraint SQL allowing exactly the known codes"""
+        return f"{column} IN ({', '.join(str(code) for code in range(len(self.values)))})"
+
+    def literal(self, value: str):
+        """Inline code for `value` - for predicates that must match a partial index"""
+        return literal_column(str(self.code(value)))
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else self.code(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else self.values[value]
@@ -0,0 +1,206 @@
+"""
+Generic async repository with pre-built statements
+DataLab Georgia - one data-access path for service requests, contacts and testimonials
+
+Every statement a repository runs is built once per *shape* (selected fields,
+filtered columns, with/without LIMIT) with `bindparam()` placeholders for the
+values, then reused for every request. Because the statement object is the
+same, SQLAlchemy's memoized cache key and compiled-SQL cache are hit directly
+instead of rebuilding `select(...).where(...)` and re-deriving the cache key
+per call. Both the statement and the encoder caches are LRU-bounded at
+REPOSITORY_CACHE_SIZE shapes, since `?fields=` lets clients pick the shape.
+
+Reads select plain columns rather than ORM entities, so no identity-map
+objects are created, and `RowEncoder` turns the rows into the response-model
+shape (datetimes as ISO strings plus per-field converters) without building
+Pydantic objects; `response()` serializes them straight into a JSONResponse.
+"""
+
+import os
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Type, get_args
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import select, update, delete, func, bindparam, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from utils.field_selection import columns_for
+
+NO_SYNC = {"synchronize_session": False}
+REPOSITORY_CACHE_SIZE = int(os.environ.get('REPOSITORY_CACHE_SIZE', '256'))
+
+
+def _isoformat(value: datetime) -> str:
+    return value.isoformat()
+
+
+def _datetime_fields(response_model: Type[BaseModel]) -> List[str]:
+    return [
+        name for name, field in response_model.model_fields.items()
+        if field.annotation is datetime or datetime in get_args(field.annotation)
+    ]
+
+
+class RowEncoder:
+    """Maps column rows (in `names` order) to JSON-ready dicts"""
+
+    def __init__(self, names: Sequence[str], converters: Dict[str, Callable]):
+        self.names = tuple(names)
+        self._converters = tuple(
+            (index, converters[name]) for index, name in enumerate(self.names) if name in converters
+        )
+
+    def encode(self, row) -> dict:
+        values = list(row)
+        for index, convert in self._converters:
+            value = values[index]
+            if value is not None:
+                values[index] = convert(value)
+        return dict(zip(self.names, values))
+
+    def encode_all(self, rows: Iterable) -> List[dict]:
+        encode = self.encode
+        return [encode(row) for row in rows]
+
+
+class Repository:
+    """get / list / count / update / delete for one model, keyed on `key`"""
+
+    def __init__(self, model, response_model: Type[BaseModel],
+                 converters: Optional[Dict[str, Callable]] = None,
+                 key: str = 'id', order_by: str = 'created_at'):
+        self.model = model
+        self.fields = tuple(response_model.model_fields)
+        self.converters = {
+            **{name: _isoformat for name in _datetime_fields(response_model)},
+            **(converters or {})
+        }
+        self.key = key
+        self.order_by = order_by
+        self._statements: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._encoders: "OrderedDict[Tuple[str, ...], RowEncoder]" = OrderedDict()
+
+    # -- statement / encoder caches -------------------------------------------------
+
+    def _names(self, names: Optional[Sequence[str]]) -> Tuple[str, ...]:
+        return tuple(names) if names else self.fields
+
+    @staticmethod
+    def _cached(cache: OrderedDict, key: Hashable, build: Callable[[], Any]):
+        value = cache.get(key)
+        if value is None:
+            value = cache[key] = build()
+            if len(cache) > REPOSITORY_CACHE_SIZE:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        return value
+
+    def _statement(self, shape: Hashable, build: Callable[[], Any]):
+        return self._cached(self._statements, shape, build)
+
+    def _equals(self, columns: Iterable[str]) -> list:
+        return [getattr(self.model, name) == bindparam(f"eq_{name}") for name in columns]
+
+    def encoder(self, names: Optional[Sequence[str]] = None) -> RowEncoder:
+        names = self._names(names)
+        return self._cached(self._encoders, names, lambda: RowEncoder(names, self.converters))
+
+    def select(self, names: Optional[Sequence[str]] = None):
+        """Column select for `names` (default: every response field), for callers adding their own filters"""
+        names = self._names(names)
+        return self._statement(('select', names), lambda: select(*columns_for(self.model, names)))
+
+    # -- reads ----------------------------------------------------------------------
+
+    async def get(self, session: AsyncSession, value, names: Optional[Sequence[str]] = None,
+                  by: Optional[str] = None):
+        """First row whose `by` column (default: the key) equals `value`, or None"""
+        names = self._names(names)
+        by = by or self.key
+        stmt = self._statement(
+            ('get', names, by),
+            lambda: select(*columns_for(self.model, names)).where(getattr(self.model, by) == bindparam('value'))
+        )
+        result = await session.execute(stmt, {'value': value})
+        return result.first()
+
+    async def list(self, session: AsyncSession, offset: int = 0, limit: Optional[int] = None,
+                   names: Optional[Sequence[str]] = None, **equals) -> list:
+        """Rows newest first, filtered on column == value for each keyword"""
+        names = self._names(names)
+        columns = tuple(sorted(equals))
+
+        def build():
+            stmt = select(*columns_for(self.model, names)).where(*self._equals(columns)).order_by(
+                desc(getattr(self.model, self.order_by))
+            )
+            if limit is not None:
+                stmt = stmt.offset(bindparam('offset')).limit(bindparam('limit'))
+            return stmt
+
+        stmt = self._statement(('list', names, columns, limit is not None), build)
+        params = {f"eq_{name}": value for name, value in equals.items()}
+        if limit is not None:
+            params.update(offset=offset, limit=limit)
+        result = await session.execute(stmt, params)
+        return result.all()
+
+    async def count(self, session: AsyncSession, **equals) -> int:
+        columns = tuple(sorted(equals))
+        stmt = self._statement(
+            ('count', columns),
+            lambda: select(func.count()).select_from(self.model).where(*self._equals(columns))
+        )
+        return await session.scalar(stmt, {f"eq_{name}": value for name, value in equals.items()}) or 0
+
+    async def count_by(self, session: AsyncSession, column: str) -> Dict[Any, int]:
+        """Row count per distinct value of `column` - one GROUP BY"""
+        def build():
+            grouped = getattr(self.model, column)
+            return select(grouped, func.count()).group_by(grouped)
+        result = await session.execute(self._statement(('count_by', column), build))
+        return {value: count for value, count in result.all()}
+
+    # -- writes (the caller commits) ------------------------------------------------
+
+    async def update(self, session: AsyncSession, key_value, values: Dict[str, Any],
+                     returning: Sequence[str] = ('id',)):
+        """Apply `values` to the row with this key; returns the `returning` columns, or None if absent"""
+        columns = tuple(sorted(values))
+        returning = tuple(returning)
+
+        def build():
+            model_key = getattr(self.model, self.key)
+            return update(self.model).where(model_key == bindparam('key_value')).values({
+                name: bindparam(f"set_{name}", type_=getattr(self.model, name).type) for name in columns
+            }).returning(*columns_for(self.model, returning)).execution_options(**NO_SYNC)
+
+        stmt = self._statement(('update', columns, returning), build)
+        params = {f"set_{name}": value for name, value in values.items()}
+        params['key_value'] = key_value
+        result = await session.execute(stmt, params)
+        return result.first()
+
+    async def delete(self, session: AsyncSession, key_value, returning: Sequence[str] = ('id',)):
+        """Delete the row with this key; returns the `returning` columns, or None if absent"""
+        returning = tuple(returning)
+        stmt = self._statement(
+            ('delete', returning),
+            lambda: delete(self.model).where(
+                getattr(self.model, self.key) == bindparam('key_value')
+            ).returning(*columns_for(self.model, returning)).execution_options(**NO_SYNC)
+        )
+        result = await session.execute(stmt, {'key_value': key_value})
+        return result.first()
+
+    # -- responses ------------------------------------------------------------------
+
+    def response(self, rows, names: Optional[Sequence[str]] = None) -> JSONResponse:
+        """Serialize column rows selected for `names` as a JSON list"""
+        return JSONResponse(content=self.encoder(names).encode_all(rows))
+
+    def item_response(self, row, names: Optional[Sequence[str]] = None) -> JSONResponse:
+        return JSONResponse(content=self.encoder(names).encode(row))
@@ -0,0 +1,9 @@
+"""
+Contact message repository
+DataLab Georgia - contact form submissions
+"""
+
+from models.ContactMessageSQL import ContactMessageSQL, ContactMessageResponse
+from repositories.base import Repository
+
+contact_message_repo = Repository(ContactMessageSQL, ContactMessageResponse)
@@ -0,0 +1,9 @@
+"""
+Customer repository
+DataLab Georgia - customers deduplicated by normalized email / phone
+"""
+
+from models.CustomerSQL import CustomerSQL, CustomerResponse
+from repositories.base import Repository
+
+customer_repo = Repository(CustomerSQL, CustomerResponse, order_by='last_seen_at')
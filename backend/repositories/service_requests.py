@@ -0,0 +1,17 @@
+"""
+Service request repositories
+DataLab Georgia - hot table and archive tier share one response shape
+"""
+
+from models.ServiceRequestSQL import ServiceRequestSQL, ServiceRequestResponse
+from models.ServiceRequestArchiveSQL import ServiceRequestArchiveSQL
+from repositories.base import Repository
+from utils.field_selection import format_date, to_float
+
+SERVICE_REQUEST_CONVERTERS = {
+    'estimated_completion': format_date,
+    'price': to_float
+}
+
+service_request_repo = Repository(ServiceRequestSQL, ServiceRequestResponse, SERVICE_REQUEST_CONVERTERS)
+archived_request_repo = Repository(ServiceRequestArchiveSQL, ServiceRequestResponse, SERVICE_REQUEST_CONVERTERS)
@@ -0,0 +1,9 @@
+"""
+Testimonial repository
+DataLab Georgia - homepage testimonials
+"""
+
+from models.TestimonialSQL import TestimonialSQL, TestimonialResponse
+from repositories.base import Repository
+
+testimonial_repo = Repository(TestimonialSQL, TestimonialResponse)
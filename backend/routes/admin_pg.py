@@ -0,0 +1,229 @@
+"""
+Admin API Routes - PostgreSQL Version
+DataLab Georgia - dashboard bootstrap, header counters, logs and DB maintenance
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query, Header, Response, Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, text
+from pydantic import BaseModel
+from typing import List, Dict, Optional
+import logging
+
+from database import get_read_session
+from models.ServiceRequestSQL import ServiceRequestSQL, ServiceRequestResponse
+from models.ServiceRequestArchiveSQL import ServiceRequestArchiveSQL
+from models.ContactMessageSQL import ContactMessageSQL, ContactMessageResponse
+from models.TestimonialSQL import TestimonialSQL, TestimonialResponse
+from routes.service_requests_pg import archived_requests_query
+from repositories.service_requests import service_request_repo
+from repositories.contact_messages import contact_message_repo
+from repositories.testimonials import testimonial_repo
+from utils.structured_logging import log_pipeline
+from utils.admin_counters import admin_counters
+from utils.single_flight import single_flight
+from utils.deadlines import request_timeouts
+from utils.duplicate_filter import duplicate_filter
+from utils.status_events import status_stats, sla_report
+from utils.analytics_export import analytics_exporter
+
+router = APIRouter()
+
+# Pydantic models
+class AdminSummary(BaseModel):
+    service_requests: Dict[str, int]
+    active_total: int
+    archived_total: int
+    contacts: Dict[str, int]
+    testimonials: Dict[str, int]
+
+class AdminBootstrapResponse(BaseModel):
+    service_requests: List[ServiceRequestResponse]
+    archived_requests: List[ServiceRequestResponse]
+    contact_messages: List[ContactMessageResponse]
+    testimonials: List[TestimonialResponse]
+    stats: Dict[str, int]
+    summary: AdminSummary
+
+async def _grouped_counts(session: AsyncSession, column) -> Dict:
+    result = await session.execute(
+        select(column, func.count()).group_by(column)
+    )
+    return {key: count for key, count in result.all()}
+
+@router.get("/bootstrap", response_model=AdminBootstrapResponse)
+async def get_admin_bootstrap(
+    requests_limit: int = Query(100, ge=1, le=500),
+    archived_limit: int = Query(100, ge=1, le=500),
+    contacts_limit: int = Query(100, ge=1, le=500),
+    # The panel manages every testimonial, as /api/testimonials/all returned
+    testimonials_limit: Optional[int] = Query(None, ge=1),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """Everything the admin panel renders on load, from one consistent snapshot"""
+    try:
+        # All reads share one connection; they only see one snapshot inside a
+        # transaction. PostgreSQL needs REPEATABLE READ for that, and pysqlite
+        # doesn't BEGIN for SELECTs, so open the SQLite read transaction here
+        if session.bind.dialect.name == 'postgresql':
+            await session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+        else:
+            await session.execute(text("BEGIN"))
+
+        # Summary counts - one GROUP BY per table
+        request_counts = await session.execute(
+            select(
+                ServiceRequestSQL.status,
+                ServiceRequestSQL.is_archived,
+                func.count()
+            ).group_by(ServiceRequestSQL.status, ServiceRequestSQL.is_archived)
+        )
+        by_status: Dict[str, int] = {}
+        active_total = 0
+        flagged_archived = 0
+        for status, is_archived, count in request_counts.all():
+            if is_archived:
+                flagged_archived += count
+            else:
+                by_status[status] = by_status.get(status, 0) + count
+                active_total += count
+        cold_archived = await session.scalar(select(func.count(ServiceRequestArchiveSQL.id)))
+
+        contact_counts = await _grouped_counts(session, ContactMessageSQL.status)
+        testimonial_counts = await _grouped_counts(session, TestimonialSQL.is_active)
+
+        # Bounded first pages, newest first
+        rows = await service_request_repo.list(session, 0, requests_limit, is_archived=False)
+        service_requests = service_request_repo.encoder().encode_all(rows)
+
+        names = list(service_request_repo.fields)
+        result = await session.execute(archived_requests_query(names).limit(archived_limit))
+        archived_requests = service_request_repo.encoder(names).encode_all(result.all())
+
+        rows = await contact_message_repo.list(session, 0, contacts_limit)
+        contact_messages = contact_message_repo.encoder().encode_all(rows)
+
+        rows = await testimonial_repo.list(session, 0, testimonials_limit)
+        testimonials = testimonial_repo.encoder().encode_all(rows)
+
+        # Rows are already in response shape - skip re-validating them
+        return JSONResponse(content={
+            "service_requests": service_requests,
+            "archived_requests": archived_requests,
+            "contact_messages": contact_messages,
+            "testimonials": testimonials,
+            # Same shape as GET /api/contact/stats
+            "stats": {
+                "total": sum(contact_counts.values()),
+                "new": contact_counts.get('new', 0),
+                "read": contact_counts.get('read', 0),
+                "replied": contact_counts.get('replied', 0)
+            },
+            "summary": {
+                "service_requests": by_status,
+                "active_total": active_total,
+                "archived_total": flagged_archived + (cold_archived or 0),
+                "contacts": contact_counts,
+                "testimonials": {
+                    "active": testimonial_counts.get(True, 0),
+                    "inactive": testimonial_counts.get(False, 0)
+                }
+            }
+        })
+
+    except Exception as e:
+        logging.error(f"Error getting admin bootstrap data: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve admin data")
+
+@router.get("/counters", response_model=dict)
+async def get_admin_counters(
+    response: Response,
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """Unread service requests / new contact messages; 304 while unchanged"""
+    # The session only opens a connection on first use, so a 304 costs no DB work
+    if admin_counters.is_current(if_none_match):
+        admin_counters.not_modified += 1
+        return Response(status_code=304, headers={"ETag": admin_counters.etag, "Cache-Control": "no-cache"})
+    try:
+        counts = await admin_counters.get(session)
+        response.headers["ETag"] = admin_counters.etag
+        response.headers["Cache-Control"] = "no-cache"
+        return {"version": admin_counters.etag.strip('"'), **counts}
+
+    except Exception as e:
+        logging.error(f"Error getting admin counters: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve admin counters")
+
+@router.get("/logs/errors", response_model=dict)
+async def get_recent_errors(limit: int = Query(50, ge=1, le=500)):
+    """Most recent ERROR-level log records (newest first) and logging pipeline stats"""
+    return {
+        "errors": log_pipeline.errors.recent(limit),
+        "pipeline": log_pipeline.stats()
+    }
+
+@router.get("/coalescing", response_model=dict)
+async def get_coalescing_stats():
+    """How many identical concurrent GETs were served from a shared query"""
+    return single_flight.stats()
+
+@router.get("/timeouts", response_model=dict)
+async def get_request_timeouts():
+    """Requests cut off by their deadline, per route"""
+    return request_timeouts.stats()
+
+@router.get("/duplicates", response_model=dict)
+async def get_duplicate_filter_stats():
+    """Submissions checked, cleared in memory, confirmed in the DB and merged as duplicates"""
+    return duplicate_filter.stats()
+
+@router.get("/sla", response_model=dict)
+async def get_sla_report(
+    days: int = Query(30, ge=1, le=366),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """Average / longest time in each status and SLA breaches, from the daily rollup"""
+    try:
+        report = await sla_report(session, days)
+        report["refresher"] = status_stats.stats()
+        return report
+    except Exception as e:
+        logging.error(f"Error getting SLA report: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve SLA report")
+
+@router.post("/sla/refresh", response_model=dict)
+async def refresh_sla_rollup():
+    """Fold status events logged since the last refresh into the rollup now"""
+    return await status_stats.run_once()
+
+@router.get("/analytics", response_model=dict)
+async def get_analytics():
+    """Precomputed BI aggregates from the Parquet export - never queries the database"""
+    return {"aggregates": analytics_exporter.aggregates, "export": analytics_exporter.stats()}
+
+@router.post("/analytics/export", response_model=dict)
+async def run_analytics_export():
+    """Append rows added since the last export and recompute the aggregates now"""
+    return await analytics_exporter.run_once()
+
+@router.get("/maintenance", response_model=dict)
+async def get_maintenance_report(request: Request):
+    """SQLite file size, freelist/fragmentation and the last maintenance runs"""
+    try:
+        return await request.app.state.sqlite_maintenance.report()
+    except Exception as e:
+        logging.error(f"Error getting maintenance report: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve maintenance report")
+
+@router.post("/maintenance/{task}", response_model=dict)
+async def run_maintenance_task(task: str, request: Request):
+    """Run one maintenance task now: optimize, checkpoint or vacuum"""
+    maintenance = request.app.state.sqlite_maintenance
+    if not maintenance.enabled:
+        raise HTTPException(status_code=400, detail="Maintenance is only available for SQLite")
+    if task not in ("optimize", "checkpoint", "vacuum"):
+        raise HTTPException(status_code=404, detail="Unknown maintenance task")
+    return await getattr(maintenance, task)()
@@ -3,13 +3,20 @@ Contact API Routes - PostgreSQL Version
 DataLab Georgia - Migration from MongoDB to PostgreSQL
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, desc
 from typing import List, Optional
 import logging
 
-from database import get_session
+from database import get_write_session, get_read_session
+from utils.rate_limit import rate_limit
+from utils.idempotency import idempotency_store
+from utils.write_batcher import get_group_commit_writer
+from utils.admin_counters import admin_counters
+from utils.customers import assign_customer
+from utils.duplicate_filter import duplicate_filter, fingerprint as duplicate_fingerprint
+from utils.field_selection import parse_fields
+from repositories.contact_messages import contact_message_repo
 from models.ContactMessageSQL import (
     ContactMessageSQL,
     ContactMessageCreate,
@@ -19,12 +26,34 @@ from models.ContactMessageSQL import (
 
 router = APIRouter()
 
-@router.post("/", response_model=dict)
+@router.post("/", response_model=dict, dependencies=[Depends(rate_limit("contact"))])
 async def create_contact_message(
     message: ContactMessageCreate,
-    session: AsyncSession = Depends(get_session)
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    session: AsyncSession = Depends(get_write_session)
 ):
-    """Create a new contact message"""
+    """Create a new contact message (a repeated Idempotency-Key replays the first result)
+
+    A resubmission of the same message within the duplicate window is merged
+    into the original (utils/duplicate_filter.py).
+    """
+    fingerprint = duplicate_fingerprint("contact", message.email, message.phone, message.subject, message.message)
+    return await idempotency_store.run(
+        "contact",
+        idempotency_key,
+        message.dict(),
+        lambda: duplicate_filter.run(
+            "contact",
+            fingerprint,
+            session,
+            lambda record: _create_contact_message(message, session, record),
+            response
+        ),
+        response
+    )
+
+async def _create_contact_message(message: ContactMessageCreate, session: AsyncSession, record=None) -> dict:
     try:
         new_message = ContactMessageSQL(
             name=message.name,
@@ -34,15 +63,30 @@ async def create_contact_message(
             message=message.message
         )
         
-        session.add(new_message)
-        await session.commit()
-        await session.refresh(new_message)
+        def response_for(row) -> dict:
+            return {
+                "success": True,
+                "message": "Contact message sent successfully",
+                "id": row.id
+            }
+
+        def followups(row) -> list:
+            # Fingerprint for the duplicate filter, committed with the message
+            return [record(response_for(row))] if record is not None else []
+
+        writer = get_group_commit_writer()
+        if writer is not None:
+            new_message = await writer.submit(new_message, followups)
+        else:
+            await assign_customer(session, new_message)
+            session.add(new_message)
+            # Assigns the id the response (and its fingerprint) carries
+            await session.flush()
+            session.add_all(followups(new_message))
+            await session.commit()
+        admin_counters.invalidate()
         
-        return {
-            "success": True,
-            "message": "Contact message sent successfully",
-            "id": new_message.id
-        }
+        return response_for(new_message)
         
     except Exception as e:
         await session.rollback()
@@ -54,35 +98,15 @@ async def get_all_contact_messages(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     status: Optional[str] = Query(None),
-    session: AsyncSession = Depends(get_session)
+    fields: Optional[str] = Query(None, description="Comma-separated response fields"),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get all contact messages with optional filtering"""
+    names = parse_fields(fields, ContactMessageResponse)
     try:
-        query = select(ContactMessageSQL).order_by(desc(ContactMessageSQL.created_at))
-        
-        if status:
-            query = query.where(ContactMessageSQL.status == status)
-            
-        query = query.offset(skip).limit(limit)
-        
-        result = await session.execute(query)
-        messages = result.scalars().all()
-        
-        # Convert to response format
-        response_data = []
-        for msg in messages:
-            response_data.append(ContactMessageResponse(
-                id=msg.id,
-                name=msg.name,
-                email=msg.email,
-                phone=msg.phone,
-                subject=msg.subject,
-                message=msg.message,
-                created_at=msg.created_at,
-                status=msg.status
-            ))
-        
-        return response_data
+        filters = {"status": status} if status else {}
+        rows = await contact_message_repo.list(session, skip, limit, names, **filters)
+        return contact_message_repo.response(rows, names)
         
     except Exception as e:
         logging.error(f"Error getting contact messages: {e}")
@@ -90,43 +114,18 @@ async def get_all_contact_messages(
 
 @router.get("/stats", response_model=dict)
 async def get_contact_stats(
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get contact message statistics for admin dashboard"""
     try:
-        from sqlalchemy import func
-        
-        # Total messages
-        total_count = await session.scalar(
-            select(func.count(ContactMessageSQL.id))
-        )
-        
-        # New messages (unread)
-        new_count = await session.scalar(
-            select(func.count(ContactMessageSQL.id)).where(
-                ContactMessageSQL.status == 'new'
-            )
-        )
-        
-        # Read messages
-        read_count = await session.scalar(
-            select(func.count(ContactMessageSQL.id)).where(
-                ContactMessageSQL.status == 'read'
-            )
-        )
-        
-        # Replied messages
-        replied_count = await session.scalar(
-            select(func.count(ContactMessageSQL.id)).where(
-                ContactMessageSQL.status == 'replied'
-            )
-        )
+        # One GROUP BY instead of a COUNT per status
+        counts = await contact_message_repo.count_by(session, 'status')
         
         return {
-            "total": total_count or 0,
-            "new": new_count or 0,
-            "read": read_count or 0,
-            "replied": replied_count or 0
+            "total": sum(counts.values()),
+            "new": counts.get('new', 0),
+            "read": counts.get('read', 0),
+            "replied": counts.get('replied', 0)
         }
         
     except Exception as e:
@@ -136,27 +135,16 @@ async def get_contact_stats(
 @router.get("/{message_id}", response_model=ContactMessageResponse)
 async def get_contact_message(
     message_id: str,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get contact message by ID"""
     try:
-        query = select(ContactMessageSQL).where(ContactMessageSQL.id == message_id)
-        result = await session.execute(query)
-        message = result.scalar_one_or_none()
+        message = await contact_message_repo.get(session, message_id)
         
         if not message:
             raise HTTPException(status_code=404, detail="Contact message not found")
         
-        return ContactMessageResponse(
-            id=message.id,
-            name=message.name,
-            email=message.email,
-            phone=message.phone,
-            subject=message.subject,
-            message=message.message,
-            created_at=message.created_at,
-            status=message.status
-        )
+        return contact_message_repo.item_response(message)
         
     except HTTPException:
         raise
@@ -168,27 +156,22 @@ async def get_contact_message(
 async def update_contact_message(
     message_id: str,
     message_update: ContactMessageUpdate,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
     """Update contact message status"""
     try:
-        # Check if message exists
-        query = select(ContactMessageSQL).where(ContactMessageSQL.id == message_id)
-        result = await session.execute(query)
-        existing_message = result.scalar_one_or_none()
+        update_data = message_update.dict(exclude_unset=True)
+        if update_data:
+            updated = await contact_message_repo.update(session, message_id, update_data)
+        else:
+            updated = await contact_message_repo.get(session, message_id, ['id'])
         
-        if not existing_message:
+        if not updated:
             raise HTTPException(status_code=404, detail="Contact message not found")
         
-        # Update fields
-        update_data = message_update.dict(exclude_unset=True)
         if update_data:
-            stmt = update(ContactMessageSQL).where(
-                ContactMessageSQL.id == message_id
-            ).values(**update_data)
-            
-            await session.execute(stmt)
             await session.commit()
+            admin_counters.invalidate()
         
         return {"success": True, "message": "Contact message updated successfully"}
         
@@ -202,22 +185,17 @@ async def update_contact_message(
 @router.delete("/{message_id}", response_model=dict)
 async def delete_contact_message(
     message_id: str,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
     """Delete contact message"""
     try:
-        # Check if message exists
-        query = select(ContactMessageSQL).where(ContactMessageSQL.id == message_id)
-        result = await session.execute(query)
-        existing_message = result.scalar_one_or_none()
+        deleted = await contact_message_repo.delete(session, message_id)
         
-        if not existing_message:
+        if not deleted:
             raise HTTPException(status_code=404, detail="Contact message not found")
         
-        # Delete message
-        stmt = delete(ContactMessageSQL).where(ContactMessageSQL.id == message_id)
-        await session.execute(stmt)
         await session.commit()
+        admin_counters.invalidate()
         
         return {"success": True, "message": "Contact message deleted successfully"}
         
@@ -226,4 +204,4 @@ async def delete_contact_message(
     except Exception as e:
         await session.rollback()
         logging.error(f"Error deleting contact message {message_id}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to delete contact message")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to delete contact message")
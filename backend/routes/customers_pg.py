@@ -0,0 +1,87 @@
+"""
+Customers API Routes - PostgreSQL Version
+DataLab Georgia - customer lookup by email/phone and repeat-customer history
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import logging
+
+from database import get_read_session
+from models.CustomerSQL import CustomerResponse, CustomerHistoryResponse
+from repositories.customers import customer_repo
+from repositories.service_requests import service_request_repo, archived_request_repo
+from repositories.contact_messages import contact_message_repo
+from utils.customers import customer_backfill, normalize_email, normalize_phone
+
+router = APIRouter()
+
+@router.get("/lookup", response_model=CustomerResponse)
+async def lookup_customer(
+    email: Optional[str] = Query(None),
+    phone: Optional[str] = Query(None),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """Find a customer by email or phone (normalized the same way as on submission)"""
+    if not email and not normalize_phone(phone):
+        raise HTTPException(status_code=400, detail="Provide email or phone")
+    try:
+        row = None
+        if email:
+            row = await customer_repo.get(session, normalize_email(email), by='email_key')
+        if row is None and normalize_phone(phone):
+            row = await customer_repo.get(session, normalize_phone(phone), by='phone_key')
+        if row is None:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        return customer_repo.item_response(row)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error looking up customer: {e}")
+        raise HTTPException(status_code=500, detail="Failed to look up customer")
+
+@router.get("/backfill/status", response_model=dict)
+async def get_backfill_status():
+    """Progress of linking pre-existing requests and messages to customers"""
+    return customer_backfill.stats()
+
+@router.post("/backfill/run", response_model=dict)
+async def run_backfill():
+    """Link any rows that still have no customer now"""
+    return await customer_backfill.run_once()
+
+@router.get("/{customer_id}/history", response_model=CustomerHistoryResponse)
+async def get_customer_history(
+    customer_id: int,
+    session: AsyncSession = Depends(get_read_session)
+):
+    """All of a customer's service requests (active and archived) and messages, newest first"""
+    try:
+        customer = await customer_repo.get(session, customer_id)
+        if customer is None:
+            raise HTTPException(status_code=404, detail="Customer not found")
+
+        # Each is a range scan on its (customer_id, created_at) index
+        active = await service_request_repo.list(session, customer_id=customer_id)
+        archived = await archived_request_repo.list(session, customer_id=customer_id)
+        messages = await contact_message_repo.list(session, customer_id=customer_id)
+
+        service_requests = sorted(
+            service_request_repo.encoder().encode_all(active) + archived_request_repo.encoder().encode_all(archived),
+            key=lambda request: request['created_at'] or '',
+            reverse=True
+        )
+        return JSONResponse(content={
+            "customer": customer_repo.encoder().encode(customer),
+            "service_requests": service_requests,
+            "contact_messages": contact_message_repo.encoder().encode_all(messages)
+        })
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logging.error(f"Error getting history for customer {customer_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve customer history")
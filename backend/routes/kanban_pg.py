@@ -0,0 +1,454 @@
+"""
+Kanban Board API Routes - PostgreSQL Version
+DataLab Georgia - board projection, manual tasks and optimistic-concurrency moves
+"""
+
+from fastapi import APIRouter, HTTPException, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, desc, func
+from pydantic import BaseModel
+from typing import List, Optional, Dict
+from datetime import datetime
+import logging
+
+from database import get_write_session, get_read_session
+from models.ServiceRequestSQL import ServiceRequestSQL
+from models.KanbanTaskSQL import (
+    KanbanTaskSQL,
+    KanbanTaskCreate,
+    KanbanTaskUpdate,
+    KanbanTaskMove,
+    KanbanCardMove,
+    KanbanTaskResponse
+)
+from utils.case_generator import format_case_id, next_case_number
+from utils.case_tracking import invalidate_case
+from utils.admin_counters import admin_counters
+from utils.rank import rank_between, evenly_spaced, RANK_MAX_LENGTH
+from utils.status_events import record_transition
+
+router = APIRouter()
+
+# Board columns in display order; "done" columns grow forever and are paginated
+KANBAN_COLUMNS = ['pending', 'in_progress', 'completed', 'picked_up']
+DONE_COLUMNS = {'completed', 'picked_up'}
+
+# Slim card projection - no problem_description/admin_comment text
+CARD_COLUMNS = (
+    ServiceRequestSQL.id,
+    ServiceRequestSQL.case_id,
+    ServiceRequestSQL.name,
+    ServiceRequestSQL.device_type,
+    ServiceRequestSQL.urgency,
+    ServiceRequestSQL.status,
+    ServiceRequestSQL.price,
+    ServiceRequestSQL.created_at,
+    ServiceRequestSQL.started_at,
+    ServiceRequestSQL.completed_at,
+    ServiceRequestSQL.estimated_completion,
+    ServiceRequestSQL.admin_comment.isnot(None).label('has_admin_comment'),
+)
+
+# Pydantic models
+class KanbanCard(BaseModel):
+    id: int
+    case_id: str
+    name: str
+    device_type: str
+    urgency: str
+    status: str
+    price: Optional[float] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    estimated_completion: Optional[str] = None
+    has_admin_comment: bool = False
+
+class KanbanColumn(BaseModel):
+    id: str
+    count: int
+    offset: int
+    limit: int
+    has_more: bool
+    items: List[KanbanCard]
+
+class KanbanBoardResponse(BaseModel):
+    columns: List[KanbanColumn]
+    total: int
+
+def _card(row) -> dict:
+    return {
+        "id": row.id,
+        "case_id": row.case_id,
+        "name": row.name,
+        "device_type": row.device_type,
+        "urgency": row.urgency,
+        "status": row.status,
+        "price": float(row.price) if row.price else None,
+        "created_at": row.created_at,
+        "started_at": row.started_at,
+        "completed_at": row.completed_at,
+        "estimated_completion": row.estimated_completion.strftime('%Y-%m-%d') if row.estimated_completion else None,
+        "has_admin_comment": bool(row.has_admin_comment)
+    }
+
+async def _column_counts(session: AsyncSession) -> Dict[str, int]:
+    result = await session.execute(
+        select(ServiceRequestSQL.status, func.count(ServiceRequestSQL.id)).where(
+            ServiceRequestSQL.approved_for_kanban == True
+        ).group_by(ServiceRequestSQL.status)
+    )
+    return {status: count for status, count in result.all()}
+
+async def _load_column(session: AsyncSession, status: str, count: int, offset: int, limit: int) -> dict:
+    # Served by idx_service_requests_kanban (approved_for_kanban, status, created_at)
+    items = []
+    if count > offset:
+        result = await session.execute(
+            select(*CARD_COLUMNS).where(
+                ServiceRequestSQL.approved_for_kanban == True,
+                ServiceRequestSQL.status == status
+            ).order_by(desc(ServiceRequestSQL.created_at)).offset(offset).limit(limit)
+        )
+        items = [_card(row) for row in result.all()]
+    return {
+        "id": status,
+        "count": count,
+        "offset": offset,
+        "limit": limit,
+        "has_more": offset + len(items) < count,
+        "items": items
+    }
+
+@router.get("/board", response_model=KanbanBoardResponse)
+async def get_kanban_board(
+    limit: int = Query(200, ge=1, le=1000),
+    done_limit: int = Query(20, ge=1, le=200),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """Get approved service requests grouped into Kanban columns"""
+    try:
+        counts = await _column_counts(session)
+        columns = []
+        for status in KANBAN_COLUMNS:
+            column_limit = done_limit if status in DONE_COLUMNS else limit
+            columns.append(await _load_column(session, status, counts.get(status, 0), 0, column_limit))
+
+        return {
+            "columns": columns,
+            "total": sum(counts.get(status, 0) for status in KANBAN_COLUMNS)
+        }
+
+    except Exception as e:
+        logging.error(f"Error getting kanban board: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve kanban board")
+
+@router.get("/board/{column_id}", response_model=KanbanColumn)
+async def get_kanban_column(
+    column_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=200),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """Get one page of a Kanban column (e.g. older completed cards)"""
+    if column_id not in KANBAN_COLUMNS:
+        raise HTTPException(status_code=404, detail="Kanban column not found")
+    try:
+        count = await session.scalar(
+            select(func.count(ServiceRequestSQL.id)).where(
+                ServiceRequestSQL.approved_for_kanban == True,
+                ServiceRequestSQL.status == column_id
+            )
+        )
+        return await _load_column(session, column_id, count or 0, offset, limit)
+
+    except Exception as e:
+        logging.error(f"Error getting kanban column {column_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve kanban column")
+
+# Manual Kanban tasks
+
+def _task_response(task) -> KanbanTaskResponse:
+    return KanbanTaskResponse(
+        id=task.id,
+        case_id=task.case_id,
+        name=task.name,
+        email=task.email,
+        phone=task.phone,
+        device_type=task.device_type,
+        problem_description=task.problem_description,
+        urgency=task.urgency,
+        status=task.status,
+        rank=task.rank,
+        version=task.version,
+        price=float(task.price) if task.price else None,
+        created_at=task.created_at,
+        updated_at=task.updated_at,
+        started_at=task.started_at,
+        completed_at=task.completed_at
+    )
+
+def _version_conflict(current_version: int):
+    return HTTPException(
+        status_code=409,
+        detail={"message": "Task was modified by someone else", "current_version": current_version}
+    )
+
+async def _last_rank(session: AsyncSession, status: str, exclude_id: Optional[int] = None) -> Optional[str]:
+    query = select(func.max(KanbanTaskSQL.rank)).where(KanbanTaskSQL.status == status)
+    if exclude_id is not None:
+        query = query.where(KanbanTaskSQL.id != exclude_id)
+    return await session.scalar(query)
+
+async def _rebalance_column(session: AsyncSession, status: str):
+    """Re-spread a column's ranks once keys have grown too long (rare, bumps versions)"""
+    result = await session.execute(
+        select(KanbanTaskSQL.id).where(KanbanTaskSQL.status == status).order_by(KanbanTaskSQL.rank)
+    )
+    ids = result.scalars().all()
+    for task_id, rank in zip(ids, evenly_spaced(len(ids))):
+        await session.execute(
+            update(KanbanTaskSQL).where(KanbanTaskSQL.id == task_id).values(
+                rank=rank, version=KanbanTaskSQL.version + 1
+            )
+        )
+
+@router.get("/tasks", response_model=List[KanbanTaskResponse])
+async def get_kanban_tasks(
+    status: Optional[str] = Query(None),
+    session: AsyncSession = Depends(get_read_session)
+):
+    """Get manual Kanban tasks in column order"""
+    try:
+        query = select(KanbanTaskSQL).order_by(KanbanTaskSQL.status, KanbanTaskSQL.rank)
+        if status:
+            query = query.where(KanbanTaskSQL.status == status)
+        
+        result = await session.execute(query)
+        return [_task_response(task) for task in result.scalars().all()]
+        
+    except Exception as e:
+        logging.error(f"Error getting kanban tasks: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve kanban tasks")
+
+@router.post("/tasks", response_model=KanbanTaskResponse)
+async def create_kanban_task(
+    task: KanbanTaskCreate,
+    session: AsyncSession = Depends(get_write_session)
+):
+    """Create a manual Kanban task at the bottom of the pending column"""
+    try:
+        year = datetime.now().year
+        number = await next_case_number(session, year, "KB", KanbanTaskSQL.case_id)
+        
+        new_task = KanbanTaskSQL(
+            case_id=format_case_id(year, number, "KB"),
+            name=task.name,
+            email=task.email,
+            phone=task.phone,
+            device_type=task.device_type,
+            problem_description=task.problem_description,
+            urgency=task.urgency,
+            price=task.price,
+            status='pending',
+            rank=rank_between(await _last_rank(session, 'pending'), None),
+            version=1
+        )
+        
+        session.add(new_task)
+        await session.commit()
+        await session.refresh(new_task)
+        
+        return _task_response(new_task)
+        
+    except Exception as e:
+        await session.rollback()
+        logging.error(f"Error creating kanban task: {e}")
+        raise HTTPException(status_code=500, detail="Failed to create kanban task")
+
+@router.put("/tasks/{task_id}", response_model=KanbanTaskResponse)
+async def update_kanban_task(
+    task_id: int,
+    task_update: KanbanTaskUpdate,
+    session: AsyncSession = Depends(get_write_session)
+):
+    """Update task details; 409 if `version` is not the current version"""
+    try:
+        update_data = task_update.dict(exclude_unset=True)
+        expected_version = update_data.pop('version')
+        
+        result = await session.execute(
+            update(KanbanTaskSQL).where(
+                KanbanTaskSQL.id == task_id,
+                KanbanTaskSQL.version == expected_version
+            ).values(version=KanbanTaskSQL.version + 1, **update_data)
+        )
+        task = await session.get(KanbanTaskSQL, task_id, populate_existing=True)
+        if not task:
+            raise HTTPException(status_code=404, detail="Kanban task not found")
+        if result.rowcount == 0:
+            raise _version_conflict(task.version)
+        
+        await session.commit()
+        return _task_response(task)
+        
+    except HTTPException:
+        await session.rollback()
+        raise
+    except Exception as e:
+        await session.rollback()
+        logging.error(f"Error updating kanban task {task_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to update kanban task")
+
+@router.put("/tasks/{task_id}/move", response_model=KanbanTaskResponse)
+async def move_kanban_task(
+    task_id: int,
+    move: KanbanTaskMove,
+    session: AsyncSession = Depends(get_write_session)
+):
+    """Move a task between/within columns - a compare-and-swap on one row"""
+    try:
+        # Neighbour ranks decide the new position; stale neighbours mean a stale board
+        neighbour_ids = [i for i in (move.after_id, move.before_id) if i is not None]
+        ranks = {}
+        if neighbour_ids:
+            result = await session.execute(
+                select(KanbanTaskSQL.id, KanbanTaskSQL.status, KanbanTaskSQL.rank).where(
+                    KanbanTaskSQL.id.in_(neighbour_ids)
+                )
+            )
+            for neighbour_id, status, rank in result.all():
+                if status == move.status:
+                    ranks[neighbour_id] = rank
+            if len(ranks) != len(neighbour_ids):
+                raise HTTPException(status_code=409, detail="Board changed, please reload")
+        
+        after_rank = ranks.get(move.after_id)
+        before_rank = ranks.get(move.before_id)
+        if not neighbour_ids:
+            after_rank = await _last_rank(session, move.status, exclude_id=task_id)
+        try:
+            new_rank = rank_between(after_rank, before_rank)
+        except ValueError:
+            raise HTTPException(status_code=409, detail="Board changed, please reload")
+        
+        values = {
+            "status": move.status,
+            "rank": new_rank,
+            "version": KanbanTaskSQL.version + 1
+        }
+        if move.status == 'in_progress':
+            values["started_at"] = func.coalesce(KanbanTaskSQL.started_at, func.now())
+        elif move.status == 'completed':
+            values["completed_at"] = func.coalesce(KanbanTaskSQL.completed_at, func.now())
+        
+        result = await session.execute(
+            update(KanbanTaskSQL).where(
+                KanbanTaskSQL.id == task_id,
+                KanbanTaskSQL.version == move.version
+            ).values(**values)
+        )
+        if result.rowcount == 0:
+            current_version = await session.scalar(
+                select(KanbanTaskSQL.version).where(KanbanTaskSQL.id == task_id)
+            )
+            if current_version is None:
+                raise HTTPException(status_code=404, detail="Kanban task not found")
+            raise _version_conflict(current_version)
+        
+        if len(new_rank) > RANK_MAX_LENGTH:
+            await _rebalance_column(session, move.status)
+        
+        await session.commit()
+        task = await session.get(KanbanTaskSQL, task_id, populate_existing=True)
+        return _task_response(task)
+        
+    except HTTPException:
+        await session.rollback()
+        raise
+    except Exception as e:
+        await session.rollback()
+        logging.error(f"Error moving kanban task {task_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to move kanban task")
+
+@router.delete("/tasks/{task_id}", response_model=dict)
+async def delete_kanban_task(
+    task_id: int,
+    version: Optional[int] = Query(None),
+    session: AsyncSession = Depends(get_write_session)
+):
+    """Delete a task; with `version`, only if nobody changed it meanwhile"""
+    try:
+        stmt = delete(KanbanTaskSQL).where(KanbanTaskSQL.id == task_id)
+        if version is not None:
+            stmt = stmt.where(KanbanTaskSQL.version == version)
+        
+        result = await session.execute(stmt)
+        if result.rowcount == 0:
+            current_version = await session.scalar(
+                select(KanbanTaskSQL.version).where(KanbanTaskSQL.id == task_id)
+            )
+            if current_version is None:
+                raise HTTPException(status_code=404, detail="Kanban task not found")
+            raise _version_conflict(current_version)
+        
+        await session.commit()
+        return {"success": True, "message": "Kanban task deleted successfully"}
+        
+    except HTTPException:
+        await session.rollback()
+        raise
+    except Exception as e:
+        await session.rollback()
+        logging.error(f"Error deleting kanban task {task_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to delete kanban task")
+
+@router.put("/cards/{request_id}/move", response_model=dict)
+async def move_service_request_card(
+    request_id: int,
+    move: KanbanCardMove,
+    session: AsyncSession = Depends(get_write_session)
+):
+    """Move a service request card; 409 if its status is no longer `expected_status`"""
+    try:
+        result = await session.execute(
+            select(ServiceRequestSQL.case_id, ServiceRequestSQL.status).where(
+                ServiceRequestSQL.id == request_id
+            )
+        )
+        existing = result.first()
+        if not existing:
+            raise HTTPException(status_code=404, detail="Service request not found")
+        
+        # Logged only if the card is still where the mover saw it; a 409 rolls it back
+        await record_transition(session, request_id, move.status, expected=move.expected_status)
+        values = {"status": move.status}
+        if move.status == 'in_progress':
+            values["started_at"] = func.coalesce(ServiceRequestSQL.started_at, func.now())
+        elif move.status == 'completed':
+            values["completed_at"] = func.coalesce(ServiceRequestSQL.completed_at, func.now())
+        result = await session.execute(
+            update(ServiceRequestSQL).where(
+                ServiceRequestSQL.id == request_id,
+                ServiceRequestSQL.status == move.expected_status
+            ).values(**values)
+        )
+        if result.rowcount == 0:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "Card was moved by someone else", "current_status": existing.status}
+            )
+        
+        await session.commit()
+        invalidate_case(existing.case_id)
+        admin_counters.invalidate()
+        
+        return {"success": True, "message": "Service request moved successfully"}
+        
+    except HTTPException:
+        await session.rollback()
+        raise
+    except Exception as e:
+        await session.rollback()
+        logging.error(f"Error moving service request card {request_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to move service request")
@@ -3,14 +3,14 @@ Price Estimate API Routes - PostgreSQL Version
 DataLab Georgia - Migration from MongoDB to PostgreSQL
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
-from typing import Optional
 import logging
-from datetime import datetime
 
 from database import get_session
+from utils.rate_limit import rate_limit
+from utils.single_flight import encode_json
 
 router = APIRouter()
 
@@ -59,7 +59,7 @@ class PriceEstimateResponse(BaseModel):
     timeframe_en: str
     currency: str = "₾"
 
-@router.post("/", response_model=PriceEstimateResponse)
+@router.post("/", response_model=PriceEstimateResponse, dependencies=[Depends(rate_limit("price_estimate"))])
 async def calculate_price_estimate(
     request: PriceEstimateRequest,
     session: AsyncSession = Depends(get_session)
@@ -105,12 +105,16 @@ async def calculate_price_estimate(
         logging.error(f"Error calculating price estimate: {e}")
         raise HTTPException(status_code=500, detail="Failed to calculate price estimate")
 
+# The configuration is constant, so there is no query to coalesce - encode it
+# once and let every homepage request reuse the same bytes
+_, CONFIGURATION_BODY = encode_json({
+    "base_prices": BASE_PRICES,
+    "problem_multipliers": PROBLEM_MULTIPLIERS,
+    "urgency_multipliers": URGENCY_MULTIPLIERS,
+    "timeframes": TIMEFRAMES
+})
+
 @router.get("/configuration", response_model=dict)
 async def get_price_configuration():
     """Get price calculation configuration for frontend"""
-    return {
-        "base_prices": BASE_PRICES,
-        "problem_multipliers": PROBLEM_MULTIPLIERS,
-        "urgency_multipliers": URGENCY_MULTIPLIERS,
-        "timeframes": TIMEFRAMES
-    }
\ No newline at end of file
+    return Response(content=CONFIGURATION_BODY, media_type="application/json")
\ No newline at end of file
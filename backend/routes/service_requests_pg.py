@@ -3,57 +3,74 @@ Service Requests API Routes - PostgreSQL Version
 DataLab Georgia - Migration from MongoDB to PostgreSQL
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Header, Response, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, desc, func
-from sqlalchemy.sql import text
+from sqlalchemy import select, desc, union_all
 from typing import List, Optional
 from datetime import datetime, timedelta
 import logging
 
-from database import get_session
+from database import get_write_session, get_read_session
+from utils.rate_limit import rate_limit
+from utils.idempotency import idempotency_store
+from utils.case_generator import format_case_id, next_case_number
+from utils.write_batcher import get_group_commit_writer
+from utils.case_tracking import invalidate_case
+from utils.admin_counters import admin_counters
+from utils.archiver import case_archiver
+from utils.customers import assign_customer
+from utils.duplicate_filter import duplicate_filter, fingerprint as duplicate_fingerprint
+from utils.status_events import record_transition, created_event
 from models.ServiceRequestSQL import (
     ServiceRequestSQL, 
     ServiceRequestCreate, 
     ServiceRequestUpdate, 
     ServiceRequestResponse
 )
+from models.ServiceRequestArchiveSQL import ServiceRequestArchiveSQL, ARCHIVED_COLUMNS
+from utils.query_filters import ServiceRequestFilters, check_query_plan
+from utils.field_selection import parse_fields, columns_for
+from repositories.service_requests import service_request_repo, archived_request_repo
+from utils.single_flight import single_flight
 
 router = APIRouter()
 
-@router.post("/", response_model=dict)
+@router.post("/", response_model=dict, dependencies=[Depends(rate_limit("service_requests"))])
 async def create_service_request(
     request: ServiceRequestCreate,
-    session: AsyncSession = Depends(get_session)
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    session: AsyncSession = Depends(get_write_session)
 ):
-    """Create a new service request"""
+    """Create a new service request (a repeated Idempotency-Key replays the first result)
+
+    A resubmission of the same request within the duplicate window is merged
+    into the original (utils/duplicate_filter.py).
+    """
+    fingerprint = duplicate_fingerprint(
+        "service_request", request.email, request.phone, request.device_type, request.problem_description
+    )
+    return await idempotency_store.run(
+        "service_requests",
+        idempotency_key,
+        request.dict(),
+        lambda: duplicate_filter.run(
+            "service_request",
+            fingerprint,
+            session,
+            lambda record: _create_service_request(request, session, record),
+            response
+        ),
+        response
+    )
+
+async def _create_service_request(request: ServiceRequestCreate, session: AsyncSession, record=None) -> dict:
     try:
-        # Generate case ID using simple counter
-        from datetime import datetime
-        year = datetime.now().year
-        
-        # Get the highest case number for this year
-        latest_case = await session.execute(
-            select(ServiceRequestSQL.case_id).where(
-                ServiceRequestSQL.case_id.like(f'DL{year}%')
-            ).order_by(ServiceRequestSQL.case_id.desc()).limit(1)
-        )
-        latest = latest_case.scalar()
-        
-        if latest:
-            # Extract number and increment
-            case_num = int(latest[6:]) + 1  # Remove 'DL2025' prefix
-        else:
-            case_num = 1
-            
-        case_id = f"DL{year}{case_num:03d}"
-        
         # Calculate estimated completion (3 days from now)
         estimated_completion = datetime.utcnow() + timedelta(days=3)
         
         # Create new service request
         new_request = ServiceRequestSQL(
-            case_id=case_id,
             name=request.name,
             email=request.email,
             phone=request.phone,
@@ -63,16 +80,42 @@ async def create_service_request(
             estimated_completion=estimated_completion
         )
         
-        session.add(new_request)
-        await session.commit()
-        await session.refresh(new_request)
+        def response_for(row) -> dict:
+            return {
+                "success": True,
+                "message": "Service request created successfully",
+                "case_id": row.case_id,
+                "estimated_completion": estimated_completion.isoformat()
+            }
+
+        def followups(row) -> list:
+            # Its first status event, and the fingerprint for the duplicate filter
+            rows = [created_event(row)]
+            if record is not None:
+                rows.append(record(response_for(row)))
+            return rows
+
+        writer = get_group_commit_writer()
+        if writer is not None:
+            # Batched: the writer assigns the case ID and commits the request
+            # and its followups in one transaction with other submissions
+            new_request = await writer.submit(new_request, followups)
+        else:
+            # Generate case ID from the highest case number for this year
+            year = datetime.now().year
+            new_request.case_id = format_case_id(year, await next_case_number(session, year))
+            await assign_customer(session, new_request)
+            session.add(new_request)
+            await session.flush()
+            session.add_all(followups(new_request))
+            await session.commit()
+        result = response_for(new_request)
         
-        return {
-            "success": True,
-            "message": "Service request created successfully",
-            "case_id": new_request.case_id,
-            "estimated_completion": estimated_completion.isoformat()
-        }
+        # Clear a cached "not found" from tracking lookups made before creation
+        invalidate_case(new_request.case_id)
+        admin_counters.invalidate()
+        
+        return result
         
     except Exception as e:
         await session.rollback()
@@ -81,180 +124,112 @@ async def create_service_request(
 
 @router.get("/", response_model=List[ServiceRequestResponse])
 async def get_all_service_requests(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    status: Optional[str] = Query(None),
-    session: AsyncSession = Depends(get_session)
+    filters: ServiceRequestFilters = Depends(),
+    fields: Optional[str] = Query(None, description="Comma-separated response fields"),
+    session: AsyncSession = Depends(get_read_session)
 ):
-    """Get all non-archived service requests with optional filtering"""
-    try:
+    """Get all non-archived service requests with optional filtering and sorting"""
+    names = parse_fields(fields, ServiceRequestResponse)
+
+    async def load():
         # Build query - exclude archived by default
-        query = select(ServiceRequestSQL).where(
+        query = service_request_repo.select(names).where(
             ServiceRequestSQL.is_archived == False
-        ).order_by(desc(ServiceRequestSQL.created_at))
-        
-        if status:
-            query = query.where(ServiceRequestSQL.status == status)
-            
-        query = query.offset(skip).limit(limit)
+        )
+        query = filters.apply(query).offset(skip).limit(limit)
+        await check_query_plan(session, filters, query)
         
         result = await session.execute(query)
-        requests = result.scalars().all()
-        
-        # Convert to response format
-        response_data = []
-        for req in requests:
-            response_data.append(ServiceRequestResponse(
-                id=req.id,
-                name=req.name,
-                email=req.email,
-                phone=req.phone,
-                device_type=req.device_type,
-                problem_description=req.problem_description,
-                urgency=req.urgency,
-                status=req.status,
-                case_id=req.case_id,
-                created_at=req.created_at,
-                started_at=req.started_at,
-                completed_at=req.completed_at,
-                estimated_completion=req.estimated_completion.strftime('%Y-%m-%d') if req.estimated_completion else None,
-                price=float(req.price) if req.price else None,
-                is_read=req.is_read,
-                is_archived=req.is_archived,
-                approved_for_kanban=req.approved_for_kanban,
-                admin_comment=req.admin_comment
-            ))
-        
-        return response_data
-        
+        return service_request_repo.response(result.all(), names)
+
+    try:
+        # Several admins opening the list at once share one query
+        return await single_flight.json(request, load)
+
+    except HTTPException:
+        raise
     except Exception as e:
         logging.error(f"Error getting service requests: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve service requests")
 
 @router.get("/approved/kanban", response_model=List[ServiceRequestResponse])
 async def get_approved_requests(
-    session: AsyncSession = Depends(get_session)
+    fields: Optional[str] = Query(None, description="Comma-separated response fields"),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get service requests approved for kanban board"""
+    names = parse_fields(fields, ServiceRequestResponse)
     try:
-        query = select(ServiceRequestSQL).where(
-            ServiceRequestSQL.approved_for_kanban == True
-        ).order_by(desc(ServiceRequestSQL.created_at))
-        
-        result = await session.execute(query)
-        requests = result.scalars().all()
-        
-        # Convert to response format
-        response_data = []
-        for req in requests:
-            response_data.append(ServiceRequestResponse(
-                id=req.id,
-                name=req.name,
-                email=req.email,
-                phone=req.phone,
-                device_type=req.device_type,
-                problem_description=req.problem_description,
-                urgency=req.urgency,
-                status=req.status,
-                case_id=req.case_id,
-                created_at=req.created_at,
-                started_at=req.started_at,
-                completed_at=req.completed_at,
-                estimated_completion=req.estimated_completion.strftime('%Y-%m-%d') if req.estimated_completion else None,
-                price=float(req.price) if req.price else None,
-                is_read=req.is_read,
-                is_archived=req.is_archived,
-                approved_for_kanban=req.approved_for_kanban,
-                admin_comment=req.admin_comment
-            ))
-        
-        return response_data
+        rows = await service_request_repo.list(session, names=names, approved_for_kanban=True)
+        return service_request_repo.response(rows, names)
         
     except Exception as e:
         logging.error(f"Error getting approved requests: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve approved requests")
 
+def archived_requests_query(names: Optional[List[str]] = None):
+    """Archived rows from both tiers (flagged hot rows + archive table), newest first"""
+    names = names or ARCHIVED_COLUMNS
+    # created_at is needed for ordering even when not requested
+    inner = list(dict.fromkeys(names + ['created_at']))
+    hot = select(
+        *columns_for(ServiceRequestSQL, inner)
+    ).where(ServiceRequestSQL.is_archived == True)
+    cold = select(
+        *columns_for(ServiceRequestArchiveSQL, inner)
+    )
+    archived = union_all(hot, cold).subquery()
+    return select(*[archived.c[name] for name in names]).order_by(desc(archived.c.created_at))
+
 @router.get("/archived", response_model=List[ServiceRequestResponse])
 async def get_archived_requests(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    session: AsyncSession = Depends(get_session)
+    fields: Optional[str] = Query(None, description="Comma-separated response fields"),
+    session: AsyncSession = Depends(get_read_session)
 ):
-    """Get archived service requests"""
+    """Get archived service requests (flagged in the hot table or moved to the archive)"""
+    names = parse_fields(fields, ServiceRequestResponse) or list(service_request_repo.fields)
     try:
-        query = select(ServiceRequestSQL).where(
-            ServiceRequestSQL.is_archived == True
-        ).order_by(desc(ServiceRequestSQL.created_at))
-        
-        query = query.offset(skip).limit(limit)
+        query = archived_requests_query(names).offset(skip).limit(limit)
         
         result = await session.execute(query)
-        requests = result.scalars().all()
-        
-        # Convert to response format
-        response_data = []
-        for req in requests:
-            response_data.append(ServiceRequestResponse(
-                id=req.id,
-                name=req.name,
-                email=req.email,
-                phone=req.phone,
-                device_type=req.device_type,
-                problem_description=req.problem_description,
-                urgency=req.urgency,
-                status=req.status,
-                case_id=req.case_id,
-                created_at=req.created_at,
-                started_at=req.started_at,
-                completed_at=req.completed_at,
-                estimated_completion=req.estimated_completion.strftime('%Y-%m-%d') if req.estimated_completion else None,
-                price=float(req.price) if req.price else None,
-                is_read=req.is_read,
-                is_archived=req.is_archived,
-                approved_for_kanban=req.approved_for_kanban,
-                admin_comment=req.admin_comment
-            ))
-        
-        return response_data
+        return service_request_repo.response(result.all(), names)
         
     except Exception as e:
         logging.error(f"Error getting archived requests: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve archived requests")
 
+@router.post("/archive/run", response_model=dict)
+async def run_archiver():
+    """Move long-finished service requests to the archive table now"""
+    return await case_archiver.run_once()
+
+@router.get("/archive/status", response_model=dict)
+async def get_archiver_status():
+    """Last archival run and totals"""
+    return case_archiver.stats()
+
 @router.get("/{case_id}", response_model=ServiceRequestResponse)
 async def get_service_request(
     case_id: str,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get service request by case ID"""
     try:
-        query = select(ServiceRequestSQL).where(ServiceRequestSQL.case_id == case_id)
-        result = await session.execute(query)
-        request = result.scalar_one_or_none()
+        request = await service_request_repo.get(session, case_id, by='case_id')
+        
+        if not request:
+            # Long-finished cases live in the archive table
+            request = await archived_request_repo.get(session, case_id, by='case_id')
         
         if not request:
             raise HTTPException(status_code=404, detail="Service request not found")
         
-        return ServiceRequestResponse(
-            id=request.id,
-            name=request.name,
-            email=request.email,
-            phone=request.phone,
-            device_type=request.device_type,
-            problem_description=request.problem_description,
-            urgency=request.urgency,
-            status=request.status,
-            case_id=request.case_id,
-            created_at=request.created_at,
-            started_at=request.started_at,
-            completed_at=request.completed_at,
-            estimated_completion=request.estimated_completion.strftime('%Y-%m-%d') if request.estimated_completion else None,
-            price=float(request.price) if request.price else None,
-            is_read=request.is_read,
-            is_archived=request.is_archived,
-            approved_for_kanban=request.approved_for_kanban,
-            admin_comment=request.admin_comment
-        )
+        return service_request_repo.item_response(request)
         
     except HTTPException:
         raise
@@ -262,31 +237,41 @@ async def get_service_request(
         logging.error(f"Error getting service request {case_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve service request")
 
+# Id-based edits find the case in whichever tier holds it
+REQUEST_TIERS = (service_request_repo, archived_request_repo)
+
+async def _update_case(session: AsyncSession, request_id: str, values: dict):
+    """Apply `values` to the case, logging a status change first; returns its case_id row or None"""
+    for repo in REQUEST_TIERS:
+        if 'status' in values:
+            await record_transition(session, request_id, values['status'], model=repo.model)
+        row = await repo.update(session, request_id, values, ['case_id'])
+        if row:
+            return row
+    return None
+
 @router.put("/{request_id}", response_model=dict)
 async def update_service_request(
     request_id: str,
     request_update: ServiceRequestUpdate,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
     """Update service request by ID (UUID)"""
     try:
-        # Check if request exists
-        query = select(ServiceRequestSQL).where(ServiceRequestSQL.id == request_id)
-        result = await session.execute(query)
-        existing_request = result.scalar_one_or_none()
+        update_data = request_update.dict(exclude_unset=True)
+        if update_data:
+            updated = await _update_case(session, request_id, update_data)
+        else:
+            updated = (await service_request_repo.get(session, request_id, ['case_id'])
+                       or await archived_request_repo.get(session, request_id, ['case_id']))
         
-        if not existing_request:
+        if not updated:
             raise HTTPException(status_code=404, detail="Service request not found")
         
-        # Update fields
-        update_data = request_update.dict(exclude_unset=True)
         if update_data:
-            stmt = update(ServiceRequestSQL).where(
-                ServiceRequestSQL.id == request_id
-            ).values(**update_data)
-            
-            await session.execute(stmt)
             await session.commit()
+            invalidate_case(updated.case_id)
+            admin_counters.invalidate()
         
         return {"success": True, "message": "Service request updated successfully"}
         
@@ -300,22 +285,19 @@ async def update_service_request(
 @router.delete("/{request_id}", response_model=dict)
 async def delete_service_request(
     request_id: str,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
     """Delete service request by ID (UUID)"""
     try:
-        # Check if request exists
-        query = select(ServiceRequestSQL).where(ServiceRequestSQL.id == request_id)
-        result = await session.execute(query)
-        existing_request = result.scalar_one_or_none()
+        deleted = (await service_request_repo.delete(session, request_id, ['case_id'])
+                   or await archived_request_repo.delete(session, request_id, ['case_id']))
         
-        if not existing_request:
+        if not deleted:
             raise HTTPException(status_code=404, detail="Service request not found")
         
-        # Delete request
-        stmt = delete(ServiceRequestSQL).where(ServiceRequestSQL.id == request_id)
-        await session.execute(stmt)
         await session.commit()
+        invalidate_case(deleted.case_id)
+        admin_counters.invalidate()
         
         return {"success": True, "message": "Service request deleted successfully"}
         
@@ -329,25 +311,18 @@ async def delete_service_request(
 @router.put("/{request_id}/archive", response_model=dict)
 async def archive_service_request(
     request_id: str,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
     """Archive service request by setting is_archived=True"""
     try:
-        # Check if request exists
-        query = select(ServiceRequestSQL).where(ServiceRequestSQL.id == request_id)
-        result = await session.execute(query)
-        existing_request = result.scalar_one_or_none()
+        archived = await _update_case(session, request_id, {"is_archived": True})
         
-        if not existing_request:
+        if not archived:
             raise HTTPException(status_code=404, detail="Service request not found")
         
-        # Archive the request
-        stmt = update(ServiceRequestSQL).where(
-            ServiceRequestSQL.id == request_id
-        ).values(is_archived=True)
-        
-        await session.execute(stmt)
         await session.commit()
+        invalidate_case(archived.case_id)
+        admin_counters.invalidate()
         
         return {"success": True, "message": "Service request archived successfully"}
         
@@ -361,30 +336,20 @@ async def archive_service_request(
 @router.put("/{request_id}/complete", response_model=dict)
 async def complete_service_request(
     request_id: str,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
     """Mark service request as completed"""
     try:
-        from datetime import datetime
-        
-        # Check if request exists
-        query = select(ServiceRequestSQL).where(ServiceRequestSQL.id == request_id)
-        result = await session.execute(query)
-        existing_request = result.scalar_one_or_none()
+        completed = await _update_case(
+            session, request_id, {"status": 'completed', "completed_at": datetime.utcnow()}
+        )
         
-        if not existing_request:
+        if not completed:
             raise HTTPException(status_code=404, detail="Service request not found")
         
-        # Complete the request
-        stmt = update(ServiceRequestSQL).where(
-            ServiceRequestSQL.id == request_id
-        ).values(
-            status='completed',
-            completed_at=datetime.utcnow()
-        )
-        
-        await session.execute(stmt)
         await session.commit()
+        invalidate_case(completed.case_id)
+        admin_counters.invalidate()
         
         return {"success": True, "message": "Service request completed successfully"}
         
@@ -393,4 +358,4 @@ async def complete_service_request(
     except Exception as e:
         await session.rollback()
         logging.error(f"Error completing service request {request_id}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to complete service request")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to complete service request")
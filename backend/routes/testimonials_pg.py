@@ -3,13 +3,15 @@ Testimonials API Routes - PostgreSQL Version
 DataLab Georgia - Migration from MongoDB to PostgreSQL
 """
 
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, desc
 from typing import List, Optional
 import logging
 
-from database import get_session
+from database import get_write_session, get_read_session
+from utils.field_selection import parse_fields
+from repositories.testimonials import testimonial_repo
+from utils.single_flight import single_flight
 from models.TestimonialSQL import (
     TestimonialSQL,
     TestimonialCreate,
@@ -22,7 +24,7 @@ router = APIRouter()
 @router.post("/", response_model=dict)
 async def create_testimonial(
     testimonial: TestimonialCreate,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
     """Create a new testimonial"""
     try:
@@ -54,75 +56,37 @@ async def create_testimonial(
 
 @router.get("/", response_model=List[TestimonialResponse])
 async def get_all_testimonials(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     active_only: bool = Query(True),
-    session: AsyncSession = Depends(get_session)
+    fields: Optional[str] = Query(None, description="Comma-separated response fields"),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get all testimonials"""
+    names = parse_fields(fields, TestimonialResponse)
+
+    async def load():
+        filters = {"is_active": True} if active_only else {}
+        rows = await testimonial_repo.list(session, skip, limit, names, **filters)
+        return testimonial_repo.response(rows, names)
+
     try:
-        query = select(TestimonialSQL).order_by(desc(TestimonialSQL.created_at))
-        
-        if active_only:
-            query = query.where(TestimonialSQL.is_active == True)
-            
-        query = query.offset(skip).limit(limit)
-        
-        result = await session.execute(query)
-        testimonials = result.scalars().all()
-        
-        # Convert to response format
-        response_data = []
-        for testimonial in testimonials:
-            response_data.append(TestimonialResponse(
-                id=testimonial.id,
-                name=testimonial.name,
-                name_en=testimonial.name_en,
-                position=testimonial.position,
-                position_en=testimonial.position_en,
-                text_ka=testimonial.text_ka,
-                text_en=testimonial.text_en,
-                rating=testimonial.rating,
-                image=testimonial.image,
-                is_active=testimonial.is_active,
-                created_at=testimonial.created_at
-            ))
-        
-        return response_data
-        
+        # Homepage spikes: identical concurrent requests share one query
+        return await single_flight.json(request, load)
+
     except Exception as e:
         logging.error(f"Error getting testimonials: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve testimonials")
 
 @router.get("/all", response_model=List[TestimonialResponse])
 async def get_all_testimonials_admin(
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get all testimonials for admin panel (including inactive)"""
     try:
-        query = select(TestimonialSQL).order_by(desc(TestimonialSQL.created_at))
-        
-        result = await session.execute(query)
-        testimonials = result.scalars().all()
-        
-        # Convert to response format
-        response_data = []
-        for testimonial in testimonials:
-            response_data.append(TestimonialResponse(
-                id=testimonial.id,
-                name=testimonial.name,
-                name_en=testimonial.name_en,
-                position=testimonial.position,
-                position_en=testimonial.position_en,
-                text_ka=testimonial.text_ka,
-                text_en=testimonial.text_en,
-                rating=testimonial.rating,
-                image=testimonial.image,
-                is_active=testimonial.is_active,
-                created_at=testimonial.created_at
-            ))
-        
-        return response_data
+        rows = await testimonial_repo.list(session)
+        return testimonial_repo.response(rows)
         
     except Exception as e:
         logging.error(f"Error getting all testimonials for admin: {e}")
@@ -131,30 +95,16 @@ async def get_all_testimonials_admin(
 @router.get("/{testimonial_id}", response_model=TestimonialResponse)
 async def get_testimonial(
     testimonial_id: str,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_read_session)
 ):
     """Get testimonial by ID"""
     try:
-        query = select(TestimonialSQL).where(TestimonialSQL.id == testimonial_id)
-        result = await session.execute(query)
-        testimonial = result.scalar_one_or_none()
+        testimonial = await testimonial_repo.get(session, testimonial_id)
         
         if not testimonial:
             raise HTTPException(status_code=404, detail="Testimonial not found")
         
-        return TestimonialResponse(
-            id=testimonial.id,
-            name=testimonial.name,
-            name_en=testimonial.name_en,
-            position=testimonial.position,
-            position_en=testimonial.position_en,
-            text_ka=testimonial.text_ka,
-            text_en=testimonial.text_en,
-            rating=testimonial.rating,
-            image=testimonial.image,
-            is_active=testimonial.is_active,
-            created_at=testimonial.created_at
-        )
+        return testimonial_repo.item_response(testimonial)
         
     except HTTPException:
         raise
@@ -166,26 +116,20 @@ async def get_testimonial(
 async def update_testimonial(
     testimonial_id: str,
     testimonial_update: TestimonialUpdate,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
     """Update testimonial"""
     try:
-        # Check if testimonial exists
-        query = select(TestimonialSQL).where(TestimonialSQL.id == testimonial_id)
-        result = await session.execute(query)
-        existing_testimonial = result.scalar_one_or_none()
+        update_data = testimonial_update.dict(exclude_unset=True)
+        if update_data:
+            updated = await testimonial_repo.update(session, testimonial_id, update_data)
+        else:
+            updated = await testimonial_repo.get(session, testimonial_id, ['id'])
         
-        if not existing_testimonial:
+        if not updated:
             raise HTTPException(status_code=404, detail="Testimonial not found")
         
-        # Update fields
-        update_data = testimonial_update.dict(exclude_unset=True)
         if update_data:
-            stmt = update(TestimonialSQL).where(
-                TestimonialSQL.id == testimonial_id
-            ).values(**update_data)
-            
-            await session.execute(stmt)
             await session.commit()
         
         return {"success": True, "message": "Testimonial updated successfully"}
@@ -200,21 +144,15 @@ async def update_testimonial(
 @router.delete("/{testimonial_id}", response_model=dict)
 async def delete_testimonial(
     testimonial_id: str,
-    session: AsyncSession = Depends(get_session)
+    session: AsyncSession = Depends(get_write_session)
 ):
     """Delete testimonial"""
     try:
-        # Check if testimonial exists
-        query = select(TestimonialSQL).where(TestimonialSQL.id == testimonial_id)
-        result = await session.execute(query)
-        existing_testimonial = result.scalar_one_or_none()
+        deleted = await testimonial_repo.delete(session, testimonial_id)
         
-        if not existing_testimonial:
+        if not deleted:
             raise HTTPException(status_code=404, detail="Testimonial not found")
         
-        # Delete testimonial
-        stmt = delete(TestimonialSQL).where(TestimonialSQL.id == testimonial_id)
-        await session.execute(stmt)
         await session.commit()
         
         return {"success": True, "message": "Testimonial deleted successfully"}
@@ -224,4 +162,4 @@ async def delete_testimonial(
     except Exception as e:
         await session.rollback()
         logging.error(f"Error deleting testimonial {testimonial_id}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to delete testimonial")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to delete testimonial")
@@ -0,0 +1,31 @@
+"""
+Case Tracking API Routes - PostgreSQL Version
+DataLab Georgia - public status lookup by case ID
+"""
+
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+
+from database import get_read_session
+from utils.rate_limit import rate_limit
+from utils.case_tracking import lookup_case
+from models.ServiceRequestSQL import CaseTrackingResponse
+
+router = APIRouter()
+
+@router.get("/{case_id}", response_model=CaseTrackingResponse, dependencies=[Depends(rate_limit("tracking"))])
+async def track_case(
+    case_id: str,
+    session: AsyncSession = Depends(get_read_session)
+):
+    """Get the public status/progress of a case (active or archived)"""
+    try:
+        case = await lookup_case(session, case_id)
+    except Exception as e:
+        logging.error(f"Error tracking case {case_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to track case")
+
+    if case is None:
+        raise HTTPException(status_code=404, detail="Case not found")
+    return case
@@ -1,54 +1,66 @@
 """
 DataLab Georgia FastAPI Server
 Migrated from MongoDB to PostgreSQL
+
+What is deferred at startup, and what is not:
+
+  * Heavy optional dependencies are imported on first use: pandas/pyarrow by
+    the analytics exporter's task (in a worker thread), redis by the first
+    shared rate-limit check, StaticFiles only when a frontend build exists.
+  * Background jobs that are switched off (ARCHIVE_ENABLED, WRITE_BATCHING,
+    ...) are never started; the others start as tasks and don't hold up
+    readiness.
+  * Route modules and the job modules they call are imported eagerly, on
+    purpose. uvicorn loads `server:app`, so create_app() runs at import time,
+    and every router has to be mounted before the first request. The job
+    modules are a few milliseconds each (GET /api/admin/startup-profile
+    ?importtime=true). Deferring them would move the cost into the first
+    request instead of removing it.
 """
 
-from fastapi import FastAPI, APIRouter, Depends, HTTPException
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from dotenv import load_dotenv
+# Imported first so the profiler's clock starts before the heavy imports
+from utils.startup_profile import startup_profiler, capture_importtime, STARTUP_PROFILE
+
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Request, Query
+from fastapi.responses import FileResponse, JSONResponse
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware
 import os
+import asyncio
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
-from typing import List
 import uuid
 from datetime import datetime
-import sys
-import traceback
 
-# PostgreSQL imports
-from database import get_session, init_db, close_db
+# PostgreSQL imports (database.py also loads the .env file)
+from database import get_session, init_db, close_db, engine, read_engine
 from sqlalchemy.ext.asyncio import AsyncSession
-
-# Import PostgreSQL route modules
+from utils.health_monitor import HealthMonitor
+from utils.structured_logging import configure_logging, RequestIdMiddleware
+from utils.sqlite_maintenance import SQLiteMaintenance, RequestActivity, MAINTENANCE_ENABLED
+from utils.admission_control import AdmissionControlMiddleware, admission_controller
+from utils.deadlines import DeadlineMiddleware, install_deadlines
+from utils.write_batcher import group_commit_writer
+from utils.archiver import case_archiver, ARCHIVE_ENABLED
+from utils.customers import customer_backfill, CUSTOMER_BACKFILL_ENABLED
+from utils.duplicate_filter import duplicate_filter
+from utils.status_events import status_stats, STATUS_STATS_ENABLED
+from utils.analytics_export import analytics_exporter, ANALYTICS_EXPORT_ENABLED
+# Mounted by create_app() at import time - see the module docstring
 from routes.service_requests_pg import router as service_requests_router
 from routes.contact_pg import router as contact_router
 from routes.price_estimate_pg import router as price_estimate_router
 from routes.testimonials_pg import router as testimonials_router
+from routes.tracking_pg import router as tracking_router
+from routes.kanban_pg import router as kanban_router
+from routes.admin_pg import router as admin_router
+from routes.customers_pg import router as customers_router
 
 ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
-
-# Create the main app
-app = FastAPI(
-    title="DataLab Georgia API",
-    description="Data Recovery Service API - PostgreSQL Version",
-    version="2.0.0"
-)
-
-# CORS Middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+STATIC_DIR = ROOT_DIR.parent / "frontend" / "build"
+
+logger = logging.getLogger(__name__)
 
 # Health check models
 class StatusCheck(BaseModel):
@@ -59,12 +71,15 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+# Core endpoints, mounted under /api by create_app()
+system_router = APIRouter()
+
 # Health check endpoints
-@api_router.get("/")
+@system_router.get("/")
 async def root():
     return {"message": "DataLab Georgia API is running", "status": "healthy", "database": "PostgreSQL"}
 
-@api_router.get("/health")
+@system_router.get("/health")
 async def health_check(session: AsyncSession = Depends(get_session)):
     """Health check with database connectivity verification"""
     try:
@@ -72,7 +87,7 @@ async def health_check(session: AsyncSession = Depends(get_session)):
         from sqlalchemy.sql import text
         result = await session.execute(text("SELECT 1"))
         db_status = "connected" if result else "disconnected"
-        
+
         return {
             "status": "healthy",
             "database": db_status,
@@ -86,7 +101,23 @@ async def health_check(session: AsyncSession = Depends(get_session)):
             "timestamp": datetime.utcnow().isoformat()
         }
 
-@api_router.post("/status-check")
+@system_router.get("/livez")
+async def liveness_probe(request: Request):
+    """Liveness probe - answers from memory, never touches the database"""
+    return request.app.state.health_monitor.liveness()
+
+@system_router.get("/readyz")
+async def readiness_probe(request: Request):
+    """Readiness probe - cached DB connectivity, pool saturation and loop lag"""
+    ready, payload = request.app.state.health_monitor.readiness()
+    return JSONResponse(status_code=200 if ready else 503, content=payload)
+
+@system_router.get("/admission")
+async def get_admission_stats():
+    """Concurrency, queue depth and shed requests per traffic class"""
+    return admission_controller.stats()
+
+@system_router.post("/status-check")
 async def create_status_check(status_check: StatusCheckCreate):
     """Simple status check endpoint for monitoring"""
     return {
@@ -96,71 +127,166 @@ async def create_status_check(status_check: StatusCheckCreate):
         "status": "received"
     }
 
-# Include all route modules
-api_router.include_router(service_requests_router, prefix="/service-requests", tags=["service-requests"])
-api_router.include_router(contact_router, prefix="/contact", tags=["contact"])
-api_router.include_router(price_estimate_router, prefix="/price-estimate", tags=["price-estimate"])
-api_router.include_router(testimonials_router, prefix="/testimonials", tags=["testimonials"])
+@system_router.get("/admin/startup-profile")
+async def get_startup_profile(importtime: bool = Query(False)):
+    """Startup phase timings; importtime=true also captures `python -X importtime`"""
+    if importtime and startup_profiler.importtime is None:
+        # Spawns a fresh interpreter - keep it off the event loop
+        startup_profiler.importtime = await asyncio.to_thread(capture_importtime, "server")
+    return startup_profiler.report()
+
+def include_routers(api_router: APIRouter):
+    """Mount the feature route modules"""
+    api_router.include_router(service_requests_router, prefix="/service-requests", tags=["service-requests"])
+    api_router.include_router(contact_router, prefix="/contact", tags=["contact"])
+    api_router.include_router(price_estimate_router, prefix="/price-estimate", tags=["price-estimate"])
+    api_router.include_router(testimonials_router, prefix="/testimonials", tags=["testimonials"])
+    api_router.include_router(tracking_router, prefix="/track", tags=["tracking"])
+    api_router.include_router(kanban_router, prefix="/kanban", tags=["kanban"])
+    api_router.include_router(admin_router, prefix="/admin", tags=["admin"])
+    api_router.include_router(customers_router, prefix="/customers", tags=["customers"])
+
+def mount_frontend(app: FastAPI):
+    """Serve the React build when it exists (StaticFiles is only imported then)"""
+    if not STATIC_DIR.exists():
+        return
+    from fastapi.staticfiles import StaticFiles
 
-# Include API router in main app
-app.include_router(api_router)
+    app.mount("/static", StaticFiles(directory=str(STATIC_DIR / "static")), name="static")
 
-# Static file serving (frontend)
-static_dir = Path(__file__).parent.parent / "frontend" / "build"
-if static_dir.exists():
-    app.mount("/static", StaticFiles(directory=str(static_dir / "static")), name="static")
-    
     @app.get("/{full_path:path}")
     async def serve_frontend(full_path: str):
         """Serve React frontend for all non-API routes"""
         if full_path.startswith("api/"):
             raise HTTPException(status_code=404, detail="API endpoint not found")
-        
-        file_path = static_dir / full_path
+
+        file_path = STATIC_DIR / full_path
         if file_path.exists() and file_path.is_file():
             return FileResponse(file_path)
         else:
             # Return index.html for SPA routing
-            return FileResponse(static_dir / "index.html")
+            return FileResponse(STATIC_DIR / "index.html")
 
-# Application lifecycle events
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database connection on startup"""
-    try:
-        print("🚀 Starting DataLab Georgia API...")
-        print(f"Python version: {sys.version}")
-        await init_db()
-        print("✅ SQLite database initialized successfully")
-        logging.info("✅ SQLite database initialized successfully")
-    except Exception as e:
-        print(f"❌ Database initialization failed: {e}")
-        print(f"Traceback: {traceback.format_exc()}")
-        logging.error(f"❌ Database initialization failed: {e}")
+def create_app() -> FastAPI:
+    """Build the FastAPI application"""
+    startup_profiler.checkpoint("import:server")
 
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Close database connections on shutdown"""
-    try:
-        await close_db()
-        logging.info("✅ Database connections closed successfully")
-    except Exception as e:
-        logging.error(f"❌ Error closing database connections: {e}")
+    with startup_profiler.phase("create_app"):
+        app = FastAPI(
+            title="DataLab Georgia API",
+            description="Data Recovery Service API - PostgreSQL Version",
+            version="2.0.0"
+        )
+
+        # Request budget, carried into SQLite/PostgreSQL statement timeouts;
+        # starts once the request has been admitted
+        install_deadlines(engine, read_engine)
+        app.add_middleware(DeadlineMiddleware)
+
+        # Per-class concurrency limits; inside CORS, so 503s still carry CORS
+        # headers and a request ID
+        app.add_middleware(AdmissionControlMiddleware)
+
+        # CORS Middleware
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+
+        # Compress larger JSON payloads (admin bootstrap, board, lists)
+        app.add_middleware(GZipMiddleware, minimum_size=int(os.environ.get('GZIP_MIN_SIZE', '1000')))
+
+        # Correlation ID for every log record emitted while handling a request
+        app.add_middleware(RequestIdMiddleware)
+
+        # Request counts let SQLite maintenance wait for quiet periods
+        app.add_middleware(RequestActivity)
+        app.state.sqlite_maintenance = SQLiteMaintenance(engine)
+
+        # Background DB/event-loop monitor backing the liveness/readiness probes
+        app.state.health_monitor = HealthMonitor(engine, read_engine)
+
+        # Create a router with the /api prefix
+        api_router = APIRouter(prefix="/api")
+        api_router.include_router(system_router)
+        include_routers(api_router)
+        app.include_router(api_router)
+
+        mount_frontend(app)
+
+    # Application lifecycle events
+    @app.on_event("startup")
+    async def startup_event():
+        """Initialize database connection on startup"""
+        try:
+            with startup_profiler.phase("startup:init_db"):
+                created = await init_db()
+            if created:
+                logger.info("✅ Database schema created/migrated")
+            else:
+                logger.info("✅ Database schema up to date, skipped create_all")
+        except Exception as e:
+            logger.exception(f"❌ Database initialization failed: {e}")
+        with startup_profiler.phase("startup:health_monitor"):
+            await app.state.health_monitor.start()
+        with startup_profiler.phase("startup:background_jobs"):
+            if group_commit_writer is not None:
+                await group_commit_writer.start()
+                logger.info("✅ Group-commit writer started")
+            if ARCHIVE_ENABLED:
+                await case_archiver.start()
+            if CUSTOMER_BACKFILL_ENABLED:
+                await customer_backfill.start()
+            # Awaits its warm-up: an empty Bloom filter would wave duplicates through
+            await duplicate_filter.start()
+            if STATUS_STATS_ENABLED:
+                await status_stats.start()
+            if ANALYTICS_EXPORT_ENABLED:
+                await analytics_exporter.start()
+            if MAINTENANCE_ENABLED:
+                await app.state.sqlite_maintenance.start()
+        startup_profiler.mark_ready()
+        if STARTUP_PROFILE:
+            logger.info(f"Startup profile: {startup_profiler.report()}")
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        """Close database connections on shutdown"""
+        await app.state.health_monitor.stop()
+        await case_archiver.stop()
+        await customer_backfill.stop()
+        await duplicate_filter.stop()
+        await status_stats.stop()
+        await analytics_exporter.stop()
+        await app.state.sqlite_maintenance.stop()
+        if group_commit_writer is not None:
+            await group_commit_writer.stop()
+        try:
+            await close_db()
+            logger.info("✅ Database connections closed successfully")
+        except Exception as e:
+            logger.error(f"❌ Error closing database connections: {e}")
+
+    return app
+
+# Configure logging (JSON records written by a background thread)
+configure_logging()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
-    print("🌟 Starting DataLab Georgia server on http://localhost:8001")
+    logger.info("🌟 Starting DataLab Georgia server on http://localhost:8001")
     uvicorn.run(
         "server:app",
         host="0.0.0.0",
         port=8001,
         reload=True,
         access_log=True,
-        log_level="info"
-    )
\ No newline at end of file
+        log_level="info",
+        # Keep uvicorn's loggers on the queue-based pipeline
+        log_config=None
+    )
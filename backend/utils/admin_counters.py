@@ -0,0 +1,93 @@
+"""
+Admin header counters - unread service requests and new contact messages
+DataLab Georgia - versioned counts for cheap conditional polling
+
+Writes that can change either count call `admin_counters.invalidate()`, which
+bumps a version number. GET /api/admin/counters compares If-None-Match with
+the current version's ETag and answers 304 without touching the database;
+otherwise the counts come from the in-memory copy or, after an invalidation,
+from two COUNTs served by the partial indexes idx_service_requests_unread and
+idx_contact_messages_new (predicates are rendered as literals so the planner
+can match them against the index WHERE clauses).
+
+The ETag includes a per-process token, so tabs polling another worker (or a
+restarted one) simply get a fresh 200. Writes made outside this process are
+picked up after ADMIN_COUNTERS_MAX_AGE seconds.
+"""
+
+import os
+import time
+import uuid
+from typing import Optional
+
+from sqlalchemy import select, func, false
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.ServiceRequestSQL import ServiceRequestSQL
+from models.ContactMessageSQL import ContactMessageSQL, MESSAGE_STATUS
+
+ADMIN_COUNTERS_MAX_AGE = float(os.environ.get('ADMIN_COUNTERS_MAX_AGE', '60'))
+
+
+class AdminCounters:
+    """Cached counts plus a version that changes whenever they may have changed"""
+
+    def __init__(self, max_age: float = ADMIN_COUNTERS_MAX_AGE):
+        self.max_age = max_age
+        self.instance = uuid.uuid4().hex[:8]
+        self.version = 1
+        self._counts: Optional[dict] = None
+        self._loaded_at = 0.0
+        self.queries = 0
+        self.not_modified = 0
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.instance}-{self.version}"'
+
+    def invalidate(self):
+        self.version += 1
+        self._counts = None
+
+    def is_current(self, if_none_match: Optional[str]) -> bool:
+        """True when the client's ETag still matches and the cache is not stale"""
+        if not if_none_match or self._counts is None:
+            return False
+        if time.monotonic() - self._loaded_at > self.max_age:
+            return False
+        return self.etag in [tag.strip() for tag in if_none_match.split(',')]
+
+    async def get(self, session: AsyncSession) -> dict:
+        if self._counts is not None and time.monotonic() - self._loaded_at <= self.max_age:
+            return self._counts
+
+        version = self.version
+        unread = await session.scalar(
+            select(func.count()).select_from(ServiceRequestSQL).where(
+                ServiceRequestSQL.is_read == false(),
+                ServiceRequestSQL.is_archived == false()
+            )
+        )
+        new_messages = await session.scalar(
+            select(func.count()).select_from(ContactMessageSQL).where(
+                ContactMessageSQL.status == MESSAGE_STATUS.literal('new')
+            )
+        )
+        self.queries += 1
+        counts = {
+            "unread_service_requests": unread or 0,
+            "new_contact_messages": new_messages or 0
+        }
+
+        # A write landed while we were counting - serve, but don't cache
+        if version != self.version:
+            return counts
+        # Periodic refresh only changes the ETag if the numbers moved
+        if self._counts is not None and counts != self._counts:
+            self.version += 1
+        self._counts = counts
+        self._loaded_at = time.monotonic()
+        return counts
+
+
+admin_counters = AdminCounters()
@@ -0,0 +1,209 @@
+"""
+Admission Control - per-class concurrency limits with bounded queues
+DataLab Georgia - shed load early instead of letting every endpoint time out
+
+Each request under /api is put in a traffic class by method and path. A class
+runs at most `limit` requests at once; further requests wait in a FIFO queue of
+at most `queue` entries for up to `timeout_ms`. A full queue or an expired wait
+is answered immediately with 503 and Retry-After, so a slow database backs up
+one class instead of piling coroutines onto the event loop for all of them.
+Health probes have their own class, so /livez and /readyz keep answering while
+admin or public traffic is being shed.
+
+Classes are "<limit>/<queue>/<timeout_ms>" strings, overridable per class:
+
+    ADMISSION_PUBLIC_SUBMIT=20/100/2000     form submissions (POST)
+    ADMISSION_PUBLIC_READ=50/200/1000       homepage data, case tracking
+    ADMISSION_ADMIN=10/50/5000              admin panel, Kanban, mutations
+    ADMISSION_HEALTH=8/0/0                  /health, /livez, /readyz, /admission
+
+ADMISSION_ENABLED=false turns the middleware into a pass-through. Current
+concurrency, queue depth and rejection counts are served at /api/admission.
+"""
+
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict
+
+ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', 'true').lower() == 'true'
+
+DEFAULT_CLASSES = {
+    'public_submit': '20/100/2000',
+    'public_read': '50/200/1000',
+    'admin': '10/50/5000',
+    'health': '8/0/0'
+}
+
+HEALTH_PATHS = ('/api/health', '/api/livez', '/api/readyz', '/api/admission')
+PUBLIC_SUBMIT_PATHS = ('/api/service-requests', '/api/contact', '/api/price-estimate')
+PUBLIC_READ_PREFIXES = ('/api/testimonials', '/api/price-estimate', '/api/track')
+
+
+def classify(method: str, path: str):
+    """Traffic class for a request, or None for paths that are never limited"""
+    if not path.startswith('/api'):
+        # React build and static assets
+        return None
+    if path.rstrip('/') in HEALTH_PATHS or path == '/api/':
+        return 'health'
+    if method == 'POST' and path.rstrip('/') in PUBLIC_SUBMIT_PATHS:
+        return 'public_submit'
+    if method == 'GET' and path.startswith(PUBLIC_READ_PREFIXES):
+        return 'public_read'
+    return 'admin'
+
+
+@dataclass
+class AdmissionClass:
+    """Concurrency slots plus a FIFO of waiters for one traffic class"""
+    name: str
+    limit: int
+    queue: int
+    timeout: float
+    in_flight: int = 0
+    admitted: int = 0
+    queued: int = 0
+    rejected_full: int = 0
+    rejected_timeout: int = 0
+    max_wait_ms: float = 0.0
+    waiters: Deque[asyncio.Future] = field(default_factory=deque)
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "AdmissionClass":
+        limit, queue, timeout_ms = (int(part) for part in spec.split('/'))
+        return cls(name=name, limit=max(limit, 1), queue=max(queue, 0), timeout=timeout_ms / 1000)
+
+    @property
+    def retry_after(self) -> int:
+        return max(1, math.ceil(self.timeout))
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting in the queue if needed; False means shed the request"""
+        if self.in_flight < self.limit and not self.waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return True
+        if len(self.waiters) >= self.queue:
+            self.rejected_full += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        self.queued += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            # Client went away while queued
+            if waiter.done():
+                # The slot was handed over just as we were cancelled - pass it on
+                self.release()
+            else:
+                self._abandon(waiter)
+            raise
+        if not waiter.done():
+            self._abandon(waiter)
+
+        self.max_wait_ms = max(self.max_wait_ms, (time.monotonic() - started) * 1000)
+        if waiter.cancelled():
+            self.rejected_timeout += 1
+            return False
+        self.admitted += 1
+        return True
+
+    def _abandon(self, waiter: asyncio.Future):
+        waiter.cancel()
+        self.waiters.remove(waiter)
+
+    def release(self):
+        # Hand the slot straight to the oldest waiter; in_flight stays the same
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "queue_limit": self.queue,
+            "queue_timeout_ms": round(self.timeout * 1000),
+            "in_flight": self.in_flight,
+            "queue_depth": len(self.waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected_queue_full": self.rejected_full,
+            "rejected_queue_timeout": self.rejected_timeout,
+            "max_queue_wait_ms": round(self.max_wait_ms, 2)
+        }
+
+
+class AdmissionController:
+    """Holds the traffic classes; shared by the middleware and the stats endpoint"""
+
+    def __init__(self, classes: Dict[str, AdmissionClass], enabled: bool = ADMISSION_ENABLED):
+        self.classes = classes
+        self.enabled = enabled
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls({
+            name: AdmissionClass.parse(name, os.environ.get(f'ADMISSION_{name.upper()}', default))
+            for name, default in DEFAULT_CLASSES.items()
+        })
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "classes": {name: admission.stats() for name, admission in self.classes.items()}
+        }
+
+
+admission_controller = AdmissionController.from_env()
+
+
+class AdmissionControlMiddleware:
+    """Pure ASGI middleware applying `admission_controller` to HTTP requests"""
+
+    def __init__(self, app, controller: AdmissionController = admission_controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.controller.enabled:
+            return await self.app(scope, receive, send)
+        name = classify(scope["method"], scope["path"])
+        if name is None:
+            return await self.app(scope, receive, send)
+
+        admission = self.controller.classes[name]
+        if not await admission.acquire():
+            return await self._reject(send, admission)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission.release()
+
+    async def _reject(self, send, admission: AdmissionClass):
+        body = json.dumps({
+            "detail": "Server is busy, please try again shortly",
+            "class": admission.name
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(admission.retry_after).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,337 @@
+"""
+Analytics export - incremental columnar copies of the OLTP tables for BI
+DataLab Georgia - reporting reads Parquet files, not the live database
+
+Every ANALYTICS_EXPORT_INTERVAL_SECONDS the exporter appends what is new
+since its watermark to Hive-partitioned Parquet datasets under
+ANALYTICS_EXPORT_DIR:
+
+    service_requests/year=2026/month=10/part-<first id>.parquet
+    contact_messages/...
+    status_events/...
+
+Rows are read from the read pool in id order, ANALYTICS_EXPORT_CHUNK_SIZE at a
+time (keyset on the primary key, active and archived requests together), and
+each chunk is written with pandas/pyarrow off the event loop. A chunk stops
+short of the first row created within ANALYTICS_EXPORT_SETTLE_SECONDS: ids are
+handed out at INSERT but become visible at COMMIT, so on PostgreSQL a later
+id can commit first and a watermark moved past it would skip the slower row
+for good. Only columns
+fixed at insert time are exported - status changes reach the files through
+the append-only status event log (utils/status_events.py) - so appending is
+enough and no part is ever rewritten. Names, emails and free text stay in the
+database.
+
+`watermarks.json` records the last id written per dataset and is replaced
+atomically after each chunk. Parts are named after the first id they hold, so
+a chunk exported again after a crash overwrites its parts instead of adding
+a second copy of the rows. After a run `aggregates.json` is recomputed from
+the files alone and served by GET /api/admin/analytics.
+
+Requires the optional `pandas` and `pyarrow` packages; without them the
+exporter logs a warning and stays idle. They are first imported by the
+exporter's own task, in a worker thread, so the half-second import is not
+part of the app's cold start.
+
+    ANALYTICS_EXPORT_ENABLED=true
+    ANALYTICS_EXPORT_DIR=analytics
+    ANALYTICS_EXPORT_INTERVAL_SECONDS=3600
+    ANALYTICS_EXPORT_CHUNK_SIZE=50000
+    ANALYTICS_EXPORT_SETTLE_SECONDS=60
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import select, union_all, bindparam, func, or_, Integer
+
+from database import AsyncReadSessionLocal
+from models.ServiceRequestSQL import ServiceRequestSQL
+from models.ServiceRequestArchiveSQL import ServiceRequestArchiveSQL
+from models.ContactMessageSQL import ContactMessageSQL
+from models.ServiceRequestEventSQL import ServiceRequestEventSQL
+
+ANALYTICS_EXPORT_ENABLED = os.environ.get('ANALYTICS_EXPORT_ENABLED', 'true').lower() == 'true'
+ANALYTICS_EXPORT_DIR = os.environ.get('ANALYTICS_EXPORT_DIR', 'analytics')
+ANALYTICS_EXPORT_INTERVAL_SECONDS = float(os.environ.get('ANALYTICS_EXPORT_INTERVAL_SECONDS', '3600'))
+ANALYTICS_EXPORT_CHUNK_SIZE = int(os.environ.get('ANALYTICS_EXPORT_CHUNK_SIZE', '50000'))
+ANALYTICS_EXPORT_SETTLE_SECONDS = float(os.environ.get('ANALYTICS_EXPORT_SETTLE_SECONDS', '60'))
+
+REQUEST_COLUMNS = ('id', 'case_id', 'customer_id', 'device_type', 'urgency', 'created_at', 'estimated_completion')
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    columns: Tuple[str, ...]
+    time_column: str  # partitions by its year and month, and settles rows
+    query: Any        # next chunk: :last_id < id < :before ORDER BY id LIMIT :limit
+    unsettled: Any    # first id past :last_id whose time_column is after :settled
+
+
+def _chunk(*models, columns: Tuple[str, ...]):
+    before = bindparam('before', type_=Integer)
+    selects = [
+        select(*(getattr(model, name) for name in columns)).where(
+            model.id > bindparam('last_id'),
+            or_(before.is_(None), model.id < before)
+        )
+        for model in models
+    ]
+    if len(selects) == 1:
+        return selects[0].order_by(models[0].id).limit(bindparam('limit'))
+    merged = union_all(*selects).subquery()
+    return select(merged).order_by(merged.c.id).limit(bindparam('limit'))
+
+
+def _unsettled(*models, time_column: str):
+    firsts = union_all(*(
+        select(func.min(model.id).label('id')).where(
+            model.id > bindparam('last_id'), getattr(model, time_column) > bindparam('settled')
+        )
+        for model in models
+    )).subquery()
+    return select(func.min(firsts.c.id))
+
+
+def _dataset(name: str, columns: Tuple[str, ...], time_column: str, *models) -> Dataset:
+    return Dataset(name, columns, time_column,
+                   _chunk(*models, columns=columns), _unsettled(*models, time_column=time_column))
+
+
+DATASETS = (
+    # Archived cases keep their id and ids are never reused (AUTOINCREMENT),
+    # so one keyset covers both tables
+    _dataset('service_requests', REQUEST_COLUMNS, 'created_at', ServiceRequestSQL, ServiceRequestArchiveSQL),
+    _dataset('contact_messages', ('id', 'customer_id', 'created_at'), 'created_at', ContactMessageSQL),
+    _dataset('status_events', ('id', 'request_id', 'status', 'ts'), 'ts', ServiceRequestEventSQL),
+)
+
+
+def _replace_json(path: Path, data: dict):
+    temporary = path.with_suffix('.tmp')
+    temporary.write_text(json.dumps(data, indent=2))
+    os.replace(temporary, path)
+
+
+def _write_chunk(root: Path, dataset: Dataset, rows: list) -> int:
+    """Write one chunk as a Parquet part per year/month partition; returns bytes written"""
+    import pandas as pd  # optional dependency
+
+    frame = pd.DataFrame.from_records(rows, columns=dataset.columns)
+    stamps = pd.to_datetime(frame[dataset.time_column])
+    written = 0
+    for (year, month), part in frame.groupby([stamps.dt.year, stamps.dt.month]):
+        directory = root / dataset.name / f"year={int(year)}" / f"month={int(month):02d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        # Named by the first id only: re-exporting a chunk from the same watermark rewrites this file
+        path = directory / f"part-{part['id'].iloc[0]:012d}.parquet"
+        temporary = path.with_suffix('.tmp')
+        part.to_parquet(temporary, engine='pyarrow', compression='zstd', index=False)
+        os.replace(temporary, path)
+        written += path.stat().st_size
+    return written
+
+
+def _read(root: Path, name: str, columns: list):
+    import pandas as pd  # optional dependency
+
+    path = root / name
+    if not any(path.rglob('*.parquet')):
+        return pd.DataFrame(columns=columns)
+    return pd.read_parquet(path, engine='pyarrow', columns=columns)
+
+
+def _months(frame, column: str):
+    return frame[column].dt.strftime('%Y-%m')
+
+
+def _grid(counts) -> Dict[str, Dict[str, int]]:
+    """(month, key) counts -> {month: {key: count}}"""
+    table = counts.unstack(fill_value=0)
+    return {month: {key: int(value) for key, value in row.items()} for month, row in table.iterrows()}
+
+
+def compute_aggregates(root: Path) -> dict:
+    """The BI summary, read from the Parquet datasets only (column-pruned)"""
+    requests = _read(root, 'service_requests', ['id', 'customer_id', 'device_type', 'urgency', 'created_at'])
+    messages = _read(root, 'contact_messages', ['id', 'created_at'])
+    events = _read(root, 'status_events', ['request_id', 'status', 'ts'])
+
+    aggregates: Dict[str, Any] = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "rows": {"service_requests": len(requests), "contact_messages": len(messages), "status_events": len(events)}
+    }
+    if len(requests):
+        month = _months(requests, 'created_at')
+        aggregates["requests_by_month"] = {key: int(value) for key, value in requests.groupby(month).size().items()}
+        aggregates["requests_by_device_type"] = _grid(requests.groupby([month, 'device_type']).size())
+        aggregates["requests_by_urgency"] = _grid(requests.groupby([month, 'urgency']).size())
+        per_customer = requests['customer_id'].dropna().value_counts()
+        aggregates["customers"] = {
+            "with_requests": int(len(per_customer)),
+            "repeat": int((per_customer > 1).sum())
+        }
+    if len(messages):
+        month = _months(messages, 'created_at')
+        aggregates["messages_by_month"] = {key: int(value) for key, value in messages.groupby(month).size().items()}
+    if len(events) and len(requests):
+        # First time each case entered each status -> intake-to-completion hours per device type
+        first = events.groupby(['request_id', 'status'])['ts'].min().unstack()
+        if 'pending' in first and 'completed' in first:
+            hours = ((first['completed'] - first['pending']).dt.total_seconds() / 3600).dropna()
+            hours = hours[hours >= 0].rename('hours').reset_index()
+            merged = hours.merge(requests[['id', 'device_type']], left_on='request_id', right_on='id')
+            aggregates["turnaround_hours_by_device_type"] = {
+                device_type: {
+                    "completed": int(len(group)),
+                    "median": round(float(group['hours'].median()), 2),
+                    "p90": round(float(group['hours'].quantile(0.9)), 2)
+                }
+                for device_type, group in merged.groupby('device_type')
+            }
+    return aggregates
+
+
+class AnalyticsExporter:
+    """Appends new rows to the Parquet datasets and refreshes the aggregates"""
+
+    def __init__(self, session_factory, root: str = ANALYTICS_EXPORT_DIR,
+                 interval_seconds: float = ANALYTICS_EXPORT_INTERVAL_SECONDS,
+                 chunk_size: int = ANALYTICS_EXPORT_CHUNK_SIZE,
+                 settle_seconds: float = ANALYTICS_EXPORT_SETTLE_SECONDS):
+        self.session_factory = session_factory
+        self.root = Path(root)
+        self.interval = interval_seconds
+        self.chunk_size = chunk_size
+        self.settle = timedelta(seconds=settle_seconds)
+        self.available: Optional[bool] = None
+        self.aggregates: Optional[dict] = None
+        self.last_run_at: Optional[datetime] = None
+        self.last_rows: Dict[str, int] = {}
+        self.last_bytes = 0
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def _check_available(self) -> bool:
+        if self.available is None:
+            try:
+                import pandas  # noqa: F401  optional dependency
+                import pyarrow  # noqa: F401
+                self.available = True
+            except ImportError:
+                logging.warning("Analytics export needs the 'pandas' and 'pyarrow' packages; it is disabled")
+                self.available = False
+        return self.available
+
+    @property
+    def _watermark_path(self) -> Path:
+        return self.root / 'watermarks.json'
+
+    @property
+    def _aggregates_path(self) -> Path:
+        return self.root / 'aggregates.json'
+
+    def _load_watermarks(self) -> Dict[str, int]:
+        if self._watermark_path.exists():
+            return json.loads(self._watermark_path.read_text())
+        return {}
+
+    async def _ensure_available(self) -> bool:
+        if self.available is None:
+            # Importing pandas/pyarrow takes about half a second - not on the event loop
+            await asyncio.to_thread(self._check_available)
+        return self.available
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop(), name="analytics-exporter")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> dict:
+        """Export everything past the watermarks, then recompute the aggregates"""
+        if not await self._ensure_available():
+            return self.stats()
+        async with self._lock:
+            started = time.perf_counter()
+            self.last_rows = {}
+            self.last_bytes = 0
+            try:
+                self.root.mkdir(parents=True, exist_ok=True)
+                watermarks = self._load_watermarks()
+                for dataset in DATASETS:
+                    self.last_rows[dataset.name] = await self._export(dataset, watermarks)
+                self.aggregates = await asyncio.to_thread(compute_aggregates, self.root)
+                await asyncio.to_thread(_replace_json, self._aggregates_path, self.aggregates)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logging.error(f"Error exporting analytics: {e}")
+
+            self.last_run_at = datetime.utcnow()
+            self.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            return self.stats()
+
+    async def _export(self, dataset: Dataset, watermarks: Dict[str, int]) -> int:
+        exported = 0
+        settled = datetime.utcnow() - self.settle
+        while True:
+            last_id = watermarks.get(dataset.name, 0)
+            async with self.session_factory() as session:
+                before = await session.scalar(dataset.unsettled, {'last_id': last_id, 'settled': settled})
+                result = await session.execute(dataset.query, {
+                    'last_id': last_id, 'before': before, 'limit': self.chunk_size
+                })
+                rows = [tuple(row) for row in result.all()]
+            if not rows:
+                return exported
+            self.last_bytes += await asyncio.to_thread(_write_chunk, self.root, dataset, rows)
+            # Only after the parts are in place, so a crash re-exports rather than skips
+            watermarks[dataset.name] = rows[-1][0]
+            await asyncio.to_thread(_replace_json, self._watermark_path, watermarks)
+            exported += len(rows)
+            if len(rows) < self.chunk_size:
+                return exported
+
+    async def _loop(self):
+        if not await self._ensure_available():
+            return
+        if self.aggregates is None and self._aggregates_path.exists():
+            self.aggregates = json.loads(self._aggregates_path.read_text())
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": ANALYTICS_EXPORT_ENABLED,
+            "available": self.available,
+            "directory": str(self.root),
+            "interval_seconds": self.interval,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_rows": self.last_rows,
+            "last_bytes": self.last_bytes,
+            "last_duration_ms": self.last_duration_ms,
+            "last_error": self.last_error,
+            "watermarks": self._load_watermarks() if self.root.exists() else {}
+        }
+
+
+analytics_exporter = AnalyticsExporter(AsyncReadSessionLocal)
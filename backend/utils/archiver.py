@@ -0,0 +1,167 @@
+"""
+Case Archiver - tiered storage for service requests
+DataLab Georgia - moves long-finished cases out of the hot table
+
+Cases that were completed, picked up or archived more than ARCHIVE_AFTER_MONTHS
+ago are copied into `service_requests_archive` and deleted from
+`service_requests` in small batches, one short transaction each, so the active
+list, Kanban and counter queries only ever scan the recent working set.
+Archived cases keep their id and case_id (service_requests never reuses an
+id); `get_archived_requests`, `get_service_request` and case tracking read
+both tables, and the id-based admin edits fall back to the archive.
+
+    ARCHIVE_ENABLED=false         run the scheduled job (opt-in)
+    ARCHIVE_AFTER_MONTHS=12       age (by completed_at, else created_at)
+    ARCHIVE_INTERVAL_HOURS=24     how often the job runs
+    ARCHIVE_BATCH_SIZE=500        rows moved per transaction
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select, insert, delete, func, or_, literal
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models.ServiceRequestSQL import ServiceRequestSQL
+from models.ServiceRequestArchiveSQL import ServiceRequestArchiveSQL, ARCHIVED_COLUMNS
+from utils.case_tracking import invalidate_case
+from utils.admin_counters import admin_counters
+
+ARCHIVE_ENABLED = os.environ.get('ARCHIVE_ENABLED', 'false').lower() == 'true'
+ARCHIVE_AFTER_MONTHS = int(os.environ.get('ARCHIVE_AFTER_MONTHS', '12'))
+ARCHIVE_INTERVAL_HOURS = float(os.environ.get('ARCHIVE_INTERVAL_HOURS', '24'))
+ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', '500'))
+
+FINISHED_STATUSES = ('completed', 'picked_up', 'archived')
+
+
+def archive_cutoff(months: int = ARCHIVE_AFTER_MONTHS, now: Optional[datetime] = None) -> datetime:
+    # completed_at / created_at are naive UTC
+    return (now or datetime.utcnow()) - timedelta(days=30 * months)
+
+
+async def archive_batch(session: AsyncSession, cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move up to `batch_size` finished cases older than `cutoff`; returns rows moved"""
+    finished_at = func.coalesce(ServiceRequestSQL.completed_at, ServiceRequestSQL.created_at)
+    result = await session.execute(
+        select(ServiceRequestSQL.id, ServiceRequestSQL.case_id).where(
+            or_(
+                ServiceRequestSQL.status.in_(FINISHED_STATUSES),
+                ServiceRequestSQL.is_archived == True
+            ),
+            finished_at < cutoff
+        ).order_by(ServiceRequestSQL.id).limit(batch_size)
+    )
+    rows = result.all()
+    if not rows:
+        return 0
+
+    ids = [row.id for row in rows]
+    # Everything in cold storage is reported as archived
+    source_columns = [
+        literal(True).label('is_archived') if name == 'is_archived' else getattr(ServiceRequestSQL, name)
+        for name in ARCHIVED_COLUMNS
+    ]
+    await session.execute(
+        insert(ServiceRequestArchiveSQL).from_select(
+            ARCHIVED_COLUMNS,
+            select(*source_columns).where(ServiceRequestSQL.id.in_(ids))
+        )
+    )
+    await session.execute(
+        delete(ServiceRequestSQL).where(ServiceRequestSQL.id.in_(ids))
+    )
+    await session.commit()
+
+    for row in rows:
+        invalidate_case(row.case_id)
+    admin_counters.invalidate()
+    return len(rows)
+
+
+class CaseArchiver:
+    """Runs the archival job on an interval in the background"""
+
+    def __init__(self, session_factory, months: int = ARCHIVE_AFTER_MONTHS,
+                 interval_hours: float = ARCHIVE_INTERVAL_HOURS,
+                 batch_size: int = ARCHIVE_BATCH_SIZE):
+        self.session_factory = session_factory
+        self.months = months
+        self.interval = interval_hours * 3600
+        self.batch_size = batch_size
+        self.last_run_at: Optional[datetime] = None
+        self.last_moved = 0
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.total_moved = 0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def exclusive(self) -> asyncio.Lock:
+        """Held while a run moves cases; jobs rewriting service request rows wait on it"""
+        return self._lock
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop(), name="case-archiver")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> dict:
+        """Archive everything currently due, one batch per transaction"""
+        async with self._lock:
+            started = time.perf_counter()
+            cutoff = archive_cutoff(self.months)
+            moved = 0
+            try:
+                while True:
+                    async with self.session_factory() as session:
+                        count = await archive_batch(session, cutoff, self.batch_size)
+                    moved += count
+                    if count < self.batch_size:
+                        break
+                    # Let request handlers at the database between batches
+                    await asyncio.sleep(0)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logging.error(f"Error archiving service requests: {e}")
+
+            self.last_run_at = datetime.utcnow()
+            self.last_moved = moved
+            self.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            self.total_moved += moved
+            if moved:
+                logging.info(f"Archived {moved} service requests finished before {cutoff:%Y-%m-%d}")
+            return self.stats()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": ARCHIVE_ENABLED,
+            "after_months": self.months,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_moved": self.last_moved,
+            "last_duration_ms": self.last_duration_ms,
+            "last_error": self.last_error,
+            "total_moved": self.total_moved
+        }
+
+    async def _loop(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+
+case_archiver = CaseArchiver(AsyncSessionLocal)
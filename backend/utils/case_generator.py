@@ -1,16 +1,29 @@
 from datetime import datetime
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorDatabase
+from typing import TYPE_CHECKING, Optional
+
+from sqlalchemy import select, update, func, bindparam, Integer
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.ServiceRequestSQL import ServiceRequestSQL
+from models.ServiceRequestArchiveSQL import ServiceRequestArchiveSQL
+from models.CaseCounterSQL import CaseCounterSQL
+
+if TYPE_CHECKING:
+    # Legacy MongoDB generator; motor is not installed with the SQL backend
+    from motor.motor_asyncio import AsyncIOMotorDatabase
 
 class CaseIDGenerator:
-    def __init__(self, db: AsyncIOMotorDatabase):
+    def __init__(self, db: "AsyncIOMotorDatabase"):
         self.db = db
         self.collection = db.case_counters
-    
+
     async def generate_case_id(self) -> str:
         """Generate a unique case ID in format DL2024001"""
         current_year = datetime.now().year
-        
+
         # Find and increment the counter for current year
         result = await self.collection.find_one_and_update(
             {"year": current_year},
@@ -18,18 +31,76 @@ class CaseIDGenerator:
             upsert=True,
             return_document=True
         )
-        
+
         sequence = result["sequence"]
         case_id = f"DL{current_year}{sequence:03d}"
-        
+
         return case_id
 
+def format_case_id(year: int, number: int, prefix: str = "DL") -> str:
+    """Format a case ID as prefix + year + zero-padded sequence (DL2025001)"""
+    return f"{prefix}{year}{number:03d}"
+
+# One primary-key UPDATE per allocation; RETURNING gives the new last number
+_claim = update(CaseCounterSQL).where(CaseCounterSQL.key == bindparam('counter_key')).values(
+    last_number=CaseCounterSQL.last_number + bindparam('count', type_=Integer)
+).returning(CaseCounterSQL.last_number).execution_options(synchronize_session=False)
+
+_seed_counter = {
+    name: insert(CaseCounterSQL.__table__).values(
+        key=bindparam('counter_key'), last_number=bindparam('last_number')
+    ).on_conflict_do_nothing()
+    for name, insert in (('sqlite', sqlite_insert), ('postgresql', postgresql_insert))
+}
+
+async def _highest_case_number(session: AsyncSession, columns, prefix: str) -> int:
+    """Scan existing IDs - only when a counter is first created"""
+    number = 0
+    for column in columns:
+        # Order by length first so DL20251000 sorts after DL2025999
+        latest = await session.scalar(
+            select(column).where(column.like(f'{prefix}%')).order_by(
+                func.length(column).desc(), column.desc()
+            ).limit(1)
+        )
+        if latest:
+            number = max(number, int(latest[len(prefix):]))
+    return number
+
+async def _claim_numbers(session: AsyncSession, key: str, count: int) -> Optional[int]:
+    return await session.scalar(_claim, {'counter_key': key, 'count': count})
+
+async def next_case_number(session: AsyncSession, year: int, prefix: str = "DL", column=None,
+                           count: int = 1) -> int:
+    """Reserve `count` sequence numbers for `year` and return the first
+
+    The counter row is updated in the caller's transaction, so numbers are
+    returned to the pool on rollback and concurrent writers queue on the row.
+    """
+    key = f"{prefix}{year}"
+    last = await _claim_numbers(session, key, count)
+    if last is None:
+        # First case of the year, or a database from before the counters:
+        # start after the highest existing ID (archived cases keep theirs)
+        if column is None:
+            columns = [ServiceRequestSQL.case_id, ServiceRequestArchiveSQL.case_id]
+        else:
+            columns = [column]
+        await session.execute(_seed_counter[session.bind.dialect.name], {
+            'counter_key': key, 'last_number': await _highest_case_number(session, columns, key)
+        })
+        # Whoever seeded it, the row exists now
+        last = await _claim_numbers(session, key, count)
+    return last - count + 1
+
 def calculate_progress(status: str) -> int:
     """Calculate progress percentage based on status"""
     progress_map = {
         'pending': 10,
         'in_progress': 50,
-        'completed': 100
+        'completed': 100,
+        'picked_up': 100,
+        'archived': 100
     }
     return progress_map.get(status, 0)
 
@@ -41,4 +112,4 @@ def get_estimated_completion_days(urgency: str) -> int:
         'high': 3,
         'critical': 1
     }
-    return urgency_days.get(urgency, 5)
\ No newline at end of file
+    return urgency_days.get(urgency, 5)
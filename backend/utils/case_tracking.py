@@ -0,0 +1,108 @@
+"""
+Public Case Tracking lookups
+DataLab Georgia - compact status/progress projection behind an LRU cache
+
+Only status-related columns are selected (no name/email/phone/description),
+the lookup probes the unique case_id index of the hot and archive tables in
+one query, and unknown IDs are negatively cached for a short TTL so case-ID
+enumeration does not reach the database.
+"""
+
+import os
+import re
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.ServiceRequestSQL import ServiceRequestSQL
+from models.ServiceRequestArchiveSQL import ServiceRequestArchiveSQL
+from utils.case_generator import calculate_progress
+from utils.ttl_cache import TTLCache, MISSING
+
+TRACKING_CACHE_SIZE = int(os.environ.get('TRACKING_CACHE_SIZE', '5000'))
+TRACKING_CACHE_TTL = float(os.environ.get('TRACKING_CACHE_TTL', '10'))
+TRACKING_NEGATIVE_TTL = float(os.environ.get('TRACKING_NEGATIVE_TTL', '30'))
+
+CASE_ID_PATTERN = re.compile(r'^DL\d{7,}$')
+
+# Marks "known not to exist" in the cache
+NOT_FOUND = object()
+
+tracking_cache = TTLCache(TRACKING_CACHE_SIZE, TRACKING_CACHE_TTL)
+
+TRACKING_COLUMNS = (
+    ServiceRequestSQL.case_id,
+    ServiceRequestSQL.device_type,
+    ServiceRequestSQL.urgency,
+    ServiceRequestSQL.status,
+    ServiceRequestSQL.created_at,
+    ServiceRequestSQL.started_at,
+    ServiceRequestSQL.completed_at,
+    ServiceRequestSQL.estimated_completion,
+    ServiceRequestSQL.price,
+    ServiceRequestSQL.is_archived,
+)
+
+# Same projection over cold storage (utils/archiver.py)
+ARCHIVE_TRACKING_COLUMNS = tuple(
+    getattr(ServiceRequestArchiveSQL, column.key) for column in TRACKING_COLUMNS
+)
+
+
+def normalize_case_id(case_id: str) -> str:
+    return case_id.strip().upper()
+
+
+def tracking_projection(row) -> dict:
+    """Status-only view of a service request row"""
+    status = 'archived' if row.is_archived else row.status
+    return {
+        "case_id": row.case_id,
+        "device_type": row.device_type,
+        "urgency": row.urgency,
+        "status": status,
+        "progress_percentage": calculate_progress(status),
+        "created_at": row.created_at,
+        "started_at": row.started_at,
+        "completed_at": row.completed_at,
+        "estimated_completion": row.estimated_completion.strftime('%Y-%m-%d') if row.estimated_completion else None,
+        "price": float(row.price) if row.price else None,
+        "is_archived": bool(row.is_archived)
+    }
+
+
+async def lookup_case(session: AsyncSession, case_id: str) -> Optional[dict]:
+    """Tracking projection for `case_id`, or None if no such case exists"""
+    key = normalize_case_id(case_id)
+    cached = tracking_cache.get(key)
+    if cached is NOT_FOUND:
+        return None
+    if cached is not MISSING:
+        return cached
+
+    # Malformed IDs can never match - answer without a query
+    if not CASE_ID_PATTERN.match(key):
+        tracking_cache.set(key, NOT_FOUND, TRACKING_NEGATIVE_TTL)
+        return None
+
+    # Hot and archive tables in one round trip, each via its case_id index
+    result = await session.execute(
+        select(*TRACKING_COLUMNS).where(ServiceRequestSQL.case_id == key).union_all(
+            select(*ARCHIVE_TRACKING_COLUMNS).where(ServiceRequestArchiveSQL.case_id == key)
+        ).limit(1)
+    )
+    row = result.first()
+    if row is None:
+        tracking_cache.set(key, NOT_FOUND, TRACKING_NEGATIVE_TTL)
+        return None
+
+    payload = tracking_projection(row)
+    tracking_cache.set(key, payload)
+    return payload
+
+
+def invalidate_case(case_id: Optional[str]):
+    """Drop a case from the tracking cache after it was created or changed"""
+    if case_id:
+        tracking_cache.invalidate(normalize_case_id(case_id))
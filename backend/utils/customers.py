@@ -0,0 +1,248 @@
+"""
+Customers - identity resolution for form submissions
+DataLab Georgia - links service requests and contact messages to one customer row
+
+`upsert_customer` probes the two unique keys (normalized email, normalized
+phone) in one statement. A customer with the same email is refreshed;
+otherwise a new customer is inserted with ON CONFLICT DO NOTHING so two
+concurrent first submissions still end up on the same row. A phone number
+that already belongs to a customer with another email is stored on the new
+row but not claimed as its phone_key. Submissions call it inside their own
+transaction; with WRITE_BATCHING the group-commit writer does it for the
+whole batch.
+
+Rows written before the customers table existed are linked by
+`CustomerBackfill`, which runs at startup and walks each table in batches,
+one short transaction each. It waits while the archiver is moving cases
+between tiers, and a table that fails is retried after
+CUSTOMER_BACKFILL_RETRY_SECONDS:
+
+    CUSTOMER_BACKFILL_ENABLED=true
+    CUSTOMER_BACKFILL_BATCH_SIZE=500
+    CUSTOMER_BACKFILL_RETRY_SECONDS=300
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select, update, or_, bindparam
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models.CustomerSQL import CustomerSQL
+from models.ServiceRequestSQL import ServiceRequestSQL
+from models.ServiceRequestArchiveSQL import ServiceRequestArchiveSQL
+from models.ContactMessageSQL import ContactMessageSQL
+from utils.archiver import case_archiver
+
+CUSTOMER_BACKFILL_ENABLED = os.environ.get('CUSTOMER_BACKFILL_ENABLED', 'true').lower() == 'true'
+CUSTOMER_BACKFILL_BATCH_SIZE = int(os.environ.get('CUSTOMER_BACKFILL_BATCH_SIZE', '500'))
+CUSTOMER_BACKFILL_RETRY_SECONDS = float(os.environ.get('CUSTOMER_BACKFILL_RETRY_SECONDS', '300'))
+
+# Tables whose rows carry customer_id
+CUSTOMER_TABLES = (ServiceRequestSQL, ServiceRequestArchiveSQL, ContactMessageSQL)
+# ... and the ones the archiver moves rows between
+ARCHIVED_TABLES = (ServiceRequestSQL, ServiceRequestArchiveSQL)
+
+GEORGIA_COUNTRY_CODE = '995'
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Digits only, without the Georgian country code; None if nothing is left"""
+    digits = re.sub(r'\D', '', phone or '')
+    if digits.startswith('00'):
+        digits = digits[2:]
+    if digits.startswith(GEORGIA_COUNTRY_CODE) and len(digits) == 12:
+        digits = digits[3:]
+    return digits or None
+
+
+_find_customer = select(CustomerSQL.id, CustomerSQL.email_key).where(
+    or_(CustomerSQL.email_key == bindparam('email_key'), CustomerSQL.phone_key == bindparam('phone_key'))
+)
+
+# Only a newer submission moves last_seen_at / name (the backfill replays old rows)
+_touch_customer = update(CustomerSQL).where(
+    CustomerSQL.id == bindparam('customer_id'),
+    or_(CustomerSQL.last_seen_at.is_(None), CustomerSQL.last_seen_at < bindparam('seen_at'))
+).values(
+    name=bindparam('name'), last_seen_at=bindparam('seen_at')
+).execution_options(synchronize_session=False)
+
+_insert_customer = {
+    name: insert(CustomerSQL).values({
+        column: bindparam(column) for column in
+        ('name', 'email', 'phone', 'email_key', 'phone_key', 'created_at', 'last_seen_at')
+    }).on_conflict_do_nothing().returning(CustomerSQL.id)
+    for name, insert in (('sqlite', sqlite_insert), ('postgresql', postgresql_insert))
+}
+
+
+async def _find(session: AsyncSession, email_key: str,
+                phone_key: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """(customer with this email, customer with this phone)"""
+    result = await session.execute(_find_customer, {'email_key': email_key, 'phone_key': phone_key})
+    by_email = by_phone = None
+    for match in result.all():
+        if match.email_key == email_key:
+            by_email = match.id
+        else:
+            by_phone = match.id
+    return by_email, by_phone
+
+
+async def upsert_customer(session: AsyncSession, name: str, email: str, phone: Optional[str],
+                          seen_at: Optional[datetime] = None) -> int:
+    """Customer id for this contact, creating or refreshing the row (the caller commits)"""
+    email_key, phone_key = normalize_email(email), normalize_phone(phone)
+    seen_at = seen_at or datetime.utcnow()
+
+    while True:
+        by_email, by_phone = await _find(session, email_key, phone_key)
+        if by_email is not None:
+            await session.execute(_touch_customer, {'customer_id': by_email, 'name': name, 'seen_at': seen_at})
+            return by_email
+        # Email identifies a customer more reliably than a (shared) phone number,
+        # so a new email is a new customer even if someone already has the phone
+        customer_id = await session.scalar(_insert_customer[session.bind.dialect.name], {
+            'name': name, 'email': email, 'phone': phone, 'email_key': email_key,
+            'phone_key': phone_key if by_phone is None else None,
+            'created_at': seen_at, 'last_seen_at': seen_at
+        })
+        if customer_id is not None:
+            return customer_id
+        # Lost an insert race on one of the keys - look again
+
+
+async def assign_customer(session: AsyncSession, row):
+    """Set customer_id on a new service request / contact message before it is committed"""
+    row.customer_id = await upsert_customer(session, row.name, row.email, row.phone)
+
+
+def _link_statement(model):
+    table = model.__table__
+    # Core executemany: a row archived (or linked) since it was read just matches nothing
+    return update(table).where(
+        table.c.id == bindparam('row_id'),
+        table.c.customer_id.is_(None)
+    ).values(customer_id=bindparam('link_customer_id'))
+
+
+_LINKS = {model: _link_statement(model) for model in CUSTOMER_TABLES}
+
+
+async def backfill_batch(session: AsyncSession, model, batch_size: int = CUSTOMER_BACKFILL_BATCH_SIZE) -> int:
+    """Link up to `batch_size` rows of `model` that have no customer yet; returns rows read"""
+    result = await session.execute(
+        select(model.id, model.name, model.email, model.phone, model.created_at).where(
+            model.customer_id.is_(None)
+        ).order_by(model.id).limit(batch_size)
+    )
+    rows = result.all()
+    if not rows:
+        return 0
+
+    resolved: Dict[Tuple[str, Optional[str]], int] = {}
+    links = []
+    for row in rows:
+        key = (normalize_email(row.email), normalize_phone(row.phone))
+        if key not in resolved:
+            resolved[key] = await upsert_customer(session, row.name, row.email, row.phone, row.created_at)
+        links.append({"row_id": row.id, "link_customer_id": resolved[key]})
+    await session.execute(_LINKS[model], links)
+    await session.commit()
+    return len(rows)
+
+
+class CustomerBackfill:
+    """Links pre-existing rows to customers in the background"""
+
+    def __init__(self, session_factory, batch_size: int = CUSTOMER_BACKFILL_BATCH_SIZE):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.linked: Dict[str, int] = {}
+        self.last_run_at: Optional[datetime] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop(), name="customer-backfill")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> dict:
+        """Link every row that has no customer yet, one batch per transaction"""
+        async with self._lock:
+            started = time.perf_counter()
+            errors = []
+            for model in CUSTOMER_TABLES:
+                table = model.__tablename__
+                try:
+                    await self._backfill_table(model)
+                except Exception as e:
+                    # The other tables still get their turn; this one is retried
+                    errors.append(f"{table}: {e}")
+                    logging.error(f"Error backfilling customers for {table}: {e}")
+            self.last_error = "; ".join(errors) or None
+
+            self.last_run_at = datetime.utcnow()
+            self.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            if any(self.linked.values()):
+                logging.info(f"Customer backfill linked rows: {self.linked}")
+            return self.stats()
+
+    async def _backfill_table(self, model):
+        table = model.__tablename__
+        while True:
+            # Not while the archiver is moving cases out from under the batch
+            guard = case_archiver.exclusive() if model in ARCHIVED_TABLES else nullcontext()
+            async with guard, self.session_factory() as session:
+                count = await backfill_batch(session, model, self.batch_size)
+            self.linked[table] = self.linked.get(table, 0) + count
+            if count < self.batch_size:
+                return
+            # Let request handlers at the database between batches
+            await asyncio.sleep(0)
+
+    async def _loop(self):
+        while True:
+            await self.run_once()
+            if self.last_error is None:
+                return
+            await asyncio.sleep(CUSTOMER_BACKFILL_RETRY_SECONDS)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": CUSTOMER_BACKFILL_ENABLED,
+            "batch_size": self.batch_size,
+            "running": self._lock.locked(),
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_duration_ms": self.last_duration_ms,
+            "last_error": self.last_error,
+            "linked": self.linked
+        }
+
+
+customer_backfill = CustomerBackfill(AsyncSessionLocal)
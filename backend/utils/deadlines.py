@@ -0,0 +1,207 @@
+"""
+Request Deadlines - per-request time budgets carried into the database
+DataLab Georgia - a slow query gives its connection back instead of holding it
+
+`DeadlineMiddleware` gives each /api request a budget of REQUEST_TIMEOUT_MS,
+stores the absolute deadline in the `request_deadline` contextvar and runs the
+handler under `asyncio.timeout`. When the budget runs out the handler task is
+cancelled (CancelledError skips the routes' `except Exception` blocks), the
+client gets 504 and the timeout is counted against the route template.
+
+The same deadline is enforced inside the database so the connection is free
+again promptly rather than when the query would have finished:
+
+  * SQLite - a progress handler on every connection interrupts the running
+    statement once the deadline of the request that issued it has passed;
+  * PostgreSQL - each transaction begins with
+    `set_config('statement_timeout', <remaining ms>, true)`.
+
+Database deadlines get DEADLINE_DB_GRACE_MS extra so the handler is normally
+cancelled first and answers 504 rather than a 500 from the interrupted query.
+Background jobs (archiver, maintenance, group commit) run outside any request
+and have no deadline.
+
+    REQUEST_TIMEOUT_MS=15000          per-request budget (0 disables)
+    DEADLINE_DB_GRACE_MS=50
+    DEADLINE_EXEMPT_PATHS=...         comma-separated path prefixes without a budget
+"""
+
+import asyncio
+import json
+import os
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from sqlalchemy.util import await_only
+
+REQUEST_TIMEOUT_MS = float(os.environ.get('REQUEST_TIMEOUT_MS', '15000'))
+DEADLINE_DB_GRACE_MS = float(os.environ.get('DEADLINE_DB_GRACE_MS', '50'))
+# Admin jobs that are expected to run long (VACUUM, archival, importtime capture)
+DEADLINE_EXEMPT_PATHS = tuple(
+    prefix.strip() for prefix in os.environ.get(
+        'DEADLINE_EXEMPT_PATHS',
+        '/api/admin/maintenance,/api/service-requests/archive/run,/api/customers/backfill/run,/api/admin/sla/refresh,/api/admin/analytics/export,/api/admin/startup-profile'
+    ).split(',') if prefix.strip()
+)
+
+# SQLite VM instructions between deadline checks
+SQLITE_PROGRESS_STEPS = 1000
+
+# Absolute time.monotonic() deadline of the current request, if any
+request_deadline: ContextVar[Optional[float]] = ContextVar('request_deadline', default=None)
+
+
+def remaining_ms() -> Optional[float]:
+    """Milliseconds left for the current request (None without a deadline)"""
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return (deadline - time.monotonic()) * 1000
+
+
+class TimeoutCounter:
+    """504s per route template"""
+
+    def __init__(self):
+        self.by_route: Dict[str, int] = {}
+        self.db_interrupts = 0
+
+    def record(self, route: str):
+        self.by_route[route] = self.by_route.get(route, 0) + 1
+
+    def stats(self) -> dict:
+        return {
+            "request_timeout_ms": REQUEST_TIMEOUT_MS,
+            "total": sum(self.by_route.values()),
+            "by_route": dict(sorted(self.by_route.items(), key=lambda item: -item[1])),
+            "sqlite_interrupts": self.db_interrupts
+        }
+
+
+request_timeouts = TimeoutCounter()
+
+
+class DeadlineMiddleware:
+    """Pure ASGI middleware enforcing REQUEST_TIMEOUT_MS on /api requests"""
+
+    def __init__(self, app, timeout_ms: float = REQUEST_TIMEOUT_MS):
+        self.app = app
+        self.timeout = timeout_ms / 1000
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        if (scope["type"] != "http" or self.timeout <= 0
+                or not path.startswith('/api') or path.startswith(DEADLINE_EXEMPT_PATHS)):
+            return await self.app(scope, receive, send)
+
+        started = False
+
+        async def send_tracking_start(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        token = request_deadline.set(time.monotonic() + self.timeout)
+        budget = asyncio.timeout(self.timeout)
+        try:
+            async with budget:
+                await self.app(scope, receive, send_tracking_start)
+        except TimeoutError:
+            if not budget.expired():
+                raise
+            route = scope.get("route")
+            request_timeouts.record(f"{scope['method']} {route.path if route is not None else path}")
+            if not started:
+                body = json.dumps({"detail": "Request timed out"}).encode()
+                await send({
+                    "type": "http.response.start",
+                    "status": 504,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"content-length", str(len(body)).encode())
+                    ]
+                })
+                await send({"type": "http.response.body", "body": body})
+        finally:
+            request_deadline.reset(token)
+
+
+# --- database enforcement ---------------------------------------------------------
+
+def _db_deadline() -> Optional[float]:
+    deadline = request_deadline.get()
+    return None if deadline is None else deadline + DEADLINE_DB_GRACE_MS / 1000
+
+
+def _install_sqlite_progress_handler(dbapi_connection, connection_record):
+    # One mutable slot per connection: set from the event loop before each
+    # statement, read by the progress handler on aiosqlite's worker thread
+    slot = connection_record.info['deadline'] = [None]
+
+    def check_deadline():
+        deadline = slot[0]
+        if deadline is not None and time.monotonic() > deadline:
+            request_timeouts.db_interrupts += 1
+            return 1  # non-zero interrupts the statement
+        return 0
+
+    await_only(connection_record.driver_connection.set_progress_handler(check_deadline, SQLITE_PROGRESS_STEPS))
+
+
+def _set_statement_deadline(conn, cursor, statement, parameters, context, executemany):
+    slot = conn.connection.info.get('deadline')
+    if slot is not None:
+        slot[0] = _db_deadline()
+
+
+def _clear_statement_deadline(conn, *args):
+    slot = conn.connection.info.get('deadline')
+    if slot is not None:
+        slot[0] = None
+
+
+def _on_statement_error(exception_context):
+    conn = exception_context.connection
+    if conn is None or conn.invalidated:
+        return
+    slot = conn.connection.info.get('deadline')
+    if slot is None:
+        return
+    if isinstance(exception_context.original_exception, Exception):
+        # The statement itself failed and is no longer running
+        slot[0] = None
+    else:
+        # The awaiting task was cancelled (deadline, client gone) while the
+        # statement keeps running on the worker thread - interrupt it now
+        slot[0] = 0.0
+
+
+def _set_postgresql_statement_timeout(session, transaction, connection):
+    if connection.dialect.name != 'postgresql':
+        return
+    deadline = _db_deadline()
+    if deadline is None:
+        return
+    timeout_ms = max(int((deadline - time.monotonic()) * 1000), 1)
+    # is_local=true: reset automatically when the transaction ends
+    connection.execute(
+        text("SELECT set_config('statement_timeout', :timeout, true)"),
+        {"timeout": str(timeout_ms)}
+    )
+
+
+def install_deadlines(*engines):
+    """Enforce request deadlines on these engines' connections and on every ORM transaction"""
+    for engine in engines:
+        sync_engine = engine.sync_engine
+        if sync_engine.dialect.name == 'sqlite':
+            event.listen(sync_engine, "connect", _install_sqlite_progress_handler)
+            event.listen(sync_engine, "before_cursor_execute", _set_statement_deadline)
+            event.listen(sync_engine, "after_cursor_execute", _clear_statement_deadline)
+            event.listen(sync_engine, "handle_error", _on_statement_error)
+    if not event.contains(Session, "after_begin", _set_postgresql_statement_timeout):
+        event.listen(Session, "after_begin", _set_postgresql_statement_timeout)
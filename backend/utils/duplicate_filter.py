@@ -0,0 +1,262 @@
+"""
+Duplicate submission filter - content fingerprints with a Bloom-filter precheck
+DataLab Georgia - a repeated form submission is answered without a second insert
+
+Every service request / contact message is fingerprinted: SHA-256 over the
+normalized email and phone (utils/customers.py) and the case-folded text with
+punctuation and whitespace runs collapsed, so resubmitting the same form -
+double clicks, "send" pressed again after a slow response, copy-pasted spam -
+hashes the same.
+
+  * not in the in-memory Bloom filter  -> certainly new, no DB lookup;
+  * in the filter                       -> confirmed against
+    `submission_fingerprints` (one index probe); a hit within the window is a
+    duplicate, a miss is a Bloom false positive and proceeds normally;
+  * identical submission still running  -> waits for it and shares its result.
+
+A duplicate is merged by default (the original response is returned again
+with `Duplicate-Submission: merged`) or, with DUPLICATE_ACTION=reject,
+answered with 409. Accepted submissions store their fingerprint and response
+in the same transaction as the row itself.
+
+The filter has two generations and rotates once per window, so anything seen
+in the last window is always in it; on start it is warmed from the table,
+and rows older than the window are pruned at each rotation. It is per
+process - the table is shared, but only consulted after a local hit.
+
+    DUPLICATE_FILTER_ENABLED=true
+    DUPLICATE_WINDOW_MINUTES=10
+    DUPLICATE_ACTION=merge            merge | reject
+    DUPLICATE_BLOOM_BITS=1048576      bits per generation (128 KiB)
+    DUPLICATE_BLOOM_HASHES=7
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import unicodedata
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import select, delete, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models.SubmissionFingerprintSQL import SubmissionFingerprintSQL
+from utils.customers import normalize_email, normalize_phone
+
+DUPLICATE_FILTER_ENABLED = os.environ.get('DUPLICATE_FILTER_ENABLED', 'true').lower() == 'true'
+DUPLICATE_WINDOW_MINUTES = float(os.environ.get('DUPLICATE_WINDOW_MINUTES', '10'))
+DUPLICATE_ACTION = os.environ.get('DUPLICATE_ACTION', 'merge').lower()
+DUPLICATE_BLOOM_BITS = int(os.environ.get('DUPLICATE_BLOOM_BITS', str(1 << 20)))
+DUPLICATE_BLOOM_HASHES = int(os.environ.get('DUPLICATE_BLOOM_HASHES', '7'))
+
+
+def _normalize_text(value: Optional[str]) -> str:
+    folded = unicodedata.normalize('NFKC', value or '').casefold()
+    return ' '.join(re.sub(r'[\W_]+', ' ', folded).split())
+
+
+def fingerprint(kind: str, email: str, phone: Optional[str], *texts: Optional[str]) -> str:
+    """Hex SHA-256 of a submission's normalized contact details and text"""
+    parts = [kind, normalize_email(email), normalize_phone(phone) or '', *(_normalize_text(text) for text in texts)]
+    return hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+
+
+class RotatingBloomFilter:
+    """Two-generation Bloom filter over SHA-256 fingerprints"""
+
+    def __init__(self, bits: int = DUPLICATE_BLOOM_BITS, hashes: int = DUPLICATE_BLOOM_HASHES):
+        self.bits = max(bits - bits % 8, 8)
+        self.hashes = hashes
+        self.current = bytearray(self.bits // 8)
+        self.previous = bytearray(self.bits // 8)
+
+    def _positions(self, fingerprint: str) -> List[int]:
+        # The fingerprint is already uniform: double hashing over two 64-bit slices
+        digest = bytes.fromhex(fingerprint)
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, fingerprint: str):
+        for position in self._positions(fingerprint):
+            self.current[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, fingerprint: str) -> bool:
+        positions = self._positions(fingerprint)
+        return any(
+            all(generation[position >> 3] & (1 << (position & 7)) for position in positions)
+            for generation in (self.current, self.previous)
+        )
+
+    def rotate(self):
+        self.previous = self.current
+        self.current = bytearray(self.bits // 8)
+
+    def fill_ratio(self) -> float:
+        return int.from_bytes(self.current, 'little').bit_count() / self.bits
+
+
+_find_recent = select(SubmissionFingerprintSQL.response).where(
+    SubmissionFingerprintSQL.fingerprint == bindparam('fingerprint'),
+    SubmissionFingerprintSQL.created_at >= bindparam('since')
+).order_by(SubmissionFingerprintSQL.created_at.desc()).limit(1)
+
+
+class DuplicateFilter:
+    """Fingerprint check in front of the form-submission handlers"""
+
+    def __init__(self, session_factory, enabled: bool = DUPLICATE_FILTER_ENABLED,
+                 window_minutes: float = DUPLICATE_WINDOW_MINUTES, action: str = DUPLICATE_ACTION):
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self.window = timedelta(minutes=window_minutes)
+        self.action = action
+        self.bloom = RotatingBloomFilter()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.checked = 0
+        self.cleared_in_memory = 0
+        self.db_checks = 0
+        self.false_positives = 0
+        self.duplicates = 0
+        self.last_pruned = 0
+
+    # -- request path ---------------------------------------------------------------
+
+    async def run(
+        self,
+        kind: str,
+        fingerprint: str,
+        session: AsyncSession,
+        create: Callable[[Optional[Callable[[dict], SubmissionFingerprintSQL]]], Awaitable[dict]],
+        response: Optional[Response] = None
+    ) -> dict:
+        """Answer a duplicate from its original, otherwise run `create(record)`
+
+        `create` builds the row and calls `record(result)` for the fingerprint
+        row to add to its own transaction; `record` is None when disabled.
+        """
+        if not self.enabled:
+            return await create(None)
+        self.checked += 1
+
+        pending = self._in_flight.get(fingerprint)
+        if pending is not None:
+            try:
+                # shield: a disconnecting duplicate must not cancel the original
+                original = await asyncio.shield(pending)
+            except Exception:
+                # The original failed (its handler's 500 included) - this one gets its own attempt
+                original = None
+            if original is not None:
+                return self._duplicate(original, response)
+
+        if fingerprint in self.bloom:
+            self.db_checks += 1
+            original = await session.scalar(_find_recent, {
+                'fingerprint': fingerprint, 'since': datetime.utcnow() - self.window
+            })
+            if original is not None:
+                return self._duplicate(json.loads(original), response)
+            self.false_positives += 1
+        else:
+            self.cleared_in_memory += 1
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[fingerprint] = future
+        try:
+            result = await create(lambda result: SubmissionFingerprintSQL(
+                kind=kind, fingerprint=fingerprint, response=json.dumps(result), created_at=datetime.utcnow()
+            ))
+        except BaseException as e:
+            future.set_exception(e if isinstance(e, Exception) else asyncio.CancelledError())
+            future.exception()  # mark retrieved; waiters fall back on their own
+            raise
+        finally:
+            if self._in_flight.get(fingerprint) is future:
+                del self._in_flight[fingerprint]
+        self.bloom.add(fingerprint)
+        future.set_result(result)
+        return result
+
+    def _duplicate(self, original: dict, response: Optional[Response]) -> dict:
+        self.duplicates += 1
+        if self.action == 'reject':
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "This submission was already received", "original": original}
+            )
+        if response is not None:
+            response.headers["Duplicate-Submission"] = "merged"
+        return original
+
+    # -- background: warm-up, rotation, pruning --------------------------------------
+
+    async def start(self):
+        if not self.enabled:
+            return
+        try:
+            await self._warm()
+        except Exception as e:
+            logging.error(f"Error warming duplicate filter: {e}")
+        self._task = asyncio.create_task(self._loop(), name="duplicate-filter")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _warm(self):
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(SubmissionFingerprintSQL.fingerprint).where(
+                    SubmissionFingerprintSQL.created_at >= datetime.utcnow() - self.window
+                )
+            )
+            for (value,) in result.all():
+                self.bloom.add(value)
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.window.total_seconds())
+            self.bloom.rotate()
+            try:
+                async with self.session_factory() as session:
+                    result = await session.execute(
+                        delete(SubmissionFingerprintSQL).where(
+                            SubmissionFingerprintSQL.created_at < datetime.utcnow() - self.window
+                        )
+                    )
+                    await session.commit()
+                self.last_pruned = result.rowcount
+            except Exception as e:
+                logging.error(f"Error pruning submission fingerprints: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "action": self.action,
+            "window_minutes": self.window.total_seconds() / 60,
+            "checked": self.checked,
+            "cleared_in_memory": self.cleared_in_memory,
+            "db_checks": self.db_checks,
+            "false_positives": self.false_positives,
+            "duplicates": self.duplicates,
+            "in_flight": len(self._in_flight),
+            "bloom_fill_ratio": round(self.bloom.fill_ratio(), 6),
+            "last_pruned": self.last_pruned
+        }
+
+
+duplicate_filter = DuplicateFilter(AsyncSessionLocal)
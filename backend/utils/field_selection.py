@@ -0,0 +1,41 @@
+"""
+Sparse field selection for listing endpoints
+DataLab Georgia - `?fields=case_id,name,status` support
+
+`parse_fields` validates the requested names against the endpoint's response
+model; handlers then select only those columns and serialize them with the
+repository's row encoder (repositories/base.py), which bypasses response-model
+validation (a partial row would not satisfy the full model). Without `fields`
+handlers return every field of the response model.
+"""
+
+from typing import Iterable, List, Optional, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+
+def parse_fields(fields: Optional[str], model: Type[BaseModel]) -> Optional[List[str]]:
+    """Requested field names (always led by `id`), or None for the full model"""
+    if fields is None:
+        return None
+    requested = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = [name for name in requested if name not in model.model_fields]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # `id` is always included so clients can key and update rows; model order,
+    # so a permutation of the same fields is the same cached statement
+    wanted = set(requested)
+    return ['id'] + [name for name in model.model_fields if name in wanted and name != 'id']
+
+
+def columns_for(entity, names: Iterable[str]) -> list:
+    return [getattr(entity, name) for name in names]
+
+
+def format_date(value) -> str:
+    return value.strftime('%Y-%m-%d')
+
+
+def to_float(value) -> Optional[float]:
+    return float(value) if value else None
@@ -0,0 +1,170 @@
+"""
+Health Monitor for liveness/readiness probes
+DataLab Georgia - keeps probe traffic off the database connection pool
+
+A single background task refreshes the database connectivity result at a
+fixed interval and samples event-loop lag, so `/livez` and `/readyz` answer
+from memory instead of checking out a pooled session on every poll.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.sql import text
+
+# Probe tuning (seconds / ratios), overridable through the environment
+HEALTH_CHECK_INTERVAL = float(os.environ.get('HEALTH_CHECK_INTERVAL', '5'))
+HEALTH_DB_TIMEOUT = float(os.environ.get('HEALTH_DB_TIMEOUT', '2'))
+HEALTH_LAG_INTERVAL = float(os.environ.get('HEALTH_LAG_INTERVAL', '0.5'))
+READINESS_MAX_LOOP_LAG_MS = float(os.environ.get('READINESS_MAX_LOOP_LAG_MS', '250'))
+READINESS_MAX_POOL_USAGE = float(os.environ.get('READINESS_MAX_POOL_USAGE', '0.9'))
+READINESS_MAX_DB_AGE = float(os.environ.get('READINESS_MAX_DB_AGE', str(HEALTH_CHECK_INTERVAL * 3)))
+
+
+class HealthMonitor:
+    """Caches database connectivity and tracks event-loop lag in the background"""
+
+    def __init__(self, engine, read_engine=None):
+        self.engine = engine
+        self.read_engine = read_engine
+        self.db_ok: bool = False
+        self.db_error: Optional[str] = None
+        self.db_latency_ms: Optional[float] = None
+        self.db_checked_at: Optional[float] = None
+        self.loop_lag_ms: float = 0.0
+        self.max_loop_lag_ms: float = 0.0
+        self.started_at = time.monotonic()
+        self._tasks = []
+
+    async def start(self):
+        """Run the first DB check inline, then keep refreshing in the background"""
+        await self.check_database()
+        self._tasks = [
+            asyncio.create_task(self._db_loop(), name="health-db-check"),
+            asyncio.create_task(self._lag_loop(), name="health-loop-lag"),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _ping(self):
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def check_database(self):
+        """Run `SELECT 1` on a short-lived connection and record the outcome"""
+        started = time.perf_counter()
+        try:
+            # The pool checkout counts too: an exhausted pool must fail the
+            # check within HEALTH_DB_TIMEOUT, not after the pool timeout
+            await asyncio.wait_for(self._ping(), HEALTH_DB_TIMEOUT)
+            self.db_ok = True
+            self.db_error = None
+        except asyncio.TimeoutError:
+            self.db_ok = False
+            self.db_error = f"no connection or reply within {HEALTH_DB_TIMEOUT}s"
+            logging.warning(f"Health check: database unreachable: {self.db_error}")
+        except Exception as e:
+            self.db_ok = False
+            self.db_error = str(e) or e.__class__.__name__
+            logging.warning(f"Health check: database unreachable: {self.db_error}")
+        self.db_latency_ms = round((time.perf_counter() - started) * 1000, 2)
+        self.db_checked_at = time.monotonic()
+
+    async def _db_loop(self):
+        while True:
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL)
+            await self.check_database()
+
+    async def _lag_loop(self):
+        # Lag = how late the loop wakes us up compared to the requested sleep
+        window_max = 0.0
+        samples = 0
+        while True:
+            expected = time.perf_counter() + HEALTH_LAG_INTERVAL
+            await asyncio.sleep(HEALTH_LAG_INTERVAL)
+            lag_ms = max(0.0, (time.perf_counter() - expected) * 1000)
+            self.loop_lag_ms = round(lag_ms, 2)
+            window_max = max(window_max, lag_ms)
+            samples += 1
+            if samples * HEALTH_LAG_INTERVAL >= HEALTH_CHECK_INTERVAL:
+                self.max_loop_lag_ms = round(window_max, 2)
+                window_max = 0.0
+                samples = 0
+
+    def pool_stats(self, engine=None) -> dict:
+        """Snapshot of an engine's connection pool usage (the write engine by default)"""
+        pool = (engine or self.engine).pool
+        stats = {"type": pool.__class__.__name__}
+        try:
+            size = pool.size()
+            checked_out = pool.checkedout()
+            capacity = size + max(getattr(pool, '_max_overflow', 0), 0)
+            stats.update({
+                "size": size,
+                "checked_out": checked_out,
+                "overflow": pool.overflow(),
+                "capacity": capacity,
+                "usage": round(checked_out / capacity, 3) if capacity else 0.0,
+            })
+        except (AttributeError, NotImplementedError):
+            # NullPool/StaticPool don't track checkouts
+            stats["usage"] = 0.0
+        return stats
+
+    def liveness(self) -> dict:
+        return {
+            "status": "alive",
+            "uptime_seconds": round(time.monotonic() - self.started_at, 1),
+            "loop_lag_ms": self.loop_lag_ms,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+
+    def readiness(self) -> tuple:
+        """Return (ready, payload) based on cached DB state, pool usage and loop lag"""
+        reasons = []
+        db_age = None
+        if self.db_checked_at is not None:
+            db_age = round(time.monotonic() - self.db_checked_at, 1)
+
+        if not self.db_ok:
+            reasons.append("database_unreachable")
+        elif db_age is None or db_age > READINESS_MAX_DB_AGE:
+            reasons.append("database_check_stale")
+
+        pool = self.pool_stats()
+        if pool.get("usage", 0.0) >= READINESS_MAX_POOL_USAGE:
+            reasons.append("pool_saturated")
+
+        lag = max(self.loop_lag_ms, self.max_loop_lag_ms)
+        if lag >= READINESS_MAX_LOOP_LAG_MS:
+            reasons.append("event_loop_lag")
+
+        ready = not reasons
+        return ready, {
+            "status": "ready" if ready else "not_ready",
+            "reasons": reasons,
+            "database": {
+                "status": "connected" if self.db_ok else "disconnected",
+                "error": self.db_error,
+                "latency_ms": self.db_latency_ms,
+                "checked_seconds_ago": db_age
+            },
+            "pool": pool,
+            # Reported only - a saturated read pool must not take writes out of rotation
+            "read_pool": self.pool_stats(self.read_engine) if self.read_engine is not None else None,
+            "loop_lag_ms": self.loop_lag_ms,
+            "max_loop_lag_ms": self.max_loop_lag_ms,
+            "timestamp": datetime.utcnow().isoformat()
+        }
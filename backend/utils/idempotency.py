@@ -0,0 +1,111 @@
+"""
+Idempotency-Key support for form submissions
+DataLab Georgia - replays the original response for retried submissions
+
+Entries hold the asyncio.Future of the first request carrying a key, so a
+concurrent duplicate awaits the in-flight result and a later retry gets the
+finished one without touching the case allocator or inserting again. The
+store is bounded (oldest keys evicted first) and entries expire after a TTL.
+Failed submissions are forgotten so the client can retry with the same key.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Response
+
+IDEMPOTENCY_TTL = float(os.environ.get('IDEMPOTENCY_TTL', '86400'))
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get('IDEMPOTENCY_MAX_KEYS', '10000'))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+class _Entry:
+    __slots__ = ('future', 'fingerprint', 'expires_at')
+
+    def __init__(self, future: asyncio.Future, fingerprint: str, expires_at: float):
+        self.future = future
+        self.fingerprint = fingerprint
+        self.expires_at = expires_at
+
+
+class IdempotencyStore:
+    """Bounded TTL map of (scope, key) -> in-flight or completed result"""
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL, max_keys: int = IDEMPOTENCY_MAX_KEYS):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self.replays = 0
+
+    async def run(
+        self,
+        scope: str,
+        key: Optional[str],
+        payload: Any,
+        handler: Callable[[], Awaitable[Any]],
+        response: Optional[Response] = None
+    ) -> Any:
+        """Run `handler` once per (scope, key); duplicates share its result"""
+        if not key:
+            return await handler()
+        if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise HTTPException(status_code=400, detail="Idempotency-Key is too long")
+
+        fingerprint = _fingerprint(payload)
+        now = time.monotonic()
+        entry_key = (scope, key)
+        entry = self._entries.get(entry_key)
+        if entry is not None and entry.expires_at <= now:
+            del self._entries[entry_key]
+            entry = None
+
+        if entry is not None:
+            if entry.fingerprint != fingerprint:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used with a different request body"
+                )
+            self.replays += 1
+            if response is not None:
+                response.headers["Idempotent-Replayed"] = "true"
+            # shield: a disconnecting duplicate must not cancel the original
+            return await asyncio.shield(entry.future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._evict(now)
+        self._entries[entry_key] = _Entry(future, fingerprint, now + self.ttl)
+
+        try:
+            result = await handler()
+        except BaseException as e:
+            # Forget failures so a retry with the same key runs again
+            if self._entries.get(entry_key) is not None and self._entries[entry_key].future is future:
+                del self._entries[entry_key]
+            future.set_exception(e if isinstance(e, Exception) else asyncio.CancelledError())
+            future.exception()  # mark retrieved; waiters re-raise it themselves
+            raise
+        future.set_result(result)
+        return result
+
+    def _evict(self, now: float):
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.expires_at > now and len(self._entries) < self.max_keys:
+                break
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _fingerprint(payload: Any) -> str:
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+idempotency_store = IdempotencyStore()
@@ -0,0 +1,246 @@
+"""
+Server-side filtering and sorting for service request listings
+DataLab Georgia - filter parameters, whitelisted sorts and a query-plan guard
+
+Every filter maps to a predicate on a column covered by one of the
+`idx_service_requests_active_*` indexes (all led by is_archived, which the
+listing always constrains). Multi-value filters take comma-separated values:
+
+    ?status=pending,in_progress&urgency=high,critical&device_type=ssd
+    &created_from=2025-01-01&created_to=2025-06-30&price_min=50&price_max=500
+    &is_read=false&approved_for_kanban=true&sort=-price
+
+Once the table holds more than QUERY_PLAN_MIN_ROWS rows, a filter/sort shape
+is checked with EXPLAIN before it is first served and rejected with 400 when
+the plan is not index-backed:
+
+  * a full table scan (SQLite SCAN, PostgreSQL Seq Scan);
+  * a sort of the result (SQLite temp B-tree for ORDER BY, PostgreSQL Sort);
+  * with filters set, an index probed on is_archived alone - every index
+    leads with it, so that only walks the whole working set in index order
+    and checks the filters row by row.
+
+A date-only `created_to` includes that whole day. Verdicts are cached
+per shape for QUERY_PLAN_VERDICT_TTL_SECONDS and dropped whenever SQLite
+maintenance refreshes the planner statistics, so a verdict taken on an empty
+or un-ANALYZEd table does not outlive it.
+"""
+
+import json
+import logging
+import os
+import re
+from datetime import datetime, time, timedelta
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Query
+from sqlalchemy import select, func, asc, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.ServiceRequestSQL import ServiceRequestSQL, DEVICE_TYPE, URGENCY, REQUEST_STATUS
+from utils.ttl_cache import TTLCache, MISSING
+
+QUERY_PLAN_CHECK = os.environ.get('QUERY_PLAN_CHECK', 'true').lower() == 'true'
+QUERY_PLAN_MIN_ROWS = int(os.environ.get('QUERY_PLAN_MIN_ROWS', '50000'))
+QUERY_PLAN_VERDICT_TTL_SECONDS = float(os.environ.get('QUERY_PLAN_VERDICT_TTL_SECONDS', '3600'))
+
+STATUSES = set(REQUEST_STATUS.values)
+URGENCIES = set(URGENCY.values)
+DEVICE_TYPES = set(DEVICE_TYPE.values)
+
+# Sort keys clients may use ("-" prefix for descending)
+SORT_KEYS = {
+    'created_at': ServiceRequestSQL.created_at,
+    'price': ServiceRequestSQL.price,
+    'status': ServiceRequestSQL.status,
+    'urgency': ServiceRequestSQL.urgency,
+    'device_type': ServiceRequestSQL.device_type,
+    'case_id': ServiceRequestSQL.case_id,
+}
+
+
+def _split(value: Optional[str], allowed: set, name: str) -> Optional[List[str]]:
+    if value is None:
+        return None
+    values = [v.strip() for v in value.split(',') if v.strip()]
+    invalid = [v for v in values if v not in allowed]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}: {', '.join(invalid)}")
+    return values or None
+
+
+class ServiceRequestFilters:
+    """Listing filters, used as `filters: ServiceRequestFilters = Depends()`"""
+
+    def __init__(
+        self,
+        status: Optional[str] = Query(None, description="Comma-separated statuses"),
+        urgency: Optional[str] = Query(None, description="Comma-separated urgencies"),
+        device_type: Optional[str] = Query(None, description="Comma-separated device types"),
+        created_from: Optional[datetime] = Query(None),
+        created_to: Optional[datetime] = Query(None),
+        price_min: Optional[float] = Query(None, ge=0),
+        price_max: Optional[float] = Query(None, ge=0),
+        is_read: Optional[bool] = Query(None),
+        approved_for_kanban: Optional[bool] = Query(None),
+        sort: str = Query('-created_at', description="Sort key, '-' prefix for descending")
+    ):
+        self.status = _split(status, STATUSES, 'status')
+        self.urgency = _split(urgency, URGENCIES, 'urgency')
+        self.device_type = _split(device_type, DEVICE_TYPES, 'device_type')
+        self.created_from = created_from
+        self.created_to = created_to
+        self.price_min = price_min
+        self.price_max = price_max
+        self.is_read = is_read
+        self.approved_for_kanban = approved_for_kanban
+
+        descending = sort.startswith('-')
+        self.sort_key = sort.lstrip('-')
+        if self.sort_key not in SORT_KEYS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid sort key: {self.sort_key} (allowed: {', '.join(SORT_KEYS)})"
+            )
+        self.descending = descending
+
+    def conditions(self) -> list:
+        conditions = []
+        if self.status:
+            conditions.append(ServiceRequestSQL.status.in_(self.status))
+        if self.urgency:
+            conditions.append(ServiceRequestSQL.urgency.in_(self.urgency))
+        if self.device_type:
+            conditions.append(ServiceRequestSQL.device_type.in_(self.device_type))
+        if self.created_from is not None:
+            conditions.append(ServiceRequestSQL.created_at >= self.created_from)
+        if self.created_to is not None:
+            if self.created_to.time() == time(0) and self.created_to.tzinfo is None:
+                # ?created_to=2026-10-19 means up to the end of that day
+                conditions.append(ServiceRequestSQL.created_at < self.created_to + timedelta(days=1))
+            else:
+                conditions.append(ServiceRequestSQL.created_at <= self.created_to)
+        if self.price_min is not None:
+            conditions.append(ServiceRequestSQL.price >= self.price_min)
+        if self.price_max is not None:
+            conditions.append(ServiceRequestSQL.price <= self.price_max)
+        if self.is_read is not None:
+            conditions.append(ServiceRequestSQL.is_read == self.is_read)
+        if self.approved_for_kanban is not None:
+            conditions.append(ServiceRequestSQL.approved_for_kanban == self.approved_for_kanban)
+        return conditions
+
+    def apply(self, query):
+        """Add WHERE and ORDER BY (with id as a stable tie-breaker) to `query`"""
+        direction = desc if self.descending else asc
+        return query.where(*self.conditions()).order_by(
+            direction(SORT_KEYS[self.sort_key]),
+            direction(ServiceRequestSQL.id)
+        )
+
+    def shape(self) -> Tuple:
+        """Which filters are set and how results are sorted - not the values
+
+        A multi-value filter counts as its own shape: an IN list can't keep
+        the index order, so it gets a different plan than a single value.
+        """
+        used = []
+        for name in ('status', 'urgency', 'device_type', 'created_from', 'created_to',
+                     'price_min', 'price_max', 'is_read', 'approved_for_kanban'):
+            value = getattr(self, name)
+            if value is not None:
+                used.append(f"{name}[]" if isinstance(value, list) and len(value) > 1 else name)
+        return tuple(used), self.sort_key, self.descending
+
+
+# shape -> offending plan detail, or None when index-backed
+_plan_verdicts = TTLCache(1024, QUERY_PLAN_VERDICT_TTL_SECONDS)
+_table_size = TTLCache(1, 300)
+
+_TABLE = ServiceRequestSQL.__tablename__
+# Columns in a PostgreSQL "Index Cond", e.g. ((is_archived = false) AND (status = ANY (...)))
+_INDEX_COND_COLUMNS = re.compile(r'\((\w+) (?:=|<|>|<=|>=|<>)')
+
+
+def invalidate_plan_verdicts():
+    """Forget cached verdicts - the planner's statistics changed (ANALYZE)"""
+    _plan_verdicts.clear()
+
+
+def _unindexed_sqlite(rows, filtered: bool) -> Optional[str]:
+    # EXPLAIN QUERY PLAN rows are (id, parent, notused, detail)
+    for row in rows:
+        detail = row[-1]
+        if detail.startswith('USE TEMP B-TREE') and 'ORDER BY' in detail:
+            return detail
+        if detail.startswith(f"SCAN {_TABLE}"):
+            # Walking an index just for its order is fine while no filter has to be checked
+            if 'INDEX' not in detail or filtered:
+                return detail
+        if filtered and detail.startswith(f"SEARCH {_TABLE}") and detail.endswith('(is_archived=?)'):
+            return detail
+    return None
+
+
+def _unindexed_postgresql(rows, filtered: bool) -> Optional[str]:
+    plan = rows[0][0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    stack = [plan[0]['Plan']]
+    while stack:
+        node = stack.pop()
+        node_type = node.get('Node Type')
+        if node_type == 'Sort':
+            return f"Sort on {', '.join(node.get('Sort Key', []))}"
+        if node.get('Relation Name') == _TABLE or node_type == 'Bitmap Index Scan':
+            if node_type == 'Seq Scan':
+                return f"Seq Scan on {_TABLE}"
+            columns = set(_INDEX_COND_COLUMNS.findall(node.get('Index Cond', '')))
+            if filtered and columns <= {'is_archived'} and 'Index Name' in node:
+                return f"{node_type} using {node['Index Name']} ({node.get('Index Cond', 'no condition')})"
+        stack.extend(node.get('Plans', []))
+    return None
+
+
+async def _explain_unindexed(session: AsyncSession, query, filtered: bool) -> Optional[str]:
+    conn = await session.connection()
+    dialect = conn.dialect
+    # Values inlined through each column type's literal rendering (coded
+    # enums as their SMALLINT codes), IN lists expanded - executable as-is
+    sql = str(query.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+    if dialect.name == 'sqlite':
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+        return _unindexed_sqlite(result.all(), filtered)
+    if dialect.name == 'postgresql':
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")
+        return _unindexed_postgresql(result.all(), filtered)
+    return None
+
+
+async def _service_request_count(session: AsyncSession) -> int:
+    count = _table_size.get('service_requests')
+    if count is MISSING:
+        count = await session.scalar(select(func.count(ServiceRequestSQL.id))) or 0
+        _table_size.set('service_requests', count)
+    return count
+
+
+async def check_query_plan(session: AsyncSession, filters: ServiceRequestFilters, query):
+    """Reject filter/sort shapes that are not index-backed on a large table"""
+    if not QUERY_PLAN_CHECK or await _service_request_count(session) <= QUERY_PLAN_MIN_ROWS:
+        return
+    shape = filters.shape()
+    detail = _plan_verdicts.get(shape)
+    if detail is MISSING:
+        try:
+            detail = await _explain_unindexed(session, query, filtered=bool(shape[0]))
+        except Exception as e:
+            # A failed EXPLAIN must not break the listing itself
+            logging.warning(f"Query plan check failed for {shape}: {e}")
+            return
+        _plan_verdicts.set(shape, detail)
+    if detail:
+        raise HTTPException(
+            status_code=400,
+            detail=f"This filter/sort combination is not index-backed ({detail}); narrow it with status, urgency, device_type or a created_at range"
+        )
@@ -0,0 +1,92 @@
+"""
+Fractional rank keys for ordered lists
+DataLab Georgia - Kanban ordering where a move rewrites only the moved row
+
+Ranks are base-62 strings compared lexicographically (ASCII order of
+0-9A-Za-z) and read as fractions in (0, 1); a key never ends in '0', so
+there is always room for another key between any two neighbours. Moves to
+either end step the leading digit instead of halving, so keys grow by one
+digit per ~60 appends; `evenly_spaced()` re-spreads a list whose keys have
+grown past RANK_MAX_LENGTH.
+"""
+
+from typing import List, Optional
+
+DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+_INDEX = {d: i for i, d in enumerate(DIGITS)}
+
+# Longest key worth keeping before the list is rebalanced
+RANK_MAX_LENGTH = 48
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """Key strictly between a ('' = 0) and b (None = 1)"""
+    if b is not None:
+        # Skip the shared prefix (a is padded with '0')
+        n = 0
+        while n < len(b) and (a[n] if n < len(a) else '0') == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+
+    digit_a = _INDEX[a[0]] if a else 0
+    digit_b = _INDEX[b[0]] if b is not None else len(DIGITS)
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    # Adjacent first digits: extend a, or take b's first digit if b is longer
+    if b is not None and len(b) > 1:
+        return b[:1]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def _increment(key: str) -> str:
+    """Short key after `key`; appends grow the key by one digit per ~60 moves"""
+    digit = _INDEX[key[0]]
+    if digit < len(DIGITS) - 1:
+        return DIGITS[digit + 1]
+    return DIGITS[-1] + (_increment(key[1:]) if len(key) > 1 else DIGITS[1])
+
+
+def _decrement(key: str) -> str:
+    """Short key before `key` (never ending in '0')"""
+    digit = _INDEX[key[0]]
+    if digit > 1:
+        return DIGITS[digit - 1]
+    if digit == 1:
+        return '0' + DIGITS[-1]
+    return '0' + _decrement(key[1:])
+
+
+def rank_between(before: Optional[str], after: Optional[str]) -> str:
+    """Rank for an item placed after `before` and ahead of `after` (None = list end)"""
+    if before is not None and after is not None and before >= after:
+        raise ValueError(f"Rank {before!r} must sort before {after!r}")
+    for key in (before, after):
+        if key is not None and (not key or key[-1] == '0' or any(c not in _INDEX for c in key)):
+            raise ValueError(f"Invalid rank key: {key!r}")
+    if before is None and after is None:
+        return 'V'
+    if after is None:
+        return _increment(before)
+    if before is None:
+        return _decrement(after)
+    return _midpoint(before, after)
+
+
+def evenly_spaced(count: int) -> List[str]:
+    """`count` ascending keys of minimal length, spread across the key space"""
+    base = len(DIGITS)
+    length = 1
+    while base ** length <= count:
+        length += 1
+    length += 1  # leave room between neighbours
+    step = base ** length // (count + 1)
+    keys = []
+    for i in range(1, count + 1):
+        value = i * step
+        digits = []
+        for _ in range(length):
+            value, rem = divmod(value, base)
+            digits.append(DIGITS[rem])
+        keys.append(''.join(reversed(digits)).rstrip('0'))
+    return keys
@@ -0,0 +1,240 @@
+"""
+Per-client Rate Limiting for public form endpoints
+DataLab Georgia - token buckets keyed by client IP and route policy
+
+Each policy owns an LRU-ordered dict of buckets keyed by the client IP string
+Starlette already parsed, so a lookup is one dict hit plus `move_to_end` and
+the refill mutates the bucket in place - nothing is allocated unless a new
+client shows up. Idle buckets fall off the LRU end.
+
+Policies are "<requests>/<seconds>" strings and can be overridden per route:
+
+    RATE_LIMIT_SERVICE_REQUESTS=5/60
+    RATE_LIMIT_CONTACT=5/60
+    RATE_LIMIT_PRICE_ESTIMATE=30/60
+    RATE_LIMIT_TRACKING=30/60
+
+Behind a reverse proxy set TRUST_PROXY_HEADERS=true. X-Forwarded-For is then
+read only on connections from TRUSTED_PROXIES (addresses or CIDRs). The client
+is the entry TRUSTED_PROXY_HOPS from the right, because every proxy appends
+the address it received from and anything further left is client-supplied:
+
+    TRUST_PROXY_HEADERS=false
+    TRUSTED_PROXIES=127.0.0.1,::1,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16
+    TRUSTED_PROXY_HOPS=1
+
+Setting RATE_LIMIT_REDIS_URL shares buckets between instances (requires the
+optional `redis` package); if Redis is unreachable the in-memory store is used.
+"""
+
+import ipaddress
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from fastapi import HTTPException, Request
+
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+RATE_LIMIT_MAX_BUCKETS = int(os.environ.get('RATE_LIMIT_MAX_BUCKETS', '10000'))
+RATE_LIMIT_REDIS_URL = os.environ.get('RATE_LIMIT_REDIS_URL')
+TRUST_PROXY_HEADERS = os.environ.get('TRUST_PROXY_HEADERS', 'false').lower() == 'true'
+TRUSTED_PROXIES = tuple(
+    ipaddress.ip_network(network.strip(), strict=False) for network in os.environ.get(
+        'TRUSTED_PROXIES', '127.0.0.1,::1,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16'
+    ).split(',') if network.strip()
+)
+TRUSTED_PROXY_HOPS = max(int(os.environ.get('TRUSTED_PROXY_HOPS', '1')), 1)
+
+DEFAULT_POLICIES = {
+    'service_requests': '5/60',
+    'contact': '5/60',
+    'price_estimate': '30/60',
+    'tracking': '30/60'
+}
+
+
+class RateLimitPolicy:
+    """Bucket capacity (burst) and refill rate in tokens per second"""
+    __slots__ = ('name', 'capacity', 'rate', 'idle_ttl')
+
+    def __init__(self, name: str, capacity: int, period: float):
+        if capacity < 1 or period <= 0:
+            raise ValueError(f"Invalid rate limit policy for {name}: {capacity}/{period}")
+        self.name = name
+        self.capacity = float(capacity)
+        self.rate = capacity / period
+        # A bucket idle this long has refilled completely and can be dropped
+        self.idle_ttl = period
+
+    @classmethod
+    def parse(cls, name: str, spec: str) -> "RateLimitPolicy":
+        requests, _, seconds = spec.partition('/')
+        return cls(name, int(requests), float(seconds or 60))
+
+
+class TokenBucket:
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class InMemoryRateLimitStore:
+    """Process-local buckets, one LRU dict per policy"""
+
+    def __init__(self, max_buckets: int = RATE_LIMIT_MAX_BUCKETS):
+        self.max_buckets = max_buckets
+        self._buckets: Dict[str, OrderedDict] = {}
+
+    def take(self, policy: RateLimitPolicy, client: str, now: float) -> float:
+        """Consume one token; returns 0 when allowed, else seconds until retry"""
+        buckets = self._buckets.get(policy.name)
+        if buckets is None:
+            buckets = self._buckets[policy.name] = OrderedDict()
+
+        bucket = buckets.get(client)
+        if bucket is None:
+            self._evict(buckets, policy, now)
+            buckets[client] = TokenBucket(policy.capacity - 1, now)
+            return 0.0
+
+        buckets.move_to_end(client)
+        tokens = bucket.tokens + (now - bucket.updated) * policy.rate
+        if tokens > policy.capacity:
+            tokens = policy.capacity
+        bucket.updated = now
+        if tokens >= 1.0:
+            bucket.tokens = tokens - 1.0
+            return 0.0
+        bucket.tokens = tokens
+        return (1.0 - tokens) / policy.rate
+
+    def _evict(self, buckets: OrderedDict, policy: RateLimitPolicy, now: float):
+        # Oldest entries sit at the front; stop at the first one still in use
+        while buckets:
+            client, bucket = next(iter(buckets.items()))
+            if now - bucket.updated < policy.idle_ttl and len(buckets) < self.max_buckets:
+                break
+            del buckets[client]
+
+    def size(self) -> int:
+        return sum(len(b) for b in self._buckets.values())
+
+
+# Atomic refill-and-take; returns the retry delay as a string (0 = allowed)
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local retry = 0
+if tokens >= 1 then tokens = tokens - 1 else retry = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+return tostring(retry)
+"""
+
+
+class RedisRateLimitStore:
+    """Buckets shared between instances through a Redis hash per client"""
+
+    def __init__(self, url: str, prefix: str = "datalab:ratelimit:"):
+        import redis.asyncio as redis  # optional dependency
+
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+        self._script = self.client.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def take(self, policy: RateLimitPolicy, client: str, now: float) -> float:
+        retry = await self._script(
+            keys=[f"{self.prefix}{policy.name}:{client}"],
+            args=[policy.capacity, policy.rate, now, math.ceil(policy.idle_ttl)]
+        )
+        return float(retry)
+
+
+class RateLimiter:
+    """Applies named policies to requests and raises 429 when a bucket is empty"""
+
+    def __init__(self, policies: Dict[str, RateLimitPolicy], shared_store=None):
+        self.policies = policies
+        self.local = InMemoryRateLimitStore()
+        self.shared = shared_store
+        self.rejected: Dict[str, int] = {name: 0 for name in policies}
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        policies = {}
+        for name, default in DEFAULT_POLICIES.items():
+            spec = os.environ.get(f'RATE_LIMIT_{name.upper()}', default)
+            policies[name] = RateLimitPolicy.parse(name, spec)
+
+        shared = None
+        if RATE_LIMIT_REDIS_URL:
+            try:
+                shared = RedisRateLimitStore(RATE_LIMIT_REDIS_URL)
+            except ImportError:
+                logging.warning("RATE_LIMIT_REDIS_URL is set but the 'redis' package is not installed")
+        return cls(policies, shared)
+
+    async def check(self, policy_name: str, request: Request):
+        policy = self.policies[policy_name]
+        client = client_ip(request)
+
+        retry_after: Optional[float] = None
+        if self.shared is not None:
+            try:
+                retry_after = await self.shared.take(policy, client, time.time())
+            except Exception as e:
+                logging.warning(f"Shared rate limit store unavailable, using local buckets: {e}")
+        if retry_after is None:
+            retry_after = self.local.take(policy, client, time.monotonic())
+
+        if retry_after > 0:
+            self.rejected[policy_name] += 1
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests, please try again later",
+                headers={"Retry-After": str(math.ceil(retry_after))}
+            )
+
+
+def _trusted_proxy(host: str) -> bool:
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_PROXIES)
+
+
+def client_ip(request: Request) -> str:
+    """Client address, honouring X-Forwarded-For only from a trusted proxy"""
+    peer = request.client.host if request.client else None
+    if TRUST_PROXY_HEADERS and peer and _trusted_proxy(peer):
+        forwarded = [entry.strip() for entry in request.headers.get('x-forwarded-for', '').split(',') if entry.strip()]
+        if forwarded:
+            # Counted from the right: the leftmost entries are whatever the client sent
+            return forwarded[max(len(forwarded) - TRUSTED_PROXY_HOPS, 0)]
+    return peer or "unknown"
+
+
+rate_limiter = RateLimiter.from_env()
+
+
+def rate_limit(policy_name: str):
+    """Route dependency: `dependencies=[Depends(rate_limit("contact"))]`"""
+    if policy_name not in rate_limiter.policies:
+        raise ValueError(f"Unknown rate limit policy: {policy_name}")
+
+    async def dependency(request: Request):
+        if RATE_LIMIT_ENABLED:
+            await rate_limiter.check(policy_name, request)
+
+    return dependency
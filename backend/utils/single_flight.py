@@ -0,0 +1,118 @@
+"""
+Single-flight request coalescing for hot GET endpoints
+DataLab Georgia - one DB round trip for a burst of identical reads
+
+Concurrent requests for the same route and normalized query string share the
+first caller's ("leader's") work: followers wait for its result instead of
+running the same query on their own pooled connection. What is shared is the
+already-encoded JSON body, so the response is serialized once too and every
+caller gets its own Response object around the same bytes.
+
+Nothing is cached - the entry disappears as soon as the leader finishes, so a
+request arriving afterwards always sees fresh data. If the leader fails (or is
+cancelled because its client went away) each follower runs the work itself
+rather than inheriting the error.
+
+    SINGLE_FLIGHT_ENABLED=true    coalesce identical concurrent GETs
+"""
+
+import asyncio
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+SINGLE_FLIGHT_ENABLED = os.environ.get('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true'
+
+
+class LeaderFailed(Exception):
+    """Set on the shared future when the leader was cancelled"""
+
+
+def request_key(request: Request) -> Tuple:
+    """Route path plus query parameters in a canonical order"""
+    return (request.url.path, tuple(sorted(request.query_params.multi_items())))
+
+
+def encode_json(content: Any) -> Tuple[int, bytes]:
+    """(status, body) for a handler result - a Response or JSON-able data"""
+    if isinstance(content, Response):
+        return content.status_code, bytes(content.body)
+    body = json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+    return 200, body
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key"""
+
+    def __init__(self, enabled: bool = SINGLE_FLIGHT_ENABLED):
+        self.enabled = enabled
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.executions = 0
+        self.shared = 0
+        self.fallbacks = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `fn`, or wait for the identical call already in flight"""
+        if not self.enabled:
+            self.executions += 1
+            return await fn()
+
+        call = self._calls.get(key)
+        if call is not None:
+            try:
+                # shield: a follower's client disconnecting must not cancel
+                # the leader's result for everyone else
+                result = await asyncio.shield(call)
+                self.shared += 1
+                return result
+            except Exception:
+                self.fallbacks += 1
+                self.executions += 1
+                return await fn()
+
+        call = asyncio.get_running_loop().create_future()
+        self._calls[key] = call
+        self.executions += 1
+        try:
+            result = await fn()
+        except BaseException as e:
+            call.set_exception(e if isinstance(e, Exception) else LeaderFailed())
+            # Followers read it themselves; without any, don't log it as unretrieved
+            call.exception()
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    async def json(self, request: Request, fn: Callable[[], Awaitable[Any]]) -> Response:
+        """Coalesce a GET handler body and share its encoded JSON response"""
+        async def produce():
+            return encode_json(await fn())
+        status_code, body = await self.do(request_key(request), produce)
+        return Response(content=body, status_code=status_code, media_type="application/json")
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._calls),
+            "executions": self.executions,
+            "shared": self.shared,
+            "fallbacks": self.fallbacks,
+            # Every shared response is a query (and an encode) that didn't run
+            "saved_ratio": round(self.shared / (self.shared + self.executions), 4)
+            if self.shared + self.executions else 0.0
+        }
+
+
+single_flight = SingleFlight()
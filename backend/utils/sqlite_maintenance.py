@@ -0,0 +1,244 @@
+"""
+SQLite Maintenance Scheduler
+DataLab Georgia - planner statistics, WAL checkpoints and free-page reclaim
+
+A background task wakes every MAINTENANCE_INTERVAL seconds and:
+
+  * runs `PRAGMA optimize` (ANALYZE where the planner's stats are stale) every
+    MAINTENANCE_OPTIMIZE_HOURS, and a full ANALYZE once if no stats exist;
+  * when the app is idle (no request in flight and fewer than
+    MAINTENANCE_IDLE_REQUESTS in the last interval, optionally only inside
+    MAINTENANCE_WINDOW="HH-HH" local hours; health probes, header counter
+    polling under MAINTENANCE_IGNORED_PATHS and static files don't count):
+      - checkpoints the WAL (TRUNCATE once it exceeds MAINTENANCE_WAL_TRUNCATE_MB),
+      - reclaims free pages with `PRAGMA incremental_vacuum`, switching a
+        database that was created without auto_vacuum to INCREMENTAL with a
+        one-off VACUUM once fragmentation passes MAINTENANCE_VACUUM_FRAGMENTATION.
+
+New databases are created with auto_vacuum=INCREMENTAL and the journal mode
+from SQLITE_JOURNAL_MODE (see database.py). `report()` (GET
+/api/admin/maintenance) gives file/WAL size, page and freelist counts,
+fragmentation and the outcome of the last runs. On other databases the
+scheduler is a no-op.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from utils.query_filters import invalidate_plan_verdicts
+
+MAINTENANCE_ENABLED = os.environ.get('MAINTENANCE_ENABLED', 'true').lower() == 'true'
+MAINTENANCE_INTERVAL = float(os.environ.get('MAINTENANCE_INTERVAL', '300'))
+MAINTENANCE_OPTIMIZE_HOURS = float(os.environ.get('MAINTENANCE_OPTIMIZE_HOURS', '6'))
+MAINTENANCE_IDLE_REQUESTS = int(os.environ.get('MAINTENANCE_IDLE_REQUESTS', '30'))
+MAINTENANCE_WINDOW = os.environ.get('MAINTENANCE_WINDOW')  # e.g. "2-5"
+MAINTENANCE_WAL_TRUNCATE_MB = float(os.environ.get('MAINTENANCE_WAL_TRUNCATE_MB', '64'))
+MAINTENANCE_VACUUM_PAGES = int(os.environ.get('MAINTENANCE_VACUUM_PAGES', '2000'))
+MAINTENANCE_VACUUM_FRAGMENTATION = float(os.environ.get('MAINTENANCE_VACUUM_FRAGMENTATION', '0.2'))
+# Polled on a timer whether anyone is working or not
+MAINTENANCE_IGNORED_PATHS = tuple(
+    prefix.strip() for prefix in os.environ.get(
+        'MAINTENANCE_IGNORED_PATHS',
+        '/api/health,/api/livez,/api/readyz,/api/admission,/api/admin/counters'
+    ).split(',') if prefix.strip()
+)
+
+# PRAGMA auto_vacuum values
+AUTO_VACUUM_MODES = {0: 'none', 1: 'full', 2: 'incremental'}
+
+
+class RequestActivity:
+    """ASGI middleware counting API requests so maintenance can wait for quiet periods"""
+
+    in_flight = 0
+    total = 0
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        # Static files and the SPA never touch the database
+        if (scope["type"] != "http" or not path.startswith('/api')
+                or path.startswith(MAINTENANCE_IGNORED_PATHS) or path == '/api/'):
+            return await self.app(scope, receive, send)
+        RequestActivity.in_flight += 1
+        RequestActivity.total += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            RequestActivity.in_flight -= 1
+
+
+def _in_window(window: Optional[str], hour: int) -> bool:
+    if not window:
+        return True
+    start, _, end = window.partition('-')
+    start, end = int(start), int(end or start)
+    if start <= end:
+        return start <= hour < end
+    # Window wrapping midnight, e.g. "22-4"
+    return hour >= start or hour < end
+
+
+class SQLiteMaintenance:
+    """Periodic PRAGMA optimize / checkpoint / incremental vacuum for one engine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.enabled = engine.dialect.name == 'sqlite'
+        self.path = engine.url.database if self.enabled else None
+        self.last_runs: Dict[str, dict] = {}
+        self._last_optimize = 0.0
+        self._last_total = 0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        if self.enabled:
+            self._task = asyncio.create_task(self._loop(), name="sqlite-maintenance")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _pragma(self, conn, sql: str):
+        result = await conn.exec_driver_sql(sql)
+        return result.all()
+
+    async def _run(self, name: str, coro_factory) -> dict:
+        """Run one task on an autocommit connection and record its outcome"""
+        async with self._lock:
+            started = time.perf_counter()
+            entry = {"at": datetime.utcnow().isoformat()}
+            try:
+                async with self.engine.connect() as conn:
+                    conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                    entry["result"] = await coro_factory(conn)
+                entry["ok"] = True
+            except Exception as e:
+                entry["ok"] = False
+                entry["error"] = str(e)
+                logging.warning(f"SQLite maintenance task {name} failed: {e}")
+            entry["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            self.last_runs[name] = entry
+            return entry
+
+    async def optimize(self) -> dict:
+        async def task(conn):
+            has_stats = await self._pragma(
+                conn, "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            )
+            if not has_stats:
+                await conn.exec_driver_sql("ANALYZE")
+                result = "analyze"
+            else:
+                await conn.exec_driver_sql("PRAGMA optimize")
+                result = "optimize"
+            # Plans may change with the new statistics
+            invalidate_plan_verdicts()
+            return result
+        self._last_optimize = time.monotonic()
+        return await self._run("optimize", task)
+
+    async def checkpoint(self) -> dict:
+        async def task(conn):
+            mode = 'PASSIVE'
+            if self._wal_size() > MAINTENANCE_WAL_TRUNCATE_MB * 1024 * 1024:
+                mode = 'TRUNCATE'
+            busy, log_frames, checkpointed = (await self._pragma(conn, f"PRAGMA wal_checkpoint({mode})"))[0]
+            return {"mode": mode, "busy": busy, "log_frames": log_frames, "checkpointed": checkpointed}
+        return await self._run("checkpoint", task)
+
+    async def vacuum(self) -> dict:
+        async def task(conn):
+            auto_vacuum = (await self._pragma(conn, "PRAGMA auto_vacuum"))[0][0]
+            page_count = (await self._pragma(conn, "PRAGMA page_count"))[0][0]
+            freelist = (await self._pragma(conn, "PRAGMA freelist_count"))[0][0]
+            fragmentation = freelist / page_count if page_count else 0.0
+
+            if auto_vacuum == 2:
+                if freelist:
+                    # incremental_vacuum frees one page per step and execute()
+                    # only steps once; executescript runs it to completion
+                    raw = await conn.get_raw_connection()
+                    await raw.driver_connection.executescript(
+                        f"PRAGMA incremental_vacuum({MAINTENANCE_VACUUM_PAGES})"
+                    )
+                remaining = (await self._pragma(conn, "PRAGMA freelist_count"))[0][0]
+                return {"mode": "incremental", "freed_pages": freelist - remaining}
+            if fragmentation >= MAINTENANCE_VACUUM_FRAGMENTATION:
+                # auto_vacuum can only change through a full VACUUM; afterwards
+                # free pages are reclaimed incrementally
+                await conn.exec_driver_sql("PRAGMA auto_vacuum = INCREMENTAL")
+                await conn.exec_driver_sql("VACUUM")
+                return {"mode": "full", "freed_pages": freelist}
+            return {"mode": AUTO_VACUUM_MODES.get(auto_vacuum, auto_vacuum), "freed_pages": 0}
+        return await self._run("vacuum", task)
+
+    def _wal_size(self) -> int:
+        try:
+            return os.path.getsize(f"{self.path}-wal")
+        except OSError:
+            return 0
+
+    def is_idle(self) -> bool:
+        recent = RequestActivity.total - self._last_total
+        self._last_total = RequestActivity.total
+        return (
+            RequestActivity.in_flight == 0
+            and recent < MAINTENANCE_IDLE_REQUESTS
+            and _in_window(MAINTENANCE_WINDOW, datetime.now().hour)
+        )
+
+    async def tick(self):
+        if time.monotonic() - self._last_optimize >= MAINTENANCE_OPTIMIZE_HOURS * 3600:
+            await self.optimize()
+        if self.is_idle():
+            await self.checkpoint()
+            await self.vacuum()
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(MAINTENANCE_INTERVAL)
+            await self.tick()
+
+    async def report(self) -> dict:
+        if not self.enabled:
+            return {"enabled": False, "dialect": self.engine.dialect.name}
+        async with self.engine.connect() as conn:
+            page_size = (await self._pragma(conn, "PRAGMA page_size"))[0][0]
+            page_count = (await self._pragma(conn, "PRAGMA page_count"))[0][0]
+            freelist = (await self._pragma(conn, "PRAGMA freelist_count"))[0][0]
+            auto_vacuum = (await self._pragma(conn, "PRAGMA auto_vacuum"))[0][0]
+            journal_mode = (await self._pragma(conn, "PRAGMA journal_mode"))[0][0]
+        try:
+            file_size = os.path.getsize(self.path)
+        except OSError:
+            file_size = None
+        return {
+            "enabled": True,
+            "scheduled": self._task is not None,
+            "path": self.path,
+            "file_size_bytes": file_size,
+            "wal_size_bytes": self._wal_size(),
+            "page_size": page_size,
+            "page_count": page_count,
+            "freelist_pages": freelist,
+            "free_bytes": freelist * page_size,
+            "fragmentation": round(freelist / page_count, 4) if page_count else 0.0,
+            "auto_vacuum": AUTO_VACUUM_MODES.get(auto_vacuum, auto_vacuum),
+            "journal_mode": journal_mode,
+            "requests_in_flight": RequestActivity.in_flight,
+            "last_runs": self.last_runs
+        }
@@ -0,0 +1,125 @@
+"""
+Startup Profiler
+DataLab Georgia - cold start phase timers and `python -X importtime` capture
+
+Phase timers are always recorded (a perf_counter pair per phase); the import
+time capture spawns a fresh interpreter and only runs on demand.
+
+    python -m utils.startup_profile            # top imports of `server`
+    STARTUP_PROFILE=true uvicorn server:app    # log the phase report on startup
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+
+STARTUP_PROFILE = os.environ.get('STARTUP_PROFILE', 'false').lower() == 'true'
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+class StartupProfiler:
+    """Collects wall-clock durations of named startup phases"""
+
+    def __init__(self):
+        self.created_at = time.perf_counter()
+        self._last_checkpoint = self.created_at
+        self.phases: List[dict] = []
+        self.ready_at: Optional[float] = None
+        self.importtime: Optional[dict] = None
+
+    def _record(self, name: str, started: float, ended: float):
+        self.phases.append({
+            "phase": name,
+            "offset_ms": round((started - self.created_at) * 1000, 2),
+            "duration_ms": round((ended - started) * 1000, 2)
+        })
+        self._last_checkpoint = ended
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the wrapped block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, started, time.perf_counter())
+
+    def checkpoint(self, name: str):
+        """Record the span since the previous phase/checkpoint (e.g. module imports)"""
+        self._record(name, self._last_checkpoint, time.perf_counter())
+
+    def mark_ready(self):
+        self.ready_at = time.perf_counter()
+
+    def report(self) -> dict:
+        total_ms = None
+        if self.ready_at is not None:
+            total_ms = round((self.ready_at - self.created_at) * 1000, 2)
+        return {
+            "phases": self.phases,
+            "total_ms": total_ms,
+            "importtime": self.importtime
+        }
+
+
+def capture_importtime(module: str = "server", top: int = 25) -> dict:
+    """Import `module` in a fresh interpreter with -X importtime and rank the results"""
+    import subprocess
+
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(BACKEND_DIR),
+        capture_output=True,
+        text=True,
+        timeout=120
+    )
+    entries = parse_importtime(proc.stderr)
+    entries.sort(key=lambda e: e["cumulative_us"], reverse=True)
+
+    # The top-level module's cumulative time is the total import cost
+    total_us = next((e["cumulative_us"] for e in entries if e["module"] == module), None)
+    return {
+        "module": module,
+        "returncode": proc.returncode,
+        "total_import_ms": round(total_us / 1000, 2) if total_us is not None else None,
+        "wall_ms": round((time.perf_counter() - started) * 1000, 2),
+        "top": entries[:top]
+    }
+
+
+def parse_importtime(output: str) -> List[Dict]:
+    """Parse `import time: self [us] | cumulative | imported package` lines"""
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us, name = parts
+        try:
+            entries.append({
+                "module": name.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us)
+            })
+        except ValueError:
+            # Header line ("self [us] | cumulative | imported package")
+            continue
+    return entries
+
+
+# Process-wide profiler; server.py records its phases here
+startup_profiler = StartupProfiler()
+
+
+if __name__ == "__main__":
+    result = capture_importtime(sys.argv[1] if len(sys.argv) > 1 else "server")
+    print(f"Import of '{result['module']}': {result['total_import_ms']} ms")
+    for entry in result["top"]:
+        print(f"{entry['cumulative_us'] / 1000:10.2f} ms  {entry['module']}")
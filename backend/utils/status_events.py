@@ -0,0 +1,289 @@
+"""
+Status events - transition log writes and the incremental time-in-status rollup
+DataLab Georgia - queue-time and SLA analytics without rescanning history
+
+Every handler that changes a service request's status calls
+`record_transition` just before its UPDATE, in the same transaction: a single
+INSERT ... SELECT that appends an event only when the stored status actually
+differs (and, for Kanban moves, still is the expected one), so rolled-back
+or no-op changes leave no trace. New requests get their 'pending' event from
+`created_event`.
+
+`StatusStatsRefresher` folds new events into `status_time_daily`. Each batch
+takes the next STATUS_STATS_BATCH_SIZE events past the watermark, pulls the
+timelines of just the cases they touch (idx_service_request_events_case_ts)
+and pairs every event with the next one using LEAD() window functions. An
+interval is counted once - in the batch containing the event that ends it -
+and the rollup rows and the watermark are written in one transaction.
+
+A batch stops short of the first event younger than
+STATUS_STATS_SETTLE_SECONDS. Ids are handed out at INSERT but become visible
+at COMMIT, so on PostgreSQL a later id can commit first, and a watermark
+moved past a still-open transaction would skip its event for good. The window
+has to outlast the longest write transaction (REQUEST_TIMEOUT_MS bounds the
+request handlers).
+
+    STATUS_STATS_ENABLED=true
+    STATUS_STATS_INTERVAL_SECONDS=60
+    STATUS_STATS_BATCH_SIZE=5000
+    STATUS_STATS_SETTLE_SECONDS=60
+    SLA_TARGET_HOURS=pending=24,in_progress=72,completed=168
+"""
+
+import asyncio
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select, insert, func, or_, bindparam, DateTime, Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import AsyncSessionLocal
+from models.ServiceRequestSQL import ServiceRequestSQL, REQUEST_STATUS
+from models.ServiceRequestArchiveSQL import ServiceRequestArchiveSQL
+from models.ServiceRequestEventSQL import ServiceRequestEventSQL, StatusTimeDailySQL, JobWatermarkSQL
+
+STATUS_STATS_ENABLED = os.environ.get('STATUS_STATS_ENABLED', 'true').lower() == 'true'
+STATUS_STATS_INTERVAL_SECONDS = float(os.environ.get('STATUS_STATS_INTERVAL_SECONDS', '60'))
+STATUS_STATS_BATCH_SIZE = int(os.environ.get('STATUS_STATS_BATCH_SIZE', '5000'))
+STATUS_STATS_SETTLE_SECONDS = float(os.environ.get('STATUS_STATS_SETTLE_SECONDS', '60'))
+
+ROLLUP_JOB = 'status_time_daily'
+
+
+def _parse_targets(spec: str) -> Dict[str, float]:
+    """'pending=24,in_progress=72' -> {status: seconds}"""
+    targets = {}
+    for item in spec.split(','):
+        if '=' in item:
+            status, hours = item.split('=', 1)
+            targets[status.strip()] = float(hours) * 3600
+    return targets
+
+
+SLA_TARGETS = _parse_targets(os.environ.get('SLA_TARGET_HOURS', 'pending=24,in_progress=72,completed=168'))
+
+
+# -- writes (the caller commits) --------------------------------------------------
+
+def _transition_statement(model, expected: bool):
+    conditions = [
+        model.id == bindparam('request_id'),
+        or_(model.status.is_(None), model.status != bindparam('status'))
+    ]
+    if expected:
+        conditions.append(model.status == bindparam('expected'))
+    # On the Table: an ORM insert executed with parameters would be a bulk insert
+    return insert(ServiceRequestEventSQL.__table__).from_select(
+        ['request_id', 'status', 'ts'],
+        select(
+            model.id,
+            bindparam('status', type_=REQUEST_STATUS),
+            bindparam('ts', type_=DateTime)
+        ).where(*conditions)
+    )
+
+
+_TRANSITIONS = {
+    (model, expected): _transition_statement(model, expected)
+    for model in (ServiceRequestSQL, ServiceRequestArchiveSQL) for expected in (False, True)
+}
+
+
+async def record_transition(session: AsyncSession, request_id, status: str, expected: Optional[str] = None,
+                            model=ServiceRequestSQL):
+    """Append a `status` event for this request if that changes it - call before the UPDATE
+
+    `model` is the tier holding the case (archived cases share the id space).
+    """
+    params = {'request_id': request_id, 'status': status, 'ts': datetime.utcnow()}
+    if expected is not None:
+        params['expected'] = expected
+    await session.execute(_TRANSITIONS[model, expected is not None], params)
+
+
+def created_event(row: ServiceRequestSQL) -> ServiceRequestEventSQL:
+    """Initial event for a just-inserted (flushed) service request"""
+    return ServiceRequestEventSQL(request_id=row.id, status=row.status or 'pending', ts=datetime.utcnow())
+
+
+# -- incremental rollup -----------------------------------------------------------
+
+_Event = ServiceRequestEventSQL
+
+# Events logged after :settled may still have lower ids in flight - stop before the first one
+_first_unsettled = select(func.min(_Event.id)).where(
+    _Event.id > bindparam('last_id'), _Event.ts > bindparam('settled')
+).scalar_subquery()
+_batch = select(_Event.id).where(
+    _Event.id > bindparam('last_id'),
+    or_(_first_unsettled.is_(None), _Event.id < _first_unsettled)
+).order_by(_Event.id).limit(bindparam('limit')).subquery()
+_batch_span = select(func.max(_batch.c.id), func.count())
+
+_window = dict(partition_by=_Event.request_id, order_by=(_Event.ts, _Event.id))
+_timeline = select(
+    _Event.status,
+    _Event.ts,
+    func.lead(_Event.ts, type_=DateTime).over(**_window).label('next_ts'),
+    func.lead(_Event.id, type_=Integer).over(**_window).label('next_id')
+).where(
+    _Event.request_id.in_(
+        select(_Event.request_id).where(_Event.id > bindparam('last_id'), _Event.id <= bindparam('upto'))
+    ),
+    _Event.id <= bindparam('upto')
+).subquery()
+# Intervals closed by an event in this batch
+_closed_intervals = select(_timeline.c.status, _timeline.c.ts, _timeline.c.next_ts).where(
+    _timeline.c.next_id > bindparam('last_id')
+)
+
+
+async def refresh_batch(session: AsyncSession, batch_size: int = STATUS_STATS_BATCH_SIZE,
+                        targets: Dict[str, float] = SLA_TARGETS,
+                        settle_seconds: float = STATUS_STATS_SETTLE_SECONDS) -> int:
+    """Fold the next `batch_size` settled events into status_time_daily; returns events consumed"""
+    watermark = await session.get(JobWatermarkSQL, ROLLUP_JOB)
+    last_id = watermark.last_id if watermark else 0
+    settled = datetime.utcnow() - timedelta(seconds=settle_seconds)
+    upto, events = (await session.execute(
+        _batch_span, {'last_id': last_id, 'settled': settled, 'limit': batch_size}
+    )).one()
+    if upto is None:
+        return 0
+
+    buckets: Dict[Tuple[date, str], list] = {}
+    result = await session.execute(_closed_intervals, {'last_id': last_id, 'upto': upto})
+    for status, started, ended in result.all():
+        seconds = max((ended - started).total_seconds(), 0.0)
+        bucket = buckets.setdefault((ended.date(), status), [0, 0.0, 0.0, 0])
+        bucket[0] += 1
+        bucket[1] += seconds
+        bucket[2] = max(bucket[2], seconds)
+        if status in targets and seconds > targets[status]:
+            bucket[3] += 1
+
+    for (day, status), (intervals, total, longest, breached) in buckets.items():
+        row = await session.get(StatusTimeDailySQL, (day, status))
+        if row is None:
+            row = StatusTimeDailySQL(day=day, status=status, intervals=0, total_seconds=0, max_seconds=0, breached=0)
+            session.add(row)
+        row.intervals += intervals
+        row.total_seconds += total
+        row.max_seconds = max(row.max_seconds, longest)
+        row.breached += breached
+
+    if watermark is None:
+        watermark = JobWatermarkSQL(job=ROLLUP_JOB)
+        session.add(watermark)
+    watermark.last_id = upto
+    watermark.updated_at = datetime.utcnow()
+    await session.commit()
+    return events
+
+
+class StatusStatsRefresher:
+    """Keeps status_time_daily current on an interval in the background"""
+
+    def __init__(self, session_factory, interval_seconds: float = STATUS_STATS_INTERVAL_SECONDS,
+                 batch_size: int = STATUS_STATS_BATCH_SIZE):
+        self.session_factory = session_factory
+        self.interval = interval_seconds
+        self.batch_size = batch_size
+        self.last_run_at: Optional[datetime] = None
+        self.last_events = 0
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.total_events = 0
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        self._task = asyncio.create_task(self._loop(), name="status-stats-refresher")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def run_once(self) -> dict:
+        """Fold in every settled event logged since the last run, one batch per transaction"""
+        async with self._lock:
+            started = time.perf_counter()
+            events = 0
+            try:
+                while True:
+                    async with self.session_factory() as session:
+                        count = await refresh_batch(session, self.batch_size)
+                    events += count
+                    if count < self.batch_size:
+                        break
+                    await asyncio.sleep(0)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                logging.error(f"Error refreshing status time rollup: {e}")
+
+            self.last_run_at = datetime.utcnow()
+            self.last_events = events
+            self.last_duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            self.total_events += events
+            return self.stats()
+
+    async def _loop(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": STATUS_STATS_ENABLED,
+            "interval_seconds": self.interval,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_events": self.last_events,
+            "last_duration_ms": self.last_duration_ms,
+            "last_error": self.last_error,
+            "total_events": self.total_events
+        }
+
+
+status_stats = StatusStatsRefresher(AsyncSessionLocal)
+
+
+async def sla_report(session: AsyncSession, days: int, targets: Dict[str, float] = SLA_TARGETS) -> dict:
+    """Time-in-status per status over the last `days` days, from the rollup only"""
+    since = datetime.utcnow().date() - timedelta(days=days)
+    result = await session.execute(
+        select(
+            StatusTimeDailySQL.status,
+            func.sum(StatusTimeDailySQL.intervals),
+            func.sum(StatusTimeDailySQL.total_seconds),
+            func.max(StatusTimeDailySQL.max_seconds),
+            func.sum(StatusTimeDailySQL.breached)
+        ).where(StatusTimeDailySQL.day >= since).group_by(StatusTimeDailySQL.status)
+    )
+    statuses = {}
+    for status, intervals, total, longest, breached in result.all():
+        statuses[status] = {
+            "intervals": intervals,
+            "avg_hours": round(total / intervals / 3600, 2) if intervals else None,
+            "max_hours": round(longest / 3600, 2),
+            "target_hours": targets[status] / 3600 if status in targets else None,
+            "breached": breached,
+            "breach_rate": round(breached / intervals, 4) if intervals else None
+        }
+    watermark = await session.get(JobWatermarkSQL, ROLLUP_JOB)
+    return {
+        "days": days,
+        "since": since.isoformat(),
+        "statuses": statuses,
+        "refreshed_through_event": watermark.last_id if watermark else 0,
+        "refreshed_at": watermark.updated_at.isoformat() if watermark and watermark.updated_at else None
+    }
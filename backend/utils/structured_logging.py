@@ -0,0 +1,232 @@
+"""
+Structured, non-blocking logging pipeline
+DataLab Georgia - JSON log records formatted and written off the event loop
+
+`configure_logging()` replaces the root handlers with one QueueHandler. On the
+request path a log call only stamps the record with the current request ID,
+applies sampling and does a non-blocking put on a bounded queue - if the queue
+is full the record is dropped and counted, never waited on. A QueueListener
+thread does the formatting (JSON or text), the stream I/O, and keeps a ring
+buffer of recent errors for GET /api/admin/logs/errors.
+
+    LOG_LEVEL=INFO
+    LOG_FORMAT=json               json | text
+    LOG_QUEUE_SIZE=10000
+    LOG_ERROR_BUFFER_SIZE=200
+    LOG_SAMPLE_RATE=1.0           share of sampled INFO/DEBUG records kept
+    LOG_SAMPLED_LOGGERS=uvicorn.access,sqlalchemy.engine
+    SQL_ECHO=false                log every SQL statement (through the queue)
+"""
+
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import traceback
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import List, Optional
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json').lower()
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+LOG_ERROR_BUFFER_SIZE = int(os.environ.get('LOG_ERROR_BUFFER_SIZE', '200'))
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '1.0'))
+LOG_SAMPLED_LOGGERS = tuple(
+    name.strip() for name in
+    os.environ.get('LOG_SAMPLED_LOGGERS', 'uvicorn.access,sqlalchemy.engine').split(',')
+    if name.strip()
+)
+SQL_ECHO = os.environ.get('SQL_ECHO', 'false').lower() == 'true'
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('request_id', default=None)
+
+# LogRecord attributes that are not user-supplied `extra=` fields
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+
+def _timestamp(record: logging.LogRecord) -> str:
+    return datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds')
+
+
+def _exception_text(record: logging.LogRecord) -> Optional[str]:
+    if record.exc_info:
+        return ''.join(traceback.format_exception(*record.exc_info)).rstrip()
+    return record.exc_text
+
+
+def record_to_dict(record: logging.LogRecord) -> dict:
+    entry = {
+        "timestamp": _timestamp(record),
+        "level": record.levelname,
+        "logger": record.name,
+        "message": record.getMessage(),
+        "request_id": getattr(record, 'request_id', None),
+    }
+    for key, value in vars(record).items():
+        if key not in _RECORD_ATTRS and not key.startswith('_'):
+            entry[key] = value
+    exception = _exception_text(record)
+    if exception:
+        entry["exception"] = exception
+    return entry
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record_to_dict(record), default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s")
+
+
+class ErrorRingBuffer(logging.Handler):
+    """Keeps the most recent ERROR+ records as dicts (filled on the listener thread)"""
+
+    def __init__(self, size: int = LOG_ERROR_BUFFER_SIZE):
+        super().__init__(level=logging.ERROR)
+        self.records = deque(maxlen=size)
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record_to_dict(record))
+
+    def recent(self, limit: int) -> List[dict]:
+        # Newest first; list() of a deque is safe against the appending thread
+        return list(self.records)[-limit:][::-1]
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Request-path half: stamp, sample, enqueue without waiting"""
+
+    def __init__(self, log_queue: queue.Queue, sample_rate: float = LOG_SAMPLE_RATE,
+                 sampled_loggers=LOG_SAMPLED_LOGGERS):
+        super().__init__(log_queue)
+        self.sample_rate = sample_rate
+        self.sampled_loggers = sampled_loggers
+        self.dropped = 0
+        self.sampled_out = 0
+
+    def _sampled_out(self, record: logging.LogRecord) -> bool:
+        if self.sample_rate >= 1.0 or record.levelno > logging.INFO:
+            return False
+        if not record.name.startswith(self.sampled_loggers):
+            return False
+        return random.random() >= self.sample_rate
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # contextvars are only visible here, not on the listener thread
+        record.request_id = request_id_var.get()
+        if self._sampled_out(record):
+            self.sampled_out += 1
+            return False
+        return super().handle(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the message args; exception and JSON formatting happen
+        # on the listener thread (the queue is in-process, nothing is pickled)
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """Owns the queue, the listener thread and the error ring buffer"""
+
+    def __init__(self):
+        self.queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        self.handler = NonBlockingQueueHandler(self.queue)
+        self.errors = ErrorRingBuffer()
+        self.listener: Optional[logging.handlers.QueueListener] = None
+
+    def start(self, stream=None):
+        if self.listener is not None:
+            return
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter() if LOG_FORMAT == 'json' else TextFormatter())
+        self.listener = logging.handlers.QueueListener(
+            self.queue, output, self.errors, respect_handler_level=True
+        )
+        self.listener.start()
+
+    def stop(self):
+        """Drain the queue and stop the listener thread"""
+        if self.listener is None:
+            return
+        self.listener.stop()
+        self.listener = None
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize(),
+            "queue_size": self.queue.maxsize,
+            "dropped": self.handler.dropped,
+            "sampled_out": self.handler.sampled_out,
+            "sample_rate": self.handler.sample_rate,
+            "errors_buffered": len(self.errors.records)
+        }
+
+
+log_pipeline = LogPipeline()
+
+
+def configure_logging():
+    """Route every logger through the queue; safe to call more than once"""
+    root = logging.getLogger()
+    root.handlers = [log_pipeline.handler]
+    root.setLevel(LOG_LEVEL)
+    if SQL_ECHO:
+        logging.getLogger('sqlalchemy.engine').setLevel(logging.INFO)
+    # Let uvicorn's loggers propagate to the root queue handler
+    for name in ('uvicorn', 'uvicorn.error', 'uvicorn.access'):
+        logger = logging.getLogger(name)
+        logger.handlers = []
+        logger.propagate = True
+    log_pipeline.start()
+    atexit.register(log_pipeline.stop)
+
+
+class RequestIdMiddleware:
+    """Sets the request ID contextvar (from X-Request-ID or a new one) and echoes it back"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
@@ -0,0 +1,161 @@
+"""
+Group-commit Writer for form submissions
+DataLab Georgia - batches inserts into one transaction for the SQLite single writer
+
+With WRITE_BATCHING=true, `create_service_request` and `create_contact_message`
+hand their new rows to one writer task instead of committing themselves. The
+writer waits up to WRITE_BATCH_MAX_DELAY_MS (or until WRITE_BATCH_MAX_ROWS rows
+are queued), assigns case IDs for the whole batch from a single sequence scan,
+links each row to its customer, commits once and resolves each caller's future with its persisted row.
+Rows that belong with a submission (its first status event, its duplicate
+fingerprint) are built by the caller's `followups` callback once the row has
+its keys, and commit in the same transaction as the row.
+
+If a batch fails to commit, its rows are retried one transaction at a time
+so a single bad row only fails its own request.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Callable, List, Optional, Tuple
+
+from database import AsyncSessionLocal
+from models.ServiceRequestSQL import ServiceRequestSQL
+from utils.case_generator import format_case_id, next_case_number
+from utils.customers import assign_customer, CUSTOMER_TABLES
+
+WRITE_BATCHING = os.environ.get('WRITE_BATCHING', 'false').lower() == 'true'
+WRITE_BATCH_MAX_ROWS = int(os.environ.get('WRITE_BATCH_MAX_ROWS', '100'))
+WRITE_BATCH_MAX_DELAY_MS = float(os.environ.get('WRITE_BATCH_MAX_DELAY_MS', '5'))
+
+
+class GroupCommitWriter:
+    """Single async writer task that commits queued rows in batches"""
+
+    def __init__(self, session_factory, max_rows: int = WRITE_BATCH_MAX_ROWS,
+                 max_delay_ms: float = WRITE_BATCH_MAX_DELAY_MS):
+        self.session_factory = session_factory
+        self.max_rows = max_rows
+        self.max_delay = max_delay_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.rows = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(), name="group-commit-writer")
+
+    async def stop(self):
+        """Flush whatever is queued, then stop the writer task"""
+        if not self.running:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, row, followups: Optional[Callable[[object], list]] = None):
+        """Queue an ORM row for insertion; returns it once committed
+
+        `followups(row)` is called after the row is flushed and returns more
+        rows to commit with it.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((row, followups, future))
+        return await future
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            if self._queue.qsize() < self.max_rows - 1:
+                # Give concurrent submitters a moment to join this commit
+                await asyncio.sleep(self.max_delay)
+            while len(batch) < self.max_rows and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._commit(batch)
+            except Exception as e:
+                logging.error(f"Group commit writer failed: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _commit(self, batch: List[Tuple[object, Optional[Callable], asyncio.Future]]):
+        live = [(row, followups) for row, followups, future in batch if not future.cancelled()]
+        if not live:
+            return
+        rows = [row for row, _ in live]
+        try:
+            async with self.session_factory() as session:
+                await self._assign_case_ids(session, rows)
+                for row in rows:
+                    if isinstance(row, CUSTOMER_TABLES):
+                        await assign_customer(session, row)
+                session.add_all(rows)
+                if any(followups for _, followups in live):
+                    # Followups reference the rows' generated ids
+                    await session.flush()
+                    for row, followups in live:
+                        if followups is not None:
+                            session.add_all(followups(row))
+                await session.commit()
+        except Exception as e:
+            if len(batch) == 1:
+                if not batch[0][2].done():
+                    batch[0][2].set_exception(e)
+                return
+            logging.warning(f"Batch of {len(rows)} rows failed ({e}), retrying individually")
+            for row, followups, future in batch:
+                await self._commit([(_fresh_copy(row), followups, future)])
+            return
+
+        self.batches += 1
+        self.rows += len(rows)
+        for row, _, future in batch:
+            if not future.done():
+                future.set_result(row)
+
+    async def _assign_case_ids(self, session, rows):
+        pending = [r for r in rows if isinstance(r, ServiceRequestSQL) and not r.case_id]
+        if not pending:
+            return
+        # One counter update reserves numbers for the whole batch
+        year = datetime.now().year
+        number = await next_case_number(session, year, count=len(pending))
+        for row in pending:
+            row.case_id = format_case_id(year, number)
+            number += 1
+
+
+def _fresh_copy(row):
+    """Transient copy of a row from a rolled-back batch, without generated keys or links"""
+    values = {}
+    for attr in row.__mapper__.column_attrs:
+        value = getattr(row, attr.key)
+        # Leave unset columns out so their defaults still apply
+        if attr.key not in ('id', 'case_id', 'customer_id') and value is not None:
+            values[attr.key] = value
+    return row.__class__(**values)
+
+
+# Process-wide writer; started by server.py when WRITE_BATCHING is enabled
+group_commit_writer = GroupCommitWriter(AsyncSessionLocal) if WRITE_BATCHING else None
+
+def get_group_commit_writer() -> Optional[GroupCommitWriter]:
+    """The running writer, or None when submissions commit directly"""
+    if group_commit_writer is not None and group_commit_writer.running:
+        return group_commit_writer
+    return None
@@ -101,20 +101,14 @@ const AdminPanel = () => {
     try {
       setLoading(true);
       
-      // Fetch all data in parallel
-      const [servicesRes, archivedRes, contactRes, testimonialsRes, statsRes] = await Promise.all([
-        axios.get(`${BACKEND_URL}/api/service-requests/`),
-        axios.get(`${BACKEND_URL}/api/service-requests/archived`),
-        axios.get(`${BACKEND_URL}/api/contact/`),
-        axios.get(`${BACKEND_URL}/api/testimonials/all`),
-        axios.get(`${BACKEND_URL}/api/contact/stats`)
-      ]);
-
-      setServiceRequests(servicesRes.data);
-      setArchivedRequests(archivedRes.data);
-      setContactMessages(contactRes.data);
-      setTestimonials(testimonialsRes.data);
-      setStats(statsRes.data);
+      // One round trip for the whole dashboard
+      const { data } = await axios.get(`${BACKEND_URL}/api/admin/bootstrap`);
+
+      setServiceRequests(data.service_requests);
+      setArchivedRequests(data.archived_requests);
+      setContactMessages(data.contact_messages);
+      setTestimonials(data.testimonials);
+      setStats(data.stats);
 
     } catch (error) {
       console.error('Error fetching admin data:', error);
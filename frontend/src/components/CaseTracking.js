@@ -76,60 +76,35 @@ const CaseTracking = ({ language }) => {
           return;
         }
       } else {
-        // Search in Service Requests via API (DL prefix or other)
-        const response = await axios.get(`${BACKEND_URL}/api/service-requests/${caseId}`);
+        // Public tracking endpoint: status-only projection for active and archived cases
+        const response = await axios.get(`${BACKEND_URL}/api/track/${encodeURIComponent(caseId)}`);
         
-        // Add progress percentage for Service Requests based on their status
-        // If is_archived is true, override status to 'archived'
-        const actualStatus = response.data.is_archived ? 'archived' : response.data.status;
         const serviceRequestData = {
           ...response.data,
-          status: actualStatus,
-          progress_percentage: response.data.is_archived ? 100 : getProgressPercentage(actualStatus),
           estimated_completion: response.data.estimated_completion || calculateEstimatedCompletion(response.data.created_at, response.data.urgency)
         };
         
         setCaseInfo(serviceRequestData);
-        toast({
-          title: language === 'ka' ? 'სერვისის საქმე ნაპოვნია!' : 'Service Case Found!',
-          description: language === 'ka' ? 'სერვისის საქმის ინფორმაცია წარმატებით ჩაიტვირთა' : 'Service case information loaded successfully',
-        });
+        if (response.data.is_archived) {
+          toast({
+            title: language === 'ka' ? 'საქმე დახურულია' : 'Case is Closed',
+            description: language === 'ka' ? 'ეს საქმე დასრულებული და არქივშია' : 'This case has been completed and archived',
+            variant: "default"
+          });
+        } else {
+          toast({
+            title: language === 'ka' ? 'სერვისის საქმე ნაპოვნია!' : 'Service Case Found!',
+            description: language === 'ka' ? 'სერვისის საქმის ინფორმაცია წარმატებით ჩაიტვირთა' : 'Service case information loaded successfully',
+          });
+        }
       }
 
     } catch (error) {
       console.error('Error tracking case:', error);
       setCaseInfo(null);
-      const caseId = trackingId.trim(); // Get caseId for error handling
       
       if (error.response?.status === 404) {
-        // Check if it might be an archived case
-        try {
-          // Try to search in archived cases
-          const archivedResponse = await axios.get(`${BACKEND_URL}/api/service-requests/archived`);
-          const archivedCases = archivedResponse.data;
-          const archivedCase = archivedCases.find(req => req.case_id === caseId);
-          
-          if (archivedCase) {
-            // Found in archived cases
-            const archivedCaseData = {
-              ...archivedCase,
-              progress_percentage: 100, // Archived cases are 100% complete
-              status: 'archived'
-            };
-            
-            setCaseInfo(archivedCaseData);
-            toast({
-              title: language === 'ka' ? 'საქმე დახურულია' : 'Case is Closed',
-              description: language === 'ka' ? 'ეს საქმე დასრულებული და არქივშია' : 'This case has been completed and archived',
-              variant: "default"
-            });
-            return;
-          }
-        } catch (archivedError) {
-          console.error('Error checking archived cases:', archivedError);
-        }
-        
-        // Not found in archived cases either
+        // Not found among active or archived cases
         toast({
           title: language === 'ka' ? 'საქმე ვერ მოიძებნა' : 'Case Not Found',
           description: language === 'ka' ? 'შეამოწმეთ თვალთვალის ID და სცადეთ თავიდან' : 'Please check your tracking ID and try again',
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useState, useRef } from 'react';
 import { Send, Phone, Mail, MapPin, Clock } from 'lucide-react';
 import { Button } from './ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from './ui/card';
@@ -8,6 +8,7 @@ import { Label } from './ui/label';
 import { useToast } from '../hooks/use-toast';
 import { translations } from '../data/mockData';
 import axios from 'axios';
+import { newIdempotencyKey } from '../lib/utils';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 
@@ -22,8 +23,11 @@ const Contact = ({ language }) => {
     message: ''
   });
   const [errors, setErrors] = useState({});
+  // Reused for double-clicks and retries, reset when the form changes or succeeds
+  const idempotencyKeyRef = useRef(null);
 
   const handleInputChange = (field, value) => {
+    idempotencyKeyRef.current = null;
     setFormData(prev => ({
       ...prev,
       [field]: value
@@ -90,6 +94,9 @@ const Contact = ({ language }) => {
     
     try {
       setLoading(true);
+      if (!idempotencyKeyRef.current) {
+        idempotencyKeyRef.current = newIdempotencyKey();
+      }
 
       // Check if backend is reachable
       const response = await axios.post(`${BACKEND_URL}/api/contact/`, {
@@ -99,7 +106,8 @@ const Contact = ({ language }) => {
         subject: formData.subject.trim(),
         message: formData.message.trim()
       }, {
-        timeout: 10000 // 10 second timeout
+        timeout: 10000, // 10 second timeout
+        headers: { 'Idempotency-Key': idempotencyKeyRef.current }
       });
       
       console.log('Contact form response:', response.data);
@@ -113,6 +121,8 @@ const Contact = ({ language }) => {
 
       console.log('Toast called successfully');
 
+      idempotencyKeyRef.current = null;
+
       // Reset form
       setFormData({
         name: '',
@@ -1,4 +1,4 @@
-import React, { useState } from 'react';
+import React, { useState, useRef } from 'react';
 import { Send, Upload, FileText } from 'lucide-react';
 import { Button } from './ui/button';
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from './ui/card';
@@ -9,6 +9,7 @@ import { Label } from './ui/label';
 import { useToast } from '../hooks/use-toast';
 import { translations } from '../data/mockData';
 import axios from 'axios';
+import { newIdempotencyKey } from '../lib/utils';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 
@@ -24,8 +25,11 @@ const ServiceRequest = ({ language }) => {
     urgency: ''
   });
   const [errors, setErrors] = useState({});
+  // Reused for double-clicks and retries, reset when the form changes or succeeds
+  const idempotencyKeyRef = useRef(null);
 
   const handleInputChange = (field, value) => {
+    idempotencyKeyRef.current = null;
     // Special handling for phone number
     if (field === 'phone') {
       // Remove any non-digit characters except + and spaces
@@ -132,6 +136,9 @@ const ServiceRequest = ({ language }) => {
     
     try {
       setLoading(true);
+      if (!idempotencyKeyRef.current) {
+        idempotencyKeyRef.current = newIdempotencyKey();
+      }
       
       console.log('Sending request to:', `${BACKEND_URL}/api/service-requests/`);
       console.log('Request payload:', {
@@ -151,7 +158,8 @@ const ServiceRequest = ({ language }) => {
         problem_description: formData.problemDescription.trim(),
         urgency: formData.urgency
       }, {
-        timeout: 10000 // 10 second timeout
+        timeout: 10000, // 10 second timeout
+        headers: { 'Idempotency-Key': idempotencyKeyRef.current }
       });
 
       const data = response.data;
@@ -164,6 +172,8 @@ const ServiceRequest = ({ language }) => {
           : `Your case ID: ${data.case_id}. We will contact you soon.`,
       });
 
+      idempotencyKeyRef.current = null;
+
       // Reset form
       setFormData({
         name: '',
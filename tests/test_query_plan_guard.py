@@ -0,0 +1,104 @@
+"""
+Query-plan guard - unindexed filter/sort shapes are rejected, indexed ones pass
+DataLab Georgia - utils/query_filters.py against real SQLite plans
+
+    python -m pytest -q tests/test_query_plan_guard.py
+"""
+
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, insert, select, text
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from models.ServiceRequestSQL import ServiceRequestSQL  # noqa: E402
+from utils import query_filters  # noqa: E402
+from utils.query_filters import ServiceRequestFilters  # noqa: E402
+
+NO_FILTERS = dict(
+    status=None, urgency=None, device_type=None, created_from=None, created_to=None,
+    price_min=None, price_max=None, is_read=None, approved_for_kanban=None, sort='-created_at'
+)
+
+
+def _filters(**given) -> ServiceRequestFilters:
+    return ServiceRequestFilters(**{**NO_FILTERS, **given})
+
+
+@pytest.fixture(scope='module')
+def connection():
+    engine = create_engine('sqlite://')
+    ServiceRequestSQL.__table__.create(engine)
+    now = datetime.utcnow()
+    rows = [
+        dict(case_id=f"DL{i:07d}", name='n', email='e@x.com', phone='1',
+             device_type=random.choice(['ssd', 'hdd', 'usb']), problem_description='x',
+             urgency=random.choice(['low', 'high']), status=random.choice(['pending', 'in_progress', 'completed']),
+             price=random.random() * 500, is_archived=False, is_read=bool(i % 2),
+             approved_for_kanban=False, created_at=now - timedelta(minutes=i))
+        for i in range(3000)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(ServiceRequestSQL.__table__), rows)
+        conn.execute(text('ANALYZE'))
+    with engine.connect() as conn:
+        yield conn
+    engine.dispose()
+
+
+def _verdict(conn, filters: ServiceRequestFilters):
+    query = filters.apply(select(ServiceRequestSQL.id).where(ServiceRequestSQL.is_archived == False)).limit(100)
+    sql = str(query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    plan = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    return query_filters._unindexed_sqlite(plan, filtered=bool(filters.shape()[0]))
+
+
+@pytest.mark.parametrize('given', [
+    dict(),
+    dict(status='pending'),
+    dict(urgency='high'),
+    dict(created_from=datetime(2026, 1, 1)),
+    dict(sort='price'),
+])
+def test_index_backed_shapes_pass(connection, given):
+    assert _verdict(connection, _filters(**given)) is None
+
+
+@pytest.mark.parametrize('given', [
+    dict(is_read=False),                       # no index on is_read
+    dict(approved_for_kanban=True),
+    dict(status='pending', sort='price'),      # filter can't use the price index
+    dict(sort='status'),                       # temp B-tree for the id tie-breaker
+])
+def test_unindexed_shapes_are_rejected(connection, given):
+    assert _verdict(connection, _filters(**given)) is not None
+
+
+def test_postgresql_sort_and_archived_only_index_are_rejected():
+    def plan(node):
+        return [([{'Plan': node}],)]
+
+    archived_only = {'Node Type': 'Index Scan', 'Relation Name': 'service_requests',
+                     'Index Name': 'idx_service_requests_active_created', 'Index Cond': '(is_archived = false)'}
+    by_status = {**archived_only, 'Index Name': 'idx_service_requests_active_status',
+                 'Index Cond': "((is_archived = false) AND (status = 1))"}
+    sort = {'Node Type': 'Sort', 'Sort Key': ['price'], 'Plans': [by_status]}
+    seq_scan = {'Node Type': 'Seq Scan', 'Relation Name': 'service_requests'}
+
+    assert query_filters._unindexed_postgresql(plan(archived_only), filtered=False) is None
+    assert query_filters._unindexed_postgresql(plan(archived_only), filtered=True) is not None
+    assert query_filters._unindexed_postgresql(plan(by_status), filtered=True) is None
+    assert query_filters._unindexed_postgresql(plan(sort), filtered=True).startswith('Sort')
+    assert query_filters._unindexed_postgresql(plan(seq_scan), filtered=False).startswith('Seq Scan')
+
+
+def test_date_only_created_to_includes_that_day(connection):
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    filters = _filters(created_from=today, created_to=today)
+    count = select(func.count()).select_from(filters.apply(select(ServiceRequestSQL.id)).subquery())
+    created_today = select(func.count(ServiceRequestSQL.id)).where(ServiceRequestSQL.created_at >= today)
+    assert connection.execute(count).scalar() == connection.execute(created_today).scalar() > 0